@@ -0,0 +1,262 @@
+import threading
+
+import pandas as pd
+
+import data_loader
+from telemetry import timed
+
+# ------------------------
+# Aggregate cube for the Q1–Q6 analytics
+#
+# The cube is built from a handful of additive "partials" (counts and sums
+# grouped by the host Country). Team rows count toward the host country of
+# their own match, as in every filtered path (bitmap index, DuckDB), so a
+# year shared by two hosts is split between them. Every Q1–Q6 result,
+# for "All" and for each host country, is a cheap roll-up of those partials,
+# so the whole cube is materialized once per dataset version and then served
+# by dictionary lookup.
+# ------------------------
+QUESTIONS = ("q1", "q2", "q3", "q4", "q5", "q6")
+ALL = "All"
+# Questions whose frames are only ever shown as a top N (pushdown.top_n()):
+# left unsorted here, ranked by this column where they are cut down
+RANKED_BY = {"q2": "Matches", "q4": "Goals_Conceded", "q5": "Total_Goals"}
+
+_lock = threading.Lock()
+_cubes = {}  # dataset version -> cube
+
+
+def _plain_levels(series: pd.Series) -> pd.Series:
+    # Index levels as plain values so partials from different category sets
+    # (e.g. a delta batch) align when merged
+    index = series.index
+    levels = [lvl.astype(str) if isinstance(lvl, pd.CategoricalIndex) else lvl for lvl in index.levels]
+    series.index = index.set_levels(levels)
+    return series.astype("int64")
+
+
+@timed("aggregates.groupby")
+def compute_partials(match_df: pd.DataFrame, df: pd.DataFrame) -> dict:
+    goals = match_df.groupby(["Country", "Year"], observed=True)["Total_Goals_in_Match"]
+    stadium = match_df.groupby(["Country", "Stadium"], observed=True)
+    partials = {
+        "host_matches": match_df.groupby(["Country", "Year"], observed=True).size(),
+        "year_goals": goals.sum(),
+        "stadium_matches": stadium.size(),
+        "stadium_goals": stadium["Total_Goals_in_Match"].sum(),
+        "round_matches": match_df.groupby(["Country", "Round"], observed=True).size(),
+        "team_conceded": df.groupby(["Country", "Team"], observed=True)["Opponent G"].sum(),
+    }
+    return {name: _plain_levels(series) for name, series in partials.items()}
+
+
+def merge_partials(partials: dict, delta: dict) -> dict:
+    """Add a delta batch's partials to existing ones (all partials are additive)."""
+    return {
+        name: series.add(delta[name], fill_value=0).astype("int64").sort_index()
+        for name, series in partials.items()
+    }
+
+
+def _for_country(series: pd.Series, country: str) -> pd.Series:
+    if country == ALL:
+        return series
+    return series[series.index.get_level_values("Country") == country]
+
+
+def finalize(partials: dict, country: str = ALL) -> dict:
+    """Roll the partials up into the six result frames for one filter value."""
+    host = _for_country(partials["host_matches"], country)
+
+    q1 = (
+        host.groupby(level="Country", observed=True).size()
+        .reset_index(name="Times_Hosted")
+        .sort_values("Times_Hosted", ascending=False)
+    )
+
+    games = _for_country(partials["stadium_matches"], country).reset_index(name="Matches")
+    if games.empty:
+        q2 = games
+    else:
+        idx = games.groupby("Country", observed=True)["Matches"].idxmax()
+        q2 = games.loc[idx].reset_index(drop=True)
+
+    q3 = (
+        _for_country(partials["year_goals"], country)
+        .groupby(level="Year", observed=True).sum()
+        .reset_index(name="Total_Goals")
+        .sort_values("Year")
+    )
+
+    q4 = (
+        _for_country(partials["team_conceded"], country)
+        .groupby(level="Team", observed=True).sum()
+        .reset_index(name="Goals_Conceded")
+    )
+
+    q5 = (
+        _for_country(partials["stadium_goals"], country)
+        .groupby(level="Stadium", observed=True).sum()
+        .reset_index(name="Total_Goals")
+    )
+
+    q6 = (
+        _for_country(partials["round_matches"], country)
+        .groupby(level="Round", observed=True).sum()
+        .reset_index(name="Matches")
+        .sort_values("Matches", ascending=False)
+    )
+
+    views = {"q1": q1, "q2": q2, "q3": q3, "q4": q4, "q5": q5, "q6": q6}
+    return {q: _plain_labels(frame) for q, frame in views.items()}
+
+
+def _plain_labels(frame: pd.DataFrame) -> pd.DataFrame:
+    # Result frames are small; plain string labels keep charts independent
+    # of the categorical dtypes used for the full frames
+    for col in frame.columns:
+        if isinstance(frame[col].dtype, pd.CategoricalDtype):
+            frame[col] = frame[col].astype(str)
+    return frame
+
+
+@timed("aggregates.build_cube")
+def build_cube(match_df: pd.DataFrame, df: pd.DataFrame, partials: dict = None) -> dict:
+    if partials is None:
+        partials = compute_partials(match_df, df)
+    countries = partials["host_matches"].index.get_level_values("Country").unique()
+    views = {ALL: finalize(partials, ALL)}
+    for country in sorted(countries):
+        views[country] = finalize(partials, country)
+    return {"partials": partials, "views": views}
+
+
+# ------------------------
+# Public API
+# ------------------------
+def get_cube(match_df: pd.DataFrame, df: pd.DataFrame, version: str) -> dict:
+    cube = _cubes.get(version)
+    if cube is not None:
+        return cube
+    with _lock:
+        cube = _cubes.get(version)
+        if cube is None:
+            cube = _cube_from_delta(version)
+            if cube is None:
+                cube = build_cube(match_df, df)
+            _cubes.clear()  # only the current dataset version is kept
+            _cubes[version] = cube
+    return cube
+
+
+def install_cube(version: str, cube: dict) -> bool:
+    """Make a cube built elsewhere (e.g. by warmup.py) the current one.
+
+    Refused (returns False) unless `version` is a dataset version
+    data_loader is serving, so a late warm-up of a replaced version cannot
+    evict the current cube.
+    """
+    with _lock:
+        if not data_loader.is_current(version):
+            return False
+        _cubes.clear()
+        _cubes[version] = cube
+    return True
+
+
+def _cube_from_delta(version: str):
+    # Appended rows: fold their partials into the previous version's cube
+    # instead of regrouping the whole history
+    delta = data_loader.delta_for(version)
+    if delta is None:
+        return None
+    previous_version, delta_df, delta_match = delta
+    previous = _cubes.get(previous_version)
+    if previous is None:
+        return None
+    partials = merge_partials(previous["partials"], compute_partials(delta_match, delta_df))
+    return build_cube(None, None, partials)
+
+
+def get_aggregates(match_df: pd.DataFrame, df: pd.DataFrame, version: str, country: str = ALL) -> dict:
+    """Q1–Q6 result frames for `country` ("All" or a host country).
+
+    Frames are shared between sessions and must not be modified in place.
+    """
+    views = get_cube(match_df, df, version)["views"]
+    if country not in views:
+        # Unknown host country: same shape as an empty filter result
+        return finalize(get_cube(match_df, df, version)["partials"], country)
+    return views[country]
+
+
+# ------------------------
+# Direct pandas computation (arbitrary filters, consistency check)
+# ------------------------
+def live_aggregates(match_df: pd.DataFrame, df: pd.DataFrame, country: str = ALL) -> dict:
+    """Q1–Q6 computed straight from the frames, as the Dashboard used to."""
+    filtered = match_df
+    if country != ALL:
+        filtered = match_df[match_df["Country"] == country]
+    return aggregates_for(filtered, team_rows_of(filtered, df))
+
+
+def team_rows_of(filtered: pd.DataFrame, df: pd.DataFrame) -> pd.DataFrame:
+    """Team rows (df) of the matches in `filtered`, matched on (Year, Game #)."""
+    keys = ["Year", "Game #"]
+    selected = pd.MultiIndex.from_frame(filtered[keys].astype("int64"))
+    return df[pd.MultiIndex.from_frame(df[keys].astype("int64")).isin(selected)]
+
+
+def aggregates_for(filtered: pd.DataFrame, df_filtered: pd.DataFrame) -> dict:
+    """Q1–Q6 over an already filtered match table and its team rows."""
+    q1 = (
+        filtered.groupby("Country", observed=True)["Year"].nunique()
+        .reset_index(name="Times_Hosted")
+        .sort_values("Times_Hosted", ascending=False)
+    )
+    games = filtered.groupby(["Country", "Stadium"], observed=True).size().reset_index(name="Matches")
+    if games.empty:
+        q2 = games
+    else:
+        idx = games.groupby("Country", observed=True)["Matches"].idxmax()
+        q2 = games.loc[idx].reset_index(drop=True)
+    q3 = (
+        filtered.groupby("Year", observed=True)["Total_Goals_in_Match"].sum()
+        .reset_index(name="Total_Goals")
+        .sort_values("Year")
+    )
+    q4 = df_filtered.groupby("Team", observed=True)["Opponent G"].sum().reset_index(name="Goals_Conceded")
+    q5 = filtered.groupby("Stadium", observed=True)["Total_Goals_in_Match"].sum().reset_index(name="Total_Goals")
+    q6 = (
+        filtered.groupby("Round", observed=True).size()
+        .reset_index(name="Matches")
+        .sort_values("Matches", ascending=False)
+    )
+    views = {"q1": q1, "q2": q2, "q3": q3, "q4": q4, "q5": q5, "q6": q6}
+    return {q: _plain_labels(frame) for q, frame in views.items()}
+
+
+def _same_frame(left: pd.DataFrame, right: pd.DataFrame) -> bool:
+    if list(left.columns) != list(right.columns) or len(left) != len(right):
+        return False
+    # Ties may be ordered differently; compare as sorted records
+    left, right = _plain_labels(left.copy()), _plain_labels(right.copy())
+    left = left.sort_values(list(left.columns)).reset_index(drop=True)
+    right = right.sort_values(list(right.columns)).reset_index(drop=True)
+    try:
+        pd.testing.assert_frame_equal(left, right, check_dtype=False, check_categorical=False)
+    except AssertionError:
+        return False
+    return True
+
+
+def check_consistency(cube: dict, match_df: pd.DataFrame, df: pd.DataFrame) -> list:
+    """Compare every cube view with the live computation; returns mismatches."""
+    mismatches = []
+    for country, views in cube["views"].items():
+        live = live_aggregates(match_df, df, country)
+        for q in QUESTIONS:
+            if not _same_frame(views[q], live[q]):
+                mismatches.append((country, q))
+    return mismatches
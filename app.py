@@ -1,60 +1,52 @@
+import os
+
 import streamlit as st
 import pandas as pd
-import plotly.express as px
-import random
-from chatbot import get_reply
-
-
-# -------------------------------------------------
-# Helper for shades
-# -------------------------------------------------
-def get_shade_color(shades):
-    return random.choice(shades)
-
-def apply_dark_theme(fig, show_legend=True):
-
-    # Transparent background + global white color
-    fig.update_layout(
-        paper_bgcolor='rgba(0,0,0,0)',
-        plot_bgcolor='rgba(0,0,0,0)',
-        font=dict(color="white"),
-        showlegend=show_legend,
-
-        # Chart Title (Center + Bold + White)
-        title=dict(
-            x=0.5,  # center align
-            xanchor="center",
-            font=dict(
-                color="lavender",
-                size=20,
-                family="Arial Black"
-            )
-        ),
-
-        # Legend styling (if enabled)
-        legend=dict(
-            font=dict(color="white"),
-            bgcolor='rgba(0,0,0,0)'
-        ),
+from chatbot import get_reply, reply_cache
+import engine
+import auth
+import static_export
+import pushdown
+import telemetry
+import warmup
+from charts import home_pie, VISUAL_CHARTS, DASHBOARD_CHARTS, team_progression, team_h2h_matrix
+from figure_cache import cached_figure, figure_cache
+
+# Users who can see the performance panel (none unless named; accounts are
+# created with `python auth.py add <username>`)
+ADMIN_USERS = {u.strip() for u in os.environ.get("WORLDCUP_ADMINS", "").split(",") if u.strip()}
+SESSION_COOKIE = "worldcup_session"
+
+telemetry.start_trace()
+
+
+def show_chart(fig, key):
+    # Times Plotly serialization + the send to the browser
+    with telemetry.span(f"render.{key}"):
+        st.plotly_chart(fig, use_container_width=True, key=key)
+
+
+def set_session_cookie(token):
+    # st.context.cookies is read-only, so the browser writes the cookie; an
+    # empty token deletes it
+    max_age = auth.SESSION_TTL if token else 0
+    st.html(
+        f"<script>document.cookie = '{SESSION_COOKIE}={token or ''}; path=/; max-age={max_age}; "
+        f"SameSite=Strict' + (location.protocol === 'https:' ? '; Secure' : '');</script>",
+        unsafe_allow_javascript=True,
     )
 
-    # X-axis styling
-    fig.update_xaxes(
-        showgrid=False,
-        zeroline=False,
-        title_font=dict(color="white", size=15, family="Arial Black"),
-        tickfont=dict(color="white", size=13, family="Arial"),
-    )
 
-    # Y-axis styling
-    fig.update_yaxes(
-        showgrid=False,
-        zeroline=False,
-        title_font=dict(color="white", size=15, family="Arial Black"),
-        tickfont=dict(color="white", size=13, family="Arial"),
-    )
+def kpi_strip(k):
+    # `k` is an engine.kpis() result (running counters, no rescan)
+    cols = st.columns(6)
+    cols[0].metric("Matches", f"{k['matches']:,}")
+    cols[1].metric("World Cups", f"{k['tournaments']:,}")
+    cols[2].metric("Teams", f"{k['teams']:,}")
+    cols[3].metric("Goals", f"{k['goals']:,}")
+    cols[4].metric("Goals / Match", f"{k['goals_per_match']:.2f}")
+    cols[5].metric("Goals / World Cup", f"{k['goals_per_tournament']:.1f}")
 
-    return fig
 
 # -------------------------------------------------
 # Page Setup + Basic Theming
@@ -212,24 +204,22 @@ st.write("")
 # Load Data
 # -------------------------------------------------
 try:
-    df = pd.read_excel("world_cup_results.xlsx")
+    # Parsed once per workbook version and shared across sessions
+    with telemetry.span("load.total"):
+        data = engine.load()
+    df, match_df, data_version = data
 
-    df["Total_Goals_in_Match"] = df["Team G"] + df["Opponent G"]
-
-    match_df = df.drop_duplicates(subset=["Year", "Game #"]).copy()
-    match_df["Total_Goals_in_Match"] = match_df["Team G"] + match_df["Opponent G"]
+    # Charts exported by static_export.py for this version skip the build
+    static_charts = static_export.preload(data_version)
+    # Every country's Dashboard figures are precomputed once per version
+    if warmup.WARMUP:
+        warmup.start(data)
 
     st.success("✅ Data loaded successfully!")
 except Exception as e:
     st.error(f"❌ Error loading data: {e}")
     st.stop()
 
-# KPIs (overall)
-total_matches = len(match_df)
-total_years = match_df["Year"].nunique()
-total_teams = df["Team"].nunique()
-total_goals = int(match_df["Total_Goals_in_Match"].sum())
-
 # -------------------------------------------------
 # Sidebar – Questions (Q1–Q6)
 # -------------------------------------------------
@@ -256,11 +246,35 @@ if "logged_in" not in st.session_state:
 if "username" not in st.session_state:
     st.session_state.username = None
 
+# The session token is kept in this session's state and in a cookie, never
+# in the URL, so a reload or reconnect (a new session) resumes from the
+# cookie. auth.resume() answers from memory between store checks, and a
+# logout, an expired token or a removed user ends the session.
+if not st.session_state.logged_in:
+    token = st.context.cookies.get(SESSION_COOKIE)
+    # Each cookie token is tried once per session, not on every rerun (and
+    # only a real cookie: AppTest's mock runtime hands out mock objects)
+    resumed = None
+    if isinstance(token, str) and token != st.session_state.get("cookie_tried"):
+        st.session_state.cookie_tried = token
+        resumed = auth.resume(token)
+    if resumed is not None:
+        st.session_state.logged_in = True
+        st.session_state.username = resumed
+        st.session_state.session_token = token
+elif auth.resume(st.session_state.get("session_token")) is None:
+    st.session_state.logged_in = False
+    st.session_state.username = None
+    st.session_state.session_token = None
+    set_session_cookie(None)
+if st.session_state.pop("clear_session_cookie", False):
+    set_session_cookie(None)
+
 # -------------------------------------------------
 # Tabs
 # -------------------------------------------------
-tab_home, tab_chatbot, tab_login, tab_visuals, tab_dashboard, tab_about = st.tabs(
-    ["🏠 Home", "👽 AI Chatbot", "🔐 Log In", "📈 Visuals", "📊 Dashboard", "ℹ️ About"]
+tab_home, tab_chatbot, tab_login, tab_visuals, tab_dashboard, tab_teams, tab_about = st.tabs(
+    ["🏠 Home", "👽 AI Chatbot", "🔐 Log In", "📈 Visuals", "📊 Dashboard", "🧭 Team Explorer", "ℹ️ About"]
 )
 
 # =================================================
@@ -308,41 +322,25 @@ Navigate through the tabs above to explore <b>dashboards, visuals, raw data, and
 )
 
 
+    st.write("")
+    kpi_strip(engine.kpis(data))
+
     st.write("")
     st.markdown("##### 🌍 Matches by Host Country (Top 5)")
 
-    host_counts = (
-        match_df["Country"]
-        .value_counts()
-        .reset_index()
-    )
-    host_counts.columns = ["Country", "Matches"]
-    host_counts = host_counts.head(5)
-    fig = px.pie(
-        host_counts,
-        values="Matches",
-        names="Country",
-        hole=0.4,)
-    fig.update_layout(
-    paper_bgcolor='rgba(0,0,0,0)',   # chart outer background
-    plot_bgcolor='rgba(0,0,0,0)',     # inside graph background
-    legend=dict(
-        font=dict(color="white"),
-        )
-    )
-    
-    st.plotly_chart(fig, use_container_width=True, key="home_pie")
+    fig = cached_figure("home_pie", "All", data_version, lambda: home_pie(match_df))
+    show_chart(fig, "home_pie")
 
 # =================================================
 # CHATBOT TAB
 # =================================================
 with tab_chatbot:
     st.markdown('<div class="section-title">👽 AI Chatbot</div>', unsafe_allow_html=True)
-    st.write("Ask me about the project, dataset, visuals, and analysis.")
+    st.write("Ask me about the project, dataset, visuals, and analysis — or the numbers, like \"goals in 1998\".")
 
     user_input = st.text_input("**You:** ", "")
     if user_input:
-        response = get_reply(user_input)
+        response = get_reply(user_input, engine.facts(data))
         st.markdown(f"**Bot:** {response}")
 
 # =================================================
@@ -351,12 +349,6 @@ with tab_chatbot:
 with tab_login:
     st.markdown('<div class="section-title">🔐 Log In</div>', unsafe_allow_html=True)
 
-    credentials = {
-        "palak": "palak123",
-        "wine": "wine123",
-        "pass": "pass1",
-    }
-
     if not st.session_state.logged_in:
         st.subheader("Login Required")
         username = st.text_input("Username")
@@ -364,14 +356,26 @@ with tab_login:
         login_button = st.button("Login")
 
         if login_button:
-            if username in credentials and credentials[username] == password:
+            token = auth.login(username, password)
+            if token:
                 st.session_state.logged_in = True
                 st.session_state.username = username
+                st.session_state.session_token = token
+                set_session_cookie(token)
                 st.success(f"🤗 Welcome, {username}!")
             else:
                 st.error("👽 Invalid username or password")
+                if not auth.list_users():
+                    st.caption("No accounts exist yet. Create one with `python auth.py add <username>`.")
     else:
         st.success(f"✅ You are already logged in as {st.session_state.username}")
+        if st.button("Log out"):
+            auth.logout(st.session_state.get("session_token"))
+            st.session_state.logged_in = False
+            st.session_state.username = None
+            st.session_state.session_token = None
+            st.session_state.clear_session_cookie = True
+            st.rerun()
 
 # =================================================
 # VISUALS TAB  (LOCKED UNTIL LOGIN)
@@ -388,137 +392,42 @@ with tab_visuals:
         # Q1 – hosting countries (bar)
         if question.startswith("Q1"):
             st.subheader("Q1: Which countries hosted the World Cup most often?")
-            
-
-            q1 = (
-        match_df.groupby("Country")["Year"]
-        .nunique()
-        .reset_index(name="Times_Hosted")
-        .sort_values("Times_Hosted", ascending=False)
-    )
-
-            fig = px.bar(
-        q1,
-        x="Times_Hosted",
-        y="Country",
-        orientation="h",
-        text="Times_Hosted",
-        color="Times_Hosted",
-        title="Top Hosting Nations",
-    )
-            fig.update_traces(textposition="outside")
-    # Apply your dark theme styling
-            fig = apply_dark_theme(fig, show_legend=False)
-
-            st.plotly_chart(fig, use_container_width=True)
-
+            qid = "q1"
 
         # Q2 – stadium with most games per country (TREEMAP)
         elif question.startswith("Q2"):
             st.subheader("Q2: Which stadium hosts the highest number of games in each country?")
             st.caption("**Stadium Match Frequency(Treemap)**")
-
-            games_per_stadium = (
-                match_df.groupby(["Country", "Stadium"])
-                .size()
-                .reset_index(name="Matches")
-            )
-
-            idx = games_per_stadium.groupby("Country")["Matches"].idxmax()
-            q2 = (
-                games_per_stadium.loc[idx]
-                .sort_values("Matches", ascending=False)
-                .reset_index(drop=True)
-            )
-
-            # Treemap chart
-            fig = px.treemap(
-                q2,
-                path=["Country", "Stadium"],
-                values="Matches",
-                title="Stadium Match Frequency"
-            )
-            #  Enable labels inside treemap blocks
-            fig.update_traces(
-            textinfo="label+value",
-            hovertemplate="<b>%{label}</b><br>Matches: %{value}<extra></extra>")
-            fig = apply_dark_theme(fig, show_legend=True)
-
-            st.plotly_chart(fig, use_container_width=True, key="visual_q2")
+            qid = "q2"
 
         # Q3 – total goals by year (line)
         elif question.startswith("Q3"):
             st.subheader("Q3: How have total goals changed across different World Cups/years?")
             st.caption("**Goals Over Time**")
-
-            goals_per_year = (
-                match_df.groupby("Year")["Total_Goals_in_Match"]
-                .sum()
-                .reset_index(name="Total_Goals")
-                .sort_values("Year")
-            )
-            fig = px.line(
-                goals_per_year,
-                x="Year",
-                y="Total_Goals",
-                markers=True,
-                text="Total_Goals",
-                title="Goals Over Time",
-            )
-            fig.update_traces(marker_color="#430de5", line_color="#d83cfb")
-            fig = apply_dark_theme(fig, show_legend=False)
-
-            st.plotly_chart(fig, use_container_width=True, key="visual_q3")
+            qid = "q3"
 
         # Q4 – team conceding most goals (horizontal bar)
         elif question.startswith("Q4"):
             st.subheader("Q4: Which team conceded the most goals in World Cups?")
-            conceded_per_team = (
-                df.groupby("Team")["Opponent G"].sum().reset_index(name="Goals_Conceded").sort_values("Goals_Conceded", ascending=False)
-                .head(10)
-            )
+            qid = "q4"
 
-            fig = px.bar(conceded_per_team,x="Goals_Conceded",y="Team",
-                color="Goals_Conceded",text="Goals_Conceded",title="Most Goals Conceded",
-            )
-            fig.update_traces(textposition="outside")
-            fig = apply_dark_theme(fig, show_legend=False)
-            st.plotly_chart(fig, use_container_width=True, key="visual_q4")
-
-        # Q5 – stadium with most goals scored (bar, top 15)
+        # Q5 – stadium with most goals scored (bar, top 10)
         elif question.startswith("Q5"):
             st.subheader("Q5: Which stadium has seen the most goals scored?")
-            goals_per_stadium = (
-                match_df.groupby("Stadium")["Total_Goals_in_Match"]
-                .sum()
-                .reset_index(name="Total_Goals")
-                .sort_values("Total_Goals", ascending=False)
-                .head(10)
-            )
-
-            fig = px.bar( goals_per_stadium,x="Total_Goals",y="Stadium",color="Total_Goals",text="Total_Goals",title="Goal-Rich Stadiums",)
-            fig.update_traces(textposition="outside")
-            fig = apply_dark_theme(fig, show_legend=False)
-            st.plotly_chart(fig, use_container_width=True, key="visual_q5")
+            qid = "q5"
 
         # Q6 – rounds with most matches
-        elif question.startswith("Q6"):
+        else:
             st.subheader("Q6: Which rounds had the most matches?")
             st.caption(" **Round Match Density**")
+            qid = "q6"
 
-            matches_per_round = (
-                match_df.groupby("Round")
-                .size()
-                .reset_index(name="Matches")
-                .sort_values("Matches", ascending=False)
-            )
-
-            fig = px.bar(
-                matches_per_round,y="Round", x="Matches", text="Matches",title="Round Match Density",color="Matches"
-            )
-            fig.update_traces(textposition="outside")
-            fig = apply_dark_theme(fig, show_legend=False)
-            st.plotly_chart(fig, use_container_width=True, key="visual_q6")
+        # Themed figures are cached per (chart, filter, dataset version)
+        fig = cached_figure(
+            f"visual_{qid}", "All", data_version,
+            lambda: VISUAL_CHARTS[qid](engine.views(data)),
+        )
+        show_chart(fig, f"visual_{qid}")
 
 # DASHBOARD TAB  (LOCKED UNTIL LOGIN)
 with tab_dashboard:
@@ -528,121 +437,136 @@ with tab_dashboard:
         st.warning("🔒 Please log in to access the Dashboard.")
     else:
         st.markdown("### 🎛 Filters")
-        country_filter = st.selectbox(
-        "Select Host Country",
-        options=["All"] + sorted(match_df["Country"].unique()),
-        index=0,   # "All" pre-selected
-        key="dash_country",
-)
-        
-        filtered_matches = match_df.copy()
-        if country_filter != "All":
-          filtered_matches = filtered_matches[filtered_matches["Country"] == country_filter]
+        options = engine.filter_options(data)
+        f1, f2 = st.columns(2)
+        with f1:
+            country_filter = st.selectbox(
+                "Select Host Country",
+                options=["All"] + options["countries"],
+                index=0,   # "All" pre-selected
+                key="dash_country",
+            )
+        with f2:
+            first_year, last_year = options["years"]
+            if first_year == last_year:
+                # st.slider needs min < max; a single tournament has no range
+                st.caption(f"Years: {first_year} (the only tournament in this dataset)")
+                year_filter = (first_year, last_year)
+            else:
+                year_filter = st.slider(
+                    "Years", min_value=first_year, max_value=last_year,
+                    value=(first_year, last_year), key="dash_years",
+                )
+        f3, f4, f5 = st.columns(3)
+        with f3:
+            team_filter = st.multiselect("Teams", options["teams"], key="dash_teams")
+        with f4:
+            round_filter = st.multiselect("Rounds", options["rounds"], key="dash_rounds")
+        with f5:
+            stadium_filter = st.multiselect("Stadiums", options["stadiums"], key="dash_stadiums")
+
+        filters = (country_filter, tuple(year_filter), tuple(team_filter), tuple(round_filter), tuple(stadium_filter))
+        # Country alone keeps the plain filter value, so it shares cached figures
+        filter_key = country_filter if filters[1:] == ((first_year, last_year), (), (), ()) else repr(filters)
+
+        kpi_strip(engine.kpis(data, *filters))
+        st.markdown("---")
 
-        df_filtered = df[df["Year"].isin(filtered_matches["Year"].unique())]
+        # Aggregates and themed figures are shared across sessions
+        def dashboard_chart(qid):
+            return cached_figure(
+                f"dash_{qid}", filter_key, data_version,
+                lambda: DASHBOARD_CHARTS[qid](engine.filtered_views(data, *filters)),
+            )
 
         # Row 1
         r1c1, r1c2 = st.columns(2)
         with r1c1:
-            purple_shades = ["#c4b5fd", "#a78bfa", "#6d28d9"]
-            q1_dash = (
-                filtered_matches.groupby("Country")["Year"]
-                .nunique()
-                .reset_index(name="Times_Hosted")
-                .sort_values("Times_Hosted", ascending=False)
-            )
-            if not q1_dash.empty:
-                fig = px.bar(q1_dash, x="Country", y="Times_Hosted", text="Times_Hosted",title="Top Hosting Nations",)
-                fig.update_traces(
-                    marker_color=[get_shade_color(purple_shades) for _ in q1_dash["Country"]],
-                    textposition="outside",
-                )
-                fig = apply_dark_theme(fig, show_legend=False)
-                st.plotly_chart(fig, use_container_width=True, key="dash_q1")
+            fig = dashboard_chart("q1")
+            if fig is not None:
+                show_chart(fig, "dash_q1")
         with r1c2:
-            games = (
-                filtered_matches.groupby(["Country", "Stadium"]).size().reset_index(name="Matches")
-            )
-            if not games.empty:
-                idx = games.groupby("Country")["Matches"].idxmax()
-                q2_dash = games.loc[idx].sort_values("Matches", ascending=False)
-                fig = px.bar(q2_dash, x="Stadium", y="Matches", text="Matches", title="Stadium Match Frequency")
-                fig.update_traces(
-                    marker_color=[get_shade_color(purple_shades) for _ in q2_dash["Stadium"]],
-                    textposition="outside",
-                )
-                fig = apply_dark_theme(fig, show_legend=False)
-                st.plotly_chart(fig, use_container_width=True, key="dash_q2")
+            fig = dashboard_chart("q2")
+            if fig is not None:
+                show_chart(fig, "dash_q2")
 
         st.markdown("---")
 
         # Row 2
         r2c1, r2c2 = st.columns(2)
         with r2c1:
-            goals = (
-                filtered_matches.groupby("Year")["Total_Goals_in_Match"]
-                .sum()
-                .reset_index(name="Total_Goals")
-            )
-            if not goals.empty:
-                fig = px.line(goals, x="Year", y="Total_Goals", markers=True,title="Goals Over Time",text="Total_Goals",)
-                fig.update_traces(marker_color="#b91c1c", line_color="#d83cfb")
-                fig = apply_dark_theme(fig, show_legend=False)
-                st.plotly_chart(fig, use_container_width=True, key="dash_q3")
+            fig = dashboard_chart("q3")
+            if fig is not None:
+                show_chart(fig, "dash_q3")
 
         with r2c2:
-            conceded = (
-                df_filtered.groupby("Team")["Opponent G"] .sum().reset_index(name="Goals_Conceded")
-                .sort_values("Goals_Conceded", ascending=False)
-                .head(10)
-            )
-            if not conceded.empty:
-                fig = px.bar(
-                    conceded,
-                    x="Goals_Conceded",
-                    y="Team",
-                    orientation="h",
-                    text="Goals_Conceded",
-                    title="Most Goals Conceded",
-                )
-                fig.update_traces(
-                    marker_color=[get_shade_color(purple_shades) for _ in conceded["Team"]],
-                    textposition="outside",
-                )
-                fig = apply_dark_theme(fig, show_legend=True) 
-                st.plotly_chart(fig, use_container_width=True, key="dash_q4")
+            fig = dashboard_chart("q4")
+            if fig is not None:
+                show_chart(fig, "dash_q4")
 
         st.markdown("---")
         # Row 3 
-        stadium_goals = (
-                filtered_matches.groupby("Stadium")["Total_Goals_in_Match"].sum().reset_index(name="Total_Goals")
-                .sort_values("Total_Goals", ascending=False).head(5))
-        if not stadium_goals.empty:
-                fig = px.bar(stadium_goals, x="Stadium", y="Total_Goals", text="Total_Goals",title="Goal-Rich Stadiums",)
-                fig.update_traces(
-                    marker_color=[get_shade_color(purple_shades) for _ in stadium_goals["Stadium"]],
-                    textposition="outside",
-                )
-                fig = apply_dark_theme(fig, show_legend=False) 
-                st.plotly_chart(fig, use_container_width=True, key="dash_q5")
+        fig = dashboard_chart("q5")
+        if fig is not None:
+            show_chart(fig, "dash_q5")
 
-    # Sort rounds by match count (highest → lowest)
-        rounds = (filtered_matches.groupby("Round").size().reset_index(name="Matches")
-        .sort_values("Matches", ascending=False
-                     )
-    )
-
-        if not rounds.empty:
-            fig = px.bar( rounds,x="Round",y="Matches",text="Matches",title="Round Match Density",
-        )
-            fig.update_traces(
-            marker_color=[get_shade_color(purple_shades) for _ in rounds["Round"]],textposition="outside",
-            )
-            fig = apply_dark_theme(fig, show_legend=False) 
-            st.plotly_chart(fig, use_container_width=True, key="dash_q6")
+        fig = dashboard_chart("q6")
+        if fig is not None:
+            show_chart(fig, "dash_q6")
         else:
             st.info("No round data found for the selected filters.")
 
+# TEAM EXPLORER TAB  (LOCKED UNTIL LOGIN)
+with tab_teams:
+    st.markdown('<div class="section-title">🧭 Team Explorer</div>', unsafe_allow_html=True)
+
+    if not st.session_state.logged_in:
+        st.warning("🔒 Please log in to access the Team Explorer.")
+    else:
+        # Precomputed per dataset version: lookups only touch the team's rows
+        team_index = engine.teams(data)
+        all_teams = team_index.teams()
+        team = st.selectbox(
+            "Select Team", all_teams,
+            index=all_teams.index("Brazil") if "Brazil" in all_teams else 0,
+            key="team_name",
+        )
+
+        record = team_index.record(team)
+        k1, k2, k3, k4, k5, k6 = st.columns(6)
+        k1.metric("Matches", record["Matches"])
+        k2.metric("Wins", record["Wins"])
+        k3.metric("Draws", record["Draws"])
+        k4.metric("Losses", record["Losses"])
+        k5.metric("Goals For / Against", f"{record['Goals_For']} / {record['Goals_Against']}")
+        k6.metric("World Cups", record["Tournaments"])
+        st.caption("Results use the score after extra time; penalty shoot-outs count as draws.")
+
+        fig = cached_figure(
+            "team_progression", team, data_version,
+            lambda: team_progression(team_index.progression(team), team),
+        )
+        if fig is not None:
+            show_chart(fig, "team_progression")
+
+        st.markdown("##### 🤝 Head-to-Head")
+        st.dataframe(team_index.head_to_head(team), hide_index=True, use_container_width=True)
+
+        rivals = st.multiselect(
+            "Compare with",
+            [t for t in all_teams if t != team],
+            default=team_index.head_to_head(team)["Opponent"].head(4).tolist(),
+            key="team_rivals",
+        )
+        h2h_value = st.radio("Show", ["Wins", "Played", "Goals_For"], horizontal=True, key="team_h2h_value")
+        group = [team] + rivals
+        fig = cached_figure(
+            "team_h2h", repr((tuple(group), h2h_value)), data_version,
+            lambda: team_h2h_matrix(team_index.matrix(group, h2h_value), h2h_value),
+        )
+        if fig is not None:
+            show_chart(fig, "team_h2h")
+
 with tab_about:
     st.markdown('<div class="section-title">ℹ️ About</div>', unsafe_allow_html=True)
     st.markdown(
@@ -659,6 +583,63 @@ with tab_about:
         **Dataset:**
         The dataset used contains detailed match results from FIFA World Cups, including information on years, teams, goals scored, stadiums, rounds, and host countries.""")
 
+if st.session_state.logged_in:
+    cache_stats = figure_cache.stats()
+    st.sidebar.caption(
+        f"Figure cache: {cache_stats['hits']} hits / {cache_stats['misses']} misses "
+        f"({cache_stats['size']}/{cache_stats['maxsize']} charts, {static_charts} from exported artifacts)"
+    )
+
+# -------------------------------------------------
+# Performance panel (admins only)
+# -------------------------------------------------
+if st.session_state.logged_in and st.session_state.username in ADMIN_USERS:
+    with st.sidebar.expander("⏱ Performance"):
+        last_rerun = st.session_state.get("last_rerun")
+        if last_rerun:
+            st.caption("Previous rerun")
+            st.dataframe(
+                pd.DataFrame(last_rerun, columns=["Span", "ms"]).round(2),
+                hide_index=True, use_container_width=True,
+            )
+        stats = telemetry.snapshot()
+        if stats:
+            st.caption("All reruns in this process")
+            st.dataframe(
+                pd.DataFrame.from_dict(stats, orient="index")[["count", "p50_ms", "p95_ms", "p99_ms", "max_ms"]].round(2),
+                use_container_width=True,
+            )
+        report = warmup.last_report
+        if report is not None and report["version"] == data_version:
+            if "error" in report:
+                st.caption(f"Warm-up failed: {report['error']}")
+            else:
+                st.caption(
+                    f"Warm-up: {report['countries']} filters, {report['figures']} charts in "
+                    f"{report['wall_ms'] / 1000:.1f}s on {report['workers']} worker(s), "
+                    f"{report['utilization']:.0%} utilization"
+                )
+        elif warmup.WARMUP:
+            st.caption("Warm-up running…")
+        reduced = pushdown.snapshot()
+        if reduced:
+            st.caption("Chart data reduction (rows in → out)")
+            st.dataframe(pd.DataFrame.from_dict(reduced, orient="index"), use_container_width=True)
+        payloads = figure_cache.stats()["payload_bytes"]
+        if payloads:
+            st.caption(
+                f"Chart payloads: {sum(payloads.values()) / 1024:.0f} KiB over {len(payloads)} charts "
+                f"(largest {max(payloads, key=payloads.get)}, {max(payloads.values()) / 1024:.0f} KiB)"
+            )
+        replies = reply_cache.stats()
+        st.caption(
+            f"Chatbot reply cache: {replies['text_hit_rate']:.0%} surface / {replies['lemma_hit_rate']:.0%} lemma "
+            f"hit rate over {replies['text_hits'] + replies['text_misses']} questions, "
+            f"{replies['size']}/{replies['maxsize']} entries"
+        )
+        st.download_button("Export JSON", telemetry.export_json(), "telemetry.json", "application/json")
+        st.download_button("Export Prometheus", telemetry.export_prometheus(), "metrics.prom", "text/plain")
+
 st.markdown(
     """
     <div style='text-align: center; padding: 20px; margin-top: 80px;
@@ -668,3 +649,5 @@ st.markdown(
     """,
     unsafe_allow_html=True
 )
+
+st.session_state.last_rerun = [(name, seconds * 1000) for name, seconds in telemetry.finish_trace()]
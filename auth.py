@@ -0,0 +1,255 @@
+import argparse
+import getpass
+import hashlib
+import hmac
+import os
+import secrets
+import sqlite3
+import sys
+import threading
+import time
+from contextlib import contextmanager
+
+# ------------------------
+# Credential store for the Log In tab
+#
+# Users live in a local SQLite file with salted PBKDF2-SHA256 hashes;
+# passwords are never stored or compared in plain text. Verified logins are
+# remembered in memory (as a keyed HMAC, not the password), so repeat logins
+# skip the deliberately slow hash. The HMAC covers the stored salt and hash,
+# and the user's row is read on every check, so a password changed or a user
+# removed by another process (e.g. `python auth.py`) takes effect at once.
+# A successful login issues a session token. A resumed token is remembered
+# for SESSION_CHECK_TTL seconds, so reruns do not hit the store; after that
+# it is looked up again, which is when a logout or removal made by another
+# process catches up. Changes made in this process apply straight away.
+#
+# The store starts empty; create the first account with
+# `python auth.py add <username>`.
+# ------------------------
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+AUTH_DB = os.environ.get("WORLDCUP_AUTH_DB", os.path.join(BASE_DIR, "auth.db"))
+PBKDF2_ITERATIONS = int(os.environ.get("WORLDCUP_PBKDF2_ITERATIONS", "200000"))
+SESSION_TTL = int(os.environ.get("WORLDCUP_SESSION_TTL", str(7 * 24 * 3600)))  # seconds
+SESSION_CHECK_TTL = float(os.environ.get("WORLDCUP_SESSION_CHECK_TTL", "30"))  # seconds
+SESSION_CACHE_SIZE = 4096
+
+_lock = threading.Lock()
+_ready = set()        # store paths already created by this process
+_verified = {}        # (db, username) -> HMAC of the last verified password and its stored hash
+_sessions = {}        # (db, token hash) -> (username, expires_at, checked_at)
+_cache_key = secrets.token_bytes(32)  # per process; cached HMACs are useless elsewhere
+
+
+@contextmanager
+def _connect(db: str):
+    """Short-lived connection, committed on success and always closed."""
+    con = sqlite3.connect(db, timeout=10)
+    try:
+        with con:
+            yield con
+    finally:
+        con.close()
+
+
+def hash_password(password: str, salt: bytes = None, iterations: int = PBKDF2_ITERATIONS):
+    """(salt, hash) for `password` with PBKDF2-HMAC-SHA256."""
+    salt = salt or secrets.token_bytes(16)
+    return salt, hashlib.pbkdf2_hmac("sha256", password.encode(), salt, iterations)
+
+
+def _token_hash(token: str) -> str:
+    # Only hashes of tokens are stored, so a leaked store cannot resume sessions
+    return hashlib.sha256(token.encode()).hexdigest()
+
+
+def init_store(db: str = AUTH_DB):
+    """Create the tables (once per process); users are added with set_password()."""
+    if db in _ready:
+        return
+    with _lock:
+        if db in _ready:
+            return
+        with _connect(db) as con:
+            # Stored in the database file, so once per database is enough
+            con.execute("PRAGMA journal_mode=WAL")
+            con.execute(
+                "CREATE TABLE IF NOT EXISTS users ("
+                "username TEXT PRIMARY KEY, salt BLOB NOT NULL, hash BLOB NOT NULL, "
+                "iterations INTEGER NOT NULL, created_at REAL NOT NULL)"
+            )
+            con.execute(
+                "CREATE TABLE IF NOT EXISTS sessions ("
+                "token_hash TEXT PRIMARY KEY, username TEXT NOT NULL, expires_at REAL NOT NULL)"
+            )
+        _ready.add(db)
+
+
+def _insert_user(con, username: str, password: str):
+    salt, digest = hash_password(password)
+    con.execute(
+        "INSERT OR REPLACE INTO users (username, salt, hash, iterations, created_at) VALUES (?, ?, ?, ?, ?)",
+        (username, salt, digest, PBKDF2_ITERATIONS, time.time()),
+    )
+
+
+# ------------------------
+# Users
+# ------------------------
+def set_password(username: str, password: str, db: str = AUTH_DB):
+    """Add a user or replace their password."""
+    init_store(db)
+    with _connect(db) as con:
+        _insert_user(con, username, password)
+    forget(username, db)
+
+
+def remove_user(username: str, db: str = AUTH_DB):
+    init_store(db)
+    with _connect(db) as con:
+        con.execute("DELETE FROM users WHERE username = ?", (username,))
+        con.execute("DELETE FROM sessions WHERE username = ?", (username,))
+    forget(username, db, sessions=True)
+
+
+def list_users(db: str = AUTH_DB) -> list:
+    init_store(db)
+    with _connect(db) as con:
+        return [row[0] for row in con.execute("SELECT username FROM users ORDER BY username").fetchall()]
+
+
+def _user(username: str, db: str):
+    # Always read from the store: another process may have changed the user
+    with _connect(db) as con:
+        return con.execute(
+            "SELECT salt, hash, iterations FROM users WHERE username = ?", (username,)
+        ).fetchone()
+
+
+def verify(username: str, password: str, db: str = AUTH_DB) -> bool:
+    """Check a username/password pair in constant time."""
+    init_store(db)
+    record = _user(username, db)
+    if record is None:
+        # Hash anyway, so unknown usernames take as long as wrong passwords
+        hash_password(password)
+        return False
+    salt, expected, iterations = record
+    # Bound to the stored salt and hash, so it stops matching once they change
+    remembered = hmac.new(_cache_key, password.encode() + salt + expected, "sha256").digest()
+    cached = _verified.get((db, username))
+    if cached is not None and hmac.compare_digest(cached, remembered):
+        return True
+    if not hmac.compare_digest(hash_password(password, salt, iterations)[1], expected):
+        return False
+    _verified[(db, username)] = remembered
+    return True
+
+
+# ------------------------
+# Sessions
+# ------------------------
+def login(username: str, password: str, db: str = AUTH_DB):
+    """Session token for valid credentials, else None."""
+    if not verify(username, password, db):
+        return None
+    token = secrets.token_urlsafe(32)
+    expires_at = time.time() + SESSION_TTL
+    token_hash = _token_hash(token)
+    with _connect(db) as con:
+        con.execute("DELETE FROM sessions WHERE expires_at < ?", (time.time(),))
+        con.execute(
+            "INSERT INTO sessions (token_hash, username, expires_at) VALUES (?, ?, ?)",
+            (token_hash, username, expires_at),
+        )
+    return token
+
+
+def resume(token: str, db: str = AUTH_DB, max_age: float = None):
+    """Username of a live session token, else None.
+
+    A token checked against the store less than `max_age` seconds ago
+    (default SESSION_CHECK_TTL) is answered from memory.
+    """
+    if not token:
+        return None
+    key = (db, _token_hash(token))
+    now = time.time()
+    cached = _sessions.get(key)
+    if cached is not None:
+        username, expires_at, checked_at = cached
+        if now - checked_at < (SESSION_CHECK_TTL if max_age is None else max_age) and expires_at >= now:
+            return username
+    init_store(db)
+    with _connect(db) as con:
+        session = con.execute(
+            "SELECT username, expires_at FROM sessions WHERE token_hash = ?", (key[1],)
+        ).fetchone()
+    if session is None:
+        with _lock:
+            _sessions.pop(key, None)
+        return None
+    username, expires_at = session
+    if expires_at < now:
+        logout(token, db)
+        return None
+    with _lock:
+        if len(_sessions) >= SESSION_CACHE_SIZE:
+            for stale in [k for k, v in _sessions.items() if now - v[2] >= SESSION_CHECK_TTL]:
+                del _sessions[stale]
+        _sessions[key] = (username, expires_at, now)
+    return username
+
+
+def logout(token: str, db: str = AUTH_DB):
+    if not token:
+        return
+    init_store(db)
+    token_hash = _token_hash(token)
+    with _connect(db) as con:
+        con.execute("DELETE FROM sessions WHERE token_hash = ?", (token_hash,))
+    with _lock:
+        _sessions.pop((db, token_hash), None)
+
+
+def forget(username: str, db: str = AUTH_DB, sessions: bool = False):
+    """Drop this process's remembered login for `username` (and its session checks)."""
+    with _lock:
+        _verified.pop((db, username), None)
+        if sessions:
+            for key in [k for k, v in _sessions.items() if k[0] == db and v[0] == username]:
+                del _sessions[key]
+
+
+def clear_cache():
+    with _lock:
+        _verified.clear()
+        _sessions.clear()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Manage dashboard users")
+    parser.add_argument("--db", default=AUTH_DB)
+    sub = parser.add_subparsers(dest="command", required=True)
+    p_add = sub.add_parser("add", help="add a user or change their password")
+    p_add.add_argument("username")
+    p_remove = sub.add_parser("remove", help="delete a user and their sessions")
+    p_remove.add_argument("username")
+    sub.add_parser("list", help="list usernames")
+    args = parser.parse_args(argv)
+
+    if args.command == "add":
+        password = getpass.getpass(f"Password for {args.username}: ")
+        if not password or password != getpass.getpass("Repeat: "):
+            print("Passwords are empty or do not match")
+            return 1
+        set_password(args.username, password, args.db)
+    elif args.command == "remove":
+        remove_user(args.username, args.db)
+    else:
+        print("\n".join(list_users(args.db)))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
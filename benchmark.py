@@ -0,0 +1,1007 @@
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+import tracemalloc
+
+# ------------------------
+# Cold-start budget for the modules imported at the top of app.py
+# Each module is imported in a fresh interpreter (best of N runs), after its
+# heavy third-party dependencies are already loaded, so the number is the
+# cost the module itself adds to the first page render. The module list is
+# read from app.py's imports, so a newly imported module is covered too.
+# ------------------------
+APP_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "app.py")
+HEAVY_DEPENDENCIES = ("pandas", "numpy", "plotly.express")
+
+STARTUP_MODULES = {
+    # module: (preloaded dependencies, budget in ms or None to only report)
+    "streamlit": ((), None),
+    "pandas": ((), None),
+    "plotly.express": (("pandas",), None),
+    "data_loader": (("pandas",), 50),
+    "aggregates": (("pandas",), 50),
+    "chatbot": ((), 25),
+    "telemetry": (HEAVY_DEPENDENCIES, 10),
+    "pushdown": (HEAVY_DEPENDENCIES, 10),
+    "figure_cache": (HEAVY_DEPENDENCIES, 10),
+}
+# Budget of a project module imported by app.py that has no entry above
+DEFAULT_STARTUP = (HEAVY_DEPENDENCIES, 50)
+
+# Modules that must not be pulled in by importing the key module
+STARTUP_FORBIDDEN = {
+    "chatbot": ("nltk",),
+    "engine": ("duckdb",),         # only with WORLDCUP_BACKEND=duckdb
+    "static_export": ("kaleido",),  # only for PNG export
+    "warmup": ("concurrent.futures.process",),
+}
+
+
+def app_imports(path: str = APP_PATH) -> list:
+    """Modules app.py imports at the top level, in order."""
+    import ast
+
+    with open(path, encoding="utf-8") as f:
+        tree = ast.parse(f.read())
+    modules = []
+    for node in tree.body:
+        if isinstance(node, ast.Import):
+            modules.extend(alias.name for alias in node.names)
+        elif isinstance(node, ast.ImportFrom) and node.level == 0:
+            modules.append(node.module)
+    return list(dict.fromkeys(modules))
+
+
+def startup_modules(path: str = APP_PATH) -> dict:
+    """STARTUP_MODULES plus every other non-stdlib module app.py imports (project modules get DEFAULT_STARTUP)."""
+    modules = dict(STARTUP_MODULES)
+    here = os.path.dirname(os.path.abspath(path))
+    for module in app_imports(path):
+        if module in modules or module.split(".")[0] in sys.stdlib_module_names:
+            continue
+        local = os.path.exists(os.path.join(here, module.split(".")[0] + ".py"))
+        modules[module] = DEFAULT_STARTUP if local else ((), None)
+    return modules
+
+
+_IMPORT_PROBE = """
+import sys, time, json
+for dep in {deps!r}:
+    __import__(dep)
+t = time.perf_counter()
+__import__({module!r})
+elapsed = (time.perf_counter() - t) * 1000
+print(json.dumps({{"ms": elapsed, "loaded": [m for m in {forbidden!r} if m in sys.modules]}}))
+"""
+
+
+def measure_import(module: str, deps=(), forbidden=(), runs: int = 3) -> dict:
+    best = None
+    loaded = []
+    for _ in range(runs):
+        code = _IMPORT_PROBE.format(deps=tuple(deps), module=module, forbidden=tuple(forbidden))
+        out = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True)
+        result = json.loads(out.stdout.strip().splitlines()[-1])
+        best = result["ms"] if best is None else min(best, result["ms"])
+        loaded = result["loaded"]
+    return {"module": module, "ms": round(best, 2), "forbidden_loaded": loaded}
+
+
+def startup(runs: int = 3) -> list:
+    """Measure app import cold start; returns a list of budget violations."""
+    failures = []
+    for module, (deps, budget) in startup_modules().items():
+        try:
+            result = measure_import(module, deps, STARTUP_FORBIDDEN.get(module, ()), runs)
+        except subprocess.CalledProcessError as e:
+            print(f"{module:<16} import failed: {e.stderr.strip().splitlines()[-1]}")
+            failures.append(module)
+            continue
+        budget_txt = f"budget {budget} ms" if budget is not None else "report only"
+        print(f"{module:<16} {result['ms']:>9.2f} ms   ({budget_txt})")
+        if budget is not None and result["ms"] > budget:
+            failures.append(module)
+        if result["forbidden_loaded"]:
+            print(f"{module:<16} eagerly imported {', '.join(result['forbidden_loaded'])}")
+            failures.append(module)
+    return failures
+
+
+# ------------------------
+# Memory footprint of the loaded frames (compact schema vs plain read)
+# ------------------------
+def memory(path: str = None) -> dict:
+    import data_loader
+    from schema import memory_report
+
+    path = path or data_loader.DATA_PATH
+    df, match_df, version = data_loader.load_data(path)
+    frames = {"df": df, "match_df": match_df}
+    if not os.path.isdir(path):
+        # Same source read without the compact schema, for comparison
+        raw = data_loader._read_source(path, version)
+        raw["Total_Goals_in_Match"] = raw["Team G"] + raw["Opponent G"]
+        frames["df (plain)"] = raw
+        frames["match_df (plain)"] = raw.drop_duplicates(subset=["Year", "Game #"])
+    report = memory_report(frames)
+    for name, info in report.items():
+        print(f"{name:<18} {info['rows']:>10} rows {info['bytes'] / 1024:>10.1f} KiB")
+    return report
+
+
+# ------------------------
+# Engine benchmark: load, per-question latency and memory on the shipped
+# workbook and on scaled copies of it, written as a JSON report that can be
+# compared across commits.
+# ------------------------
+DEFAULT_SCALES = (1, 10, 100, 1000)
+REGRESSION_THRESHOLD = 1.25  # flag timings that got >25% slower...
+REGRESSION_MIN_MS = 1.0      # ...and by more than this much (ignore timer noise)
+
+
+def _timed(fn, repeat: int = 5) -> float:
+    """Median wall time of fn() in milliseconds."""
+    samples = []
+    for _ in range(repeat):
+        t = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - t) * 1000)
+    return round(statistics.median(samples), 3)
+
+
+def _git_commit() -> str:
+    try:
+        out = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                             cwd=os.path.dirname(os.path.abspath(__file__)))
+        return out.stdout.strip() or "unknown"
+    except OSError:
+        return "unknown"
+
+
+def _scan_select(data, country, years, teams, rounds, stadiums):
+    m = data.match_df
+    mask = (m["Country"] == country) & m["Year"].between(*years)
+    mask &= m["Team"].isin(teams) | m["Opponent"].isin(teams)
+    mask &= m["Round"].isin(rounds)
+    if stadiums:
+        mask &= m["Stadium"].isin(stadiums)
+    selected = m[mask]
+    return mask, data.df.set_index(["Year", "Game #"]).index.isin(selected.set_index(["Year", "Game #"]).index)
+
+
+def bench_scale(factor: int, repeat: int = 5) -> dict:
+    import aggregates
+    import bitmap_index
+    import charts
+    import data_loader
+    import engine
+    from schema import frame_memory
+
+    results = {}
+    if factor == 1:
+        import pandas as pd
+
+        path = data_loader.DATA_PATH
+        if path.endswith((".xlsx", ".xlsm")):
+            results["xlsx_parse_ms"] = _timed(lambda: pd.read_excel(path), repeat=1)
+
+        def cold_load():
+            data_loader.clear_cache()
+            data_loader.load_data(path)
+        results["cached_load_ms"] = _timed(cold_load, repeat)
+
+    raw = engine.scale_raw(engine.raw_frame(), factor)
+    results["team_rows"] = len(raw)
+
+    tracemalloc.start()
+    t = time.perf_counter()
+    data = engine.from_frame(raw.copy(), f"bench-{factor}x")
+    results["derive_ms"] = round((time.perf_counter() - t) * 1000, 3)
+    t = time.perf_counter()
+    # Builds the cube (no delta for a fresh version) and keeps it for the lookups below
+    aggregates.get_cube(data.match_df, data.df, data.version)
+    results["cube_build_ms"] = round((time.perf_counter() - t) * 1000, 3)
+    results["build_peak_bytes"] = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+
+    results["matches"] = len(data.match_df)
+    results["frames_bytes"] = frame_memory(data.df) + frame_memory(data.match_df)
+
+    country = engine.countries(data)[0]
+    results["filter_path_ms"] = _timed(lambda: engine.filter_matches(data, country), repeat)
+    results["live_all_ms"] = _timed(lambda: aggregates.live_aggregates(data.match_df, data.df), repeat)
+    results["live_country_ms"] = _timed(lambda: aggregates.live_aggregates(data.match_df, data.df, country), repeat)
+
+    # Dashboard multi-filter: bitmap intersections vs. the same filter as frame scans
+    opts = engine.filter_options(data)
+    first, last = opts["years"]
+    combo = (country, (first, (first + last) // 2), opts["teams"][:3], opts["rounds"][:2], ())
+    results["index_build_ms"] = _timed(lambda: bitmap_index.MatchIndex(data.match_df, data.df), 1)
+    results["bitmap_select_ms"] = _timed(lambda: engine.select(data, *combo), repeat)
+    results["scan_select_ms"] = _timed(lambda: _scan_select(data, *combo), repeat)
+    results["filtered_views_ms"] = _timed(lambda: engine.filtered_views(data, *combo), repeat)
+
+    for qid in engine.QUESTIONS:
+        results[f"{qid}_lookup_ms"] = _timed(lambda: engine.question(data, qid, country), repeat)
+        view = engine.views(data)
+        results[f"{qid}_chart_ms"] = _timed(lambda: charts.VISUAL_CHARTS[qid](view), repeat)
+    return results
+
+
+def run_engine_bench(scales=DEFAULT_SCALES, repeat: int = 5) -> dict:
+    import pandas as pd
+
+    report = {
+        "meta": {
+            "commit": _git_commit(),
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "python": platform.python_version(),
+            "pandas": pd.__version__,
+            "machine": platform.machine(),
+        },
+        "results": {},
+    }
+    for factor in scales:
+        print(f"-- {factor}x")
+        results = bench_scale(factor, repeat)
+        report["results"][f"{factor}x"] = results
+        for name, value in results.items():
+            print(f"   {name:<20} {value}")
+    return report
+
+
+def compare_reports(baseline: dict, current: dict, threshold: float = REGRESSION_THRESHOLD) -> list:
+    """Timing metrics (`*_ms`) that are `threshold` times slower than baseline."""
+    regressions = []
+    for scale, results in current["results"].items():
+        base = baseline.get("results", {}).get(scale, {})
+        for name, value in results.items():
+            old = base.get(name)
+            if not name.endswith("_ms") or not old:
+                continue
+            ratio = value / old
+            slower = ratio > threshold and value - old > REGRESSION_MIN_MS
+            flag = "  REGRESSION" if slower else ""
+            print(f"{scale:>6} {name:<20} {old:>10.3f} -> {value:>10.3f} ms  x{ratio:.2f}{flag}")
+            if flag:
+                regressions.append((scale, name, round(ratio, 2)))
+    return regressions
+
+
+# ------------------------
+# Production-scale pipeline profile on generated data
+# ------------------------
+def pipeline(rows: int, fmt: str = "parquet", workdir: str = None) -> dict:
+    import tempfile
+
+    import aggregates
+    import data_loader
+    import generate_data
+    from schema import frame_memory
+
+    workdir = workdir or tempfile.mkdtemp(prefix="wc-bench-")
+    path = os.path.join(workdir, f"synthetic-{rows}.{fmt}")
+    results = {"rows": rows}
+
+    t = time.perf_counter()
+    generate_data.write(generate_data.generate_chunks(rows), path, log=lambda msg: None)
+    results["generate_s"] = round(time.perf_counter() - t, 3)
+
+    def step(name, fn):
+        t = time.perf_counter()
+        value = fn()
+        results[f"{name}_s"] = round(time.perf_counter() - t, 3)
+        print(f"   {name:<12} {results[f'{name}_s']:>9.3f} s")
+        return value
+
+    raw = step("read", lambda: data_loader._read_source(path, data_loader.dataset_version(path)))
+    df, match_df = step("dedup", lambda: data_loader.derive_frames(raw))
+    partials = step("groupby", lambda: aggregates.compute_partials(match_df, df))
+    step("cube", lambda: aggregates.build_cube(match_df, df, partials))
+    results["frames_bytes"] = frame_memory(df) + frame_memory(match_df)
+    print(f"   {'memory':<12} {results['frames_bytes'] / 2**20:>9.1f} MiB")
+    return results
+
+
+# ------------------------
+# Source refresh: appended rows are folded in as a delta, any other edit
+# (changed score, removed row, row added to a known match) reloads fully
+# ------------------------
+def refresh_check(factor: int = 1, workdir: str = None) -> list:
+    """Edit a CSV copy of the data in several ways; returns the cases that went wrong."""
+    import tempfile
+
+    import pandas as pd
+
+    import data_loader
+    import engine
+
+    raw = engine.scale_raw(engine.raw_frame(), factor)
+    last = raw["Year"].max()
+    history = raw[raw["Year"] < last]
+    edited = raw.copy()
+    edited.loc[0, "Team G"] += 10
+    extra = raw.head(1).assign(Team="Atlantis")  # third team row for the first match
+    cases = [
+        # (name, rows written, expected incremental)
+        ("append", raw, True),
+        ("edit score", edited, False),
+        ("remove row", raw.iloc[1:], False),
+        ("add to known match", pd.concat([raw, extra], ignore_index=True), False),
+    ]
+
+    workdir = workdir or tempfile.mkdtemp(prefix="wc-refresh-")
+    failures = []
+    for name, rows, incremental in cases:
+        path = os.path.join(workdir, f"{name.replace(' ', '_')}.csv")
+        history.to_csv(path, index=False)
+        data_loader.load_data(path)
+        rows.to_csv(path, index=False)
+        t = time.perf_counter()
+        result = data_loader.refresh_data(path)
+        ms = (time.perf_counter() - t) * 1000
+        df, match_df, _ = data_loader.load_data(path)
+        fresh_df, fresh_match = data_loader.derive_frames(pd.read_csv(path))
+        ok = (result["changed"] and result["incremental"] == incremental
+              and len(df) == len(fresh_df) and len(match_df) == len(fresh_match)
+              and match_df["Total_Goals_in_Match"].sum() == fresh_match["Total_Goals_in_Match"].sum()
+              and df["Opponent G"].sum() == fresh_df["Opponent G"].sum())
+        print(f"   {name:<20} {'delta' if result['incremental'] else 'full':<6} {ms:9.1f} ms  "
+              f"{'OK' if ok else 'MISMATCH'}")
+        if not ok:
+            failures.append((factor, name))
+    return failures
+
+
+# ------------------------
+# Aggregate cube vs. live computation, for a full build and for a cube
+# folded from an appended delta (the last tournament arriving later)
+# ------------------------
+def consistency(scales=(1, 10), workdir: str = None) -> list:
+    """Returns [(scale, build, country, question), ...] where the cube differs from the frames."""
+    import tempfile
+
+    import aggregates
+    import data_loader
+    import engine
+
+    workdir = workdir or tempfile.mkdtemp(prefix="wc-consistency-")
+    mismatches = []
+    for factor in scales:
+        raw = engine.scale_raw(engine.raw_frame(), factor)
+        path = os.path.join(workdir, f"results-{factor}x.csv")
+        raw[raw["Year"] < raw["Year"].max()].to_csv(path, index=False)
+        df, match_df, version = data_loader.load_data(path)
+        t = time.perf_counter()
+        cube = aggregates.get_cube(match_df, df, version)
+        full_ms = (time.perf_counter() - t) * 1000
+        found = [(factor, "full") + m for m in aggregates.check_consistency(cube, match_df, df)]
+
+        raw.to_csv(path, index=False)
+        df, match_df, version = data_loader.load_data(path)
+        if data_loader.delta_for(version) is None:
+            found.append((factor, "delta", aggregates.ALL, "not loaded as a delta"))
+        t = time.perf_counter()
+        cube = aggregates.get_cube(match_df, df, version)
+        fold_ms = (time.perf_counter() - t) * 1000
+        found += [(factor, "delta") + m for m in aggregates.check_consistency(cube, match_df, df)]
+
+        print(f"   {factor:>4}x ({len(df):>8} rows, {len(cube['views'])} views)  full build {full_ms:8.1f} ms  "
+              f"delta fold {fold_ms:8.1f} ms  check {'OK' if not found else found[:3]}")
+        mismatches.extend(found)
+    mismatches.extend(split_host_check())
+    return mismatches
+
+
+def split_host_check() -> list:
+    """Cube, bitmap-index and DuckDB paths on a tournament with two host countries.
+
+    A filter that selects every row (all rounds) must not change any result,
+    whichever path serves it. Returns [("split-host", path, country, question), ...].
+    """
+    import aggregates
+    import engine
+    import sql_backend
+
+    raw = engine.raw_frame()
+    last = raw["Year"].max()
+    raw["Country"] = raw["Country"].astype(str)
+    raw.loc[(raw["Year"] == last) & (raw["Game #"] % 2 == 1), "Country"] = "Splitland"
+    data = engine.from_frame(raw, "split-host")
+
+    cube = aggregates.get_cube(data.match_df, data.df, data.version)
+    found = [("split-host", "cube") + m for m in aggregates.check_consistency(cube, data.match_df, data.df)]
+    rounds = engine.filter_options(data)["rounds"]
+    for country in [aggregates.ALL] + engine.countries(data):
+        by_cube = engine.filtered_views(data, country, backend="pandas")
+        by_index = engine.filtered_views(data, country, rounds=rounds, backend="pandas")
+        found += [("split-host", "index", country, q) for q in aggregates.QUESTIONS
+                  if not aggregates._same_frame(by_cube[q], by_index[q])]
+    if sql_backend.available():
+        combos = [(aggregates.ALL, None, (), rounds)]
+        found += [("split-host", "duckdb") + m for m in sql_backend.check_parity(data, combos)]
+    print(f"   split-host {last} ({len(engine.countries(data))} host countries)  "
+          f"check {'OK' if not found else found[:3]}")
+    return found
+
+
+# ------------------------
+# pandas vs. DuckDB backend: parity + latency
+# ------------------------
+def backends(scales=DEFAULT_SCALES, repeat: int = 5) -> list:
+    """Time both backends per scale; returns parity mismatches."""
+    import engine
+    import sql_backend
+
+    mismatches = []
+    raw = engine.raw_frame()
+    for factor in scales:
+        data = engine.from_frame(engine.scale_raw(raw, factor), f"backends-{factor}x")
+        opts = engine.filter_options(data)
+        first, last = opts["years"]
+        country = engine.countries(data)[0]
+        combos = [
+            (country, (first, (first + last) // 2), opts["teams"][:3], opts["rounds"][:2], ()),
+            (engine.ALL, None, (), opts["rounds"][:1], opts["stadiums"][:5]),
+        ]
+        print(f"-- {factor}x ({len(data.df)} team rows)")
+        t = time.perf_counter()
+        sql_backend.register(data.version, data.df)
+        sql_backend.connection(data.version).close()
+        print(f"   {'duckdb load':<22} {(time.perf_counter() - t) * 1000:>10.3f} ms")
+        for name, combo in [("all", (engine.ALL,)), ("country", (country,)), ("multi-filter", combos[0])]:
+            for backend in ("pandas", "duckdb"):
+                ms = _timed(lambda: engine.filtered_views(data, *combo, backend=backend), repeat)
+                print(f"   {name + ' ' + backend:<22} {ms:>10.3f} ms")
+        found = sql_backend.check_parity(data, combos)
+        print(f"   parity: {'OK' if not found else found}")
+        mismatches.extend((factor,) + m for m in found)
+    return mismatches
+
+
+# ------------------------
+# Login verification throughput under concurrent sessions
+# ------------------------
+def auth_throughput(sessions=(1, 4, 16), logins: int = 64, db: str = None) -> dict:
+    """Logins/s for cold (PBKDF2) and cached verification and token resumes."""
+    import tempfile
+    from concurrent.futures import ThreadPoolExecutor
+
+    import auth
+
+    db = db or os.path.join(tempfile.mkdtemp(prefix="worldcup-auth-"), "auth.db")
+    users = {f"user{i:03d}": f"secret-{i}" for i in range(max(sessions))}
+    for username, password in users.items():
+        auth.set_password(username, password, db)
+    names = list(users)
+
+    def rate(fn, n, workers):
+        t = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            results = list(pool.map(fn, range(n)))
+        assert all(results), "verification failed"
+        return round(n / (time.perf_counter() - t), 1)
+
+    def cold(i):
+        auth.forget(names[i % workers], db)
+        return auth.verify(names[i % workers], users[names[i % workers]], db)
+
+    def cached(i):
+        return auth.verify(names[i % workers], users[names[i % workers]], db)
+
+    results = {}
+    for workers in sessions:
+        tokens = [auth.login(name, users[name], db) for name in names[:workers]]
+        results[workers] = {
+            "cold_per_s": rate(cold, logins, workers),
+            "cached_per_s": rate(cached, logins * 100, workers),
+            "resume_per_s": rate(lambda i: auth.resume(tokens[i % workers], db), logins * 100, workers),
+            "resume_store_per_s": rate(lambda i: auth.resume(tokens[i % workers], db, max_age=0), logins * 10, workers),
+        }
+        print(f"   {workers:>3} sessions  " + "  ".join(f"{k} {v:>10}" for k, v in results[workers].items()))
+    return results
+
+
+def auth_revocation(db: str = None) -> list:
+    """Change a password and remove a user from another process; returns what still got in."""
+    import tempfile
+
+    import auth
+
+    db = db or os.path.join(tempfile.mkdtemp(prefix="worldcup-auth-"), "auth.db")
+    auth.set_password("alice", "old-secret", db)
+    auth.set_password("bob", "bob-secret", db)
+    assert auth.verify("alice", "old-secret", db)  # now remembered by this process
+    token = auth.login("bob", "bob-secret", db)
+    assert auth.resume(token, db) == "bob"
+
+    code = ("import auth; auth.set_password('alice', 'new-secret', {db!r}); "
+            "auth.remove_user('bob', {db!r})").format(db=db)
+    subprocess.run([sys.executable, "-c", code], check=True, cwd=os.path.dirname(os.path.abspath(__file__)))
+    failures = []
+    if auth.verify("alice", "old-secret", db):
+        failures.append("old password after change")
+    if not auth.verify("alice", "new-secret", db):
+        failures.append("new password rejected")
+    if auth.verify("bob", "bob-secret", db):
+        failures.append("removed user logged in")
+    # Within SESSION_CHECK_TTL the token is answered from memory; max_age=0
+    # is the check made once that window has passed
+    if auth.resume(token, db, max_age=0):
+        failures.append("removed user's session resumed")
+    print(f"   revocation from another process: {'OK' if not failures else ', '.join(failures)}")
+    return failures
+
+
+# ------------------------
+# Chatbot intent retrieval: BM25 index vs. the former token-overlap matcher
+# ------------------------
+# Paraphrased questions and the corpus key that should answer them
+CHATBOT_EVAL = [
+    ("which nation hosted the most tournaments", "which country hosted most world cups"),
+    ("what country hosted the world cup most often", "which country hosted most world cups"),
+    ("who hosted most", "which country hosted most world cups"),
+    ("tell me about hosting countries", "hosting nation"),
+    ("which venue held the most games", "most matches stadium"),
+    ("stadium ranking", "stadium analysis"),
+    ("how did goals change over the years", "goals over time"),
+    ("scoring trend per edition", "goal trend"),
+    ("which team let in the most goals", "team conceded most goals"),
+    ("worst defence", "worst defense team"),
+    ("what arenas saw the most scoring", "stadiums with most goals"),
+    ("goal rich venues", "goal rich stadiums"),
+    ("which stage had most matches", "which round has most matches"),
+    ("round breakdown", "round analysis"),
+    ("how do i use the dashboard", "how to use dashboard"),
+    ("help with the dashboard filters", "dashboard help"),
+    ("what data does this use", "dataset used"),
+    ("where does the data come from", "where data comes from"),
+    ("what is this app", "what is this project"),
+    ("what does the application do", "what does this application do"),
+    ("hello there", "hello"),
+    ("thanks a lot", "thank you"),
+    ("goodbye", "bye"),
+]
+# Phrasings kept out of the tuning of chatbot.SYNONYMS, so the gain from the
+# synonym map and from ranking can be told apart. The map is frozen against
+# this list: do not add synonyms to make one of these match.
+CHATBOT_HELDOUT = [
+    ("which countries organised the most cups", "which country hosted most world cups"),
+    ("list the host countries", "hosting nation"),
+    ("busiest stadium", "most matches stadium"),
+    ("rank the stadiums", "stadium analysis"),
+    ("goals per year", "goal trend"),
+    ("how has scoring changed over time", "goals over time"),
+    ("which side conceded the most", "team conceded most goals"),
+    ("weakest defense", "worst defense team"),
+    ("stadiums where most goals were scored", "stadiums with most goals"),
+    ("rounds with the most matches", "which round has most matches"),
+    ("analysis by round", "round analysis"),
+    ("how does the dashboard work", "how to use dashboard"),
+    ("what dataset is this", "dataset used"),
+    ("what is the project about", "about project"),
+    ("hi there", "hi"),
+    ("thank you so much", "thank you"),
+    ("which country has been host the most times", "which country hosted most world cups"),
+    ("most frequent host country", "which country hosted most world cups"),
+    ("who hosted the cup most", "which country hosted most world cups"),
+    ("show me the host countries", "hosting nation"),
+    ("countries that hosted", "hosting nation"),
+    ("which stadium had the most matches", "most matches stadium"),
+    ("stadium with the most games played", "most matches stadium"),
+    ("where were the most matches played", "most matches stadium"),
+    ("compare stadiums", "stadium analysis"),
+    ("stadium stats", "stadium analysis"),
+    ("how many goals each world cup", "goals over time"),
+    ("goals by year", "goals over time"),
+    ("total goals per tournament", "goals over time"),
+    ("is scoring going up or down", "goal trend"),
+    ("trend in goals", "goal trend"),
+    ("who let in the most goals", "team conceded most goals"),
+    ("team with the most goals against", "team conceded most goals"),
+    ("most goals conceded", "team conceded most goals"),
+    ("which team has the worst defense", "worst defense team"),
+    ("leakiest defense", "worst defense team"),
+    ("stadiums with the highest scoring", "goal rich stadiums"),
+    ("where were the most goals scored", "stadiums with most goals"),
+    ("top goal stadiums", "stadiums with most goals"),
+    ("which round had the most games", "which round has most matches"),
+    ("matches per round", "round analysis"),
+    ("break down the rounds", "round analysis"),
+    ("how do i filter the dashboard", "dashboard help"),
+    ("help me with the filters", "dashboard help"),
+    ("how do i use this", "how to use dashboard"),
+    ("instructions for the dashboard", "how to use dashboard"),
+    ("what data is used", "dataset used"),
+    ("which dataset do you use", "dataset used"),
+    ("source of the data", "where data comes from"),
+    ("where is the data from", "where data comes from"),
+    ("what is this", "what is this project"),
+    ("tell me about this project", "about project"),
+    ("what can this application do", "what does this application do"),
+    ("what does it do", "what does this application do"),
+    ("who won the cup", "who won the world cup"),
+    ("world cup winners", "who won the world cup"),
+    ("who won the final", "who won the world cup"),
+    ("team with the most titles", "which team won most titles"),
+    ("who has won the most world cups", "which team won most titles"),
+    ("how did the teams do", "team performance"),
+    ("team results", "team performance"),
+    ("hey there", "hey"),
+    ("hello bot", "hello"),
+    ("thanks", "thank you"),
+    ("see you later bye", "bye"),
+]
+
+
+def _overlap_matcher(entries, synonyms: bool = False):
+    """The matcher chatbot.py used before BM25: most shared lemmas wins.
+
+    With `synonyms`, lemmas go through chatbot.SYNONYMS like the BM25 index's.
+    """
+    import chatbot
+
+    tokenize, lemmatize = chatbot._get_nlp()
+
+    def lemmas(text):
+        found = (lemmatize(t) for t in tokenize(text.lower()) if t.isalpha())
+        return set(chatbot._expand(found) if synonyms else found)
+
+    keys = list(entries)
+    postings = {}
+    for position, key in enumerate(keys):
+        for token in lemmas(key):
+            postings.setdefault(token, []).append(position)
+
+    def match(question):
+        scores = {}
+        for token in lemmas(question):
+            for position in postings.get(token, ()):
+                scores[position] = scores.get(position, 0) + 1
+        if not scores:
+            return None
+        return keys[min(scores, key=lambda p: (-scores[p], p))]
+    return match
+
+
+def _same_answer(matched, expected) -> bool:
+    """Whether the matched intent gives the expected one's reply.
+
+    Keys in chatbot.DATA_INTENTS that share a topic are answered alike.
+    """
+    import chatbot
+
+    if matched == expected:
+        return True
+    topic = chatbot.DATA_INTENTS.get(expected)
+    return topic is not None and chatbot.DATA_INTENTS.get(matched) == topic
+
+
+def _sign_test(wins: int, losses: int) -> float:
+    """Two-sided exact sign test p-value for paired wins/losses (ties dropped)."""
+    from math import comb
+
+    n = wins + losses
+    if n == 0:
+        return 1.0
+    tail = sum(comb(n, k) for k in range(min(wins, losses) + 1)) / 2 ** n
+    return min(1.0, 2 * tail)
+
+
+def _latencies(fn, items) -> dict:
+    out = []
+    for item in items:
+        t = time.perf_counter()
+        fn(item)
+        out.append((time.perf_counter() - t) * 1000)
+    out.sort()
+    return {"p50_ms": round(out[len(out) // 2], 4), "p99_ms": round(out[int(len(out) * 0.99)], 4)}
+
+
+def _synthetic_intents(n: int, seed: int = 7) -> dict:
+    import random
+
+    rng = random.Random(seed)
+    words = [f"{a}{b}" for a in ("goal", "team", "cup", "host", "round", "stadium", "year", "match")
+             for b in ("", "s", "ing", "er", "ed", "ly", "ness", "ist", "ism", "ous", "ful", "less")]
+    words += [f"word{i}" for i in range(5000)]
+    entries = {}
+    while len(entries) < n:
+        entries[" ".join(rng.sample(words, rng.randint(2, 7)))] = f"reply {len(entries)}"
+    return entries
+
+
+def chatbot_bench(sizes=(1000, 10000, 50000), queries: int = 500) -> dict:
+    import random
+
+    import chatbot
+
+    results = {"accuracy": {}}
+    index = chatbot.rebuild_index()
+    matchers = {
+        "bm25": lambda q: chatbot._score(chatbot.preprocess_text(q), index)[0],
+        "overlap+synonyms": _overlap_matcher(chatbot.corpus, synonyms=True),
+        "overlap": _overlap_matcher(chatbot.corpus),
+    }
+    for name, questions in (("tuned", CHATBOT_EVAL), ("held-out", CHATBOT_HELDOUT)):
+        correct = {m: [_same_answer(match(q), key) for q, key in questions] for m, match in matchers.items()}
+        results["accuracy"][name] = {m: sum(c) / len(questions) for m, c in correct.items()}
+        print(f"   accuracy on {len(questions)} {name} paraphrases: "
+              + ", ".join(f"{m} {sum(c)}" for m, c in correct.items()))
+        # Paired sign test of bm25 against the same synonyms without BM25 ranking
+        only_bm25 = sum(a and not b for a, b in zip(correct["bm25"], correct["overlap+synonyms"]))
+        only_overlap = sum(b and not a for a, b in zip(correct["bm25"], correct["overlap+synonyms"]))
+        p = _sign_test(only_bm25, only_overlap)
+        results["accuracy"][name]["bm25_vs_overlap+synonyms_p"] = p
+        print(f"     bm25 vs overlap+synonyms: {only_bm25} won, {only_overlap} lost, two-sided p = {p:.2f}")
+
+    rng = random.Random(3)
+    for n in sizes:
+        entries = _synthetic_intents(n)
+        t = time.perf_counter()
+        index = chatbot.build_index(entries)
+        build_ms = (time.perf_counter() - t) * 1000
+        old = _overlap_matcher(entries)
+        keys = list(entries)
+        sample = [" ".join(rng.sample(keys[rng.randrange(n)].split(), 2)) for _ in range(queries)]
+
+        results[n] = {
+            "build_ms": round(build_ms, 1),
+            "bm25": _latencies(lambda q: chatbot.top_intents(chatbot.preprocess_text(q), index, k=5), sample),
+            "overlap": _latencies(old, sample),
+        }
+        print(f"   {n:>6} intents  build {build_ms:8.1f} ms  bm25 {results[n]['bm25']}  overlap {results[n]['overlap']}")
+    return results
+
+
+# ------------------------
+# Data-grounded chatbot answers: fact index build time, reply latency and
+# agreement with direct computation on the frames
+# ------------------------
+FACT_QUESTIONS = [
+    "which country hosted most world cups", "who hosted the 1998 world cup", "how many times did Mexico host",
+    "who won in 1994", "how many titles does Italy have", "goals in 1998", "how many goals did Brazil score",
+    "goal trend", "most conceded by Brazil", "worst defense in 2014", "which stadium hosted most matches",
+    "Estadio Azteca", "stadiums with most goals in Germany", "which round has most matches",
+    "how did Argentina perform", "1950", "hello", "how to use dashboard",
+]
+FACT_REPLY_BUDGET_MS = 5.0  # p99 per message
+
+
+def facts_bench(scales=(1, 10, 100), queries: int = 2000) -> list:
+    """Returns the scales that failed the latency budget or the fact check."""
+    import chatbot
+    import engine
+    import facts
+
+    failures = []
+    for factor in scales:
+        data = engine.load() if factor == 1 else engine.synthetic(factor)
+        t = time.perf_counter()
+        index = facts.FactIndex(data.match_df, data.df)
+        build_ms = (time.perf_counter() - t) * 1000
+        mismatches = facts.check_facts(index, data.match_df, data.df)
+        sample = [FACT_QUESTIONS[i % len(FACT_QUESTIONS)] for i in range(queries)]
+        size = chatbot.REPLY_CACHE_SIZE
+        chatbot.REPLY_CACHE_SIZE = 0  # time the index itself, not the reply cache
+        try:
+            reply = _latencies(lambda q: chatbot.get_reply(q, index), sample)
+            canned = _latencies(chatbot.get_reply, sample)
+        finally:
+            chatbot.REPLY_CACHE_SIZE = size
+        print(f"   {factor:>4}x ({len(data.df):>8} rows)  build {build_ms:8.1f} ms  "
+              f"reply {reply}  canned {canned}  check {'OK' if not mismatches else mismatches[:5]}")
+        if mismatches or reply["p99_ms"] > FACT_REPLY_BUDGET_MS:
+            failures.append(factor)
+    return failures
+
+
+# ------------------------
+# Reply cache under skewed traffic: a few questions asked most of the time,
+# with case/spacing/plural variations
+# ------------------------
+def reply_cache_bench(messages: int = 20000, skew: float = 1.2, seed: int = 5) -> dict:
+    import random
+
+    import chatbot
+    import engine
+
+    index = engine.facts(engine.load())
+    questions = list(dict.fromkeys([q for q, _ in CHATBOT_EVAL] + FACT_QUESTIONS))
+    rng = random.Random(seed)
+    weights = [1 / (rank + 1) ** skew for rank in range(len(questions))]
+    variants = (str.lower, str.upper, str.title, lambda q: q + "?", lambda q: "  " + q.replace(" ", "  "))
+    traffic = [rng.choice(variants)(q) for q in rng.choices(questions, weights, k=messages)]
+
+    size = chatbot.REPLY_CACHE_SIZE
+    chatbot.REPLY_CACHE_SIZE = 0
+    try:
+        uncached = _latencies(lambda q: chatbot.get_reply(q, index), traffic)
+    finally:
+        chatbot.REPLY_CACHE_SIZE = size
+    chatbot.reply_cache.clear()
+    cached = _latencies(lambda q: chatbot.get_reply(q, index), traffic)
+    stats = chatbot.reply_cache.stats()
+    print(f"   {messages} messages over {len(questions)} questions  uncached {uncached}  cached {cached}")
+    print(f"   hit rate {stats['hit_rate']:.1%} over {stats['hits'] + stats['misses']} lookups, "
+          f"{stats['size']} entries")
+    for kind, label in (("text", "surface"), ("lemma", "lemma")):
+        print(f"     {label:<8} {stats[f'{kind}_hit_rate']:6.1%}  "
+              f"({stats[f'{kind}_hits']} hits, {stats[f'{kind}_misses']} misses)")
+    return {"uncached": uncached, "cached": cached, "cache": stats}
+
+
+# ------------------------
+# KPI strip: running counters vs. recounting the frames, delta folding and
+# agreement with exact counts
+# ------------------------
+def kpi_bench(scales=(1, 10, 100), queries: int = 200) -> list:
+    """Returns [(scale, combo, field), ...] where the counters disagree with the frames."""
+    import random
+
+    import engine
+    import kpis
+
+    mismatches = []
+    for factor in scales:
+        data = engine.load() if factor == 1 else engine.synthetic(factor)
+        match_df, df = data.match_df, data.df
+        t = time.perf_counter()
+        sketch = kpis.build_sketch(match_df, df)
+        build_ms = (time.perf_counter() - t) * 1000
+
+        rng = random.Random(factor)
+        years = sorted(int(y) for y in match_df["Year"].unique())
+        countries = [kpis.ALL] + sorted(match_df["Country"].astype(str).unique())
+        combos = [(rng.choice(countries), tuple(sorted(rng.sample(years, 2)))) for _ in range(queries)]
+
+        def recount(combo):
+            country, (first, last) = combo
+            selected = match_df[match_df["Year"].between(first, last)]
+            if country != kpis.ALL:
+                selected = selected[selected["Country"] == country]
+            return kpis.kpis_for(selected, df[df["Year"].isin(selected["Year"].unique())])
+
+        counters = _latencies(lambda c: sketch.query(*c), combos)
+        rescan = _latencies(recount, combos[:20])
+
+        # Last tournament arriving as an appended delta
+        last = years[-1]
+        previous = kpis.build_sketch(match_df[match_df["Year"] < last], df[df["Year"] < last])
+        t = time.perf_counter()
+        previous.add(match_df[match_df["Year"] == last], df[df["Year"] == last])
+        fold_ms = (time.perf_counter() - t) * 1000
+        if previous.query() != sketch.query():
+            mismatches.append((factor, (kpis.ALL, None), "delta"))
+
+        found = kpis.check_sketch(sketch, match_df, df, combos[:20])
+        mismatches.extend((factor,) + m for m in found)
+        print(f"   {factor:>4}x ({len(df):>8} rows, {len(sketch.matches)} cells)  build {build_ms:7.1f} ms  "
+              f"delta fold {fold_ms:6.1f} ms  counters {counters}  rescan {rescan}  check {'OK' if not found else found[:3]}")
+    return mismatches
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="World Cup dashboard benchmarks")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p_startup = sub.add_parser("startup", help="cold-start import budget check")
+    p_startup.add_argument("--runs", type=int, default=3)
+
+    p_memory = sub.add_parser("memory", help="per-frame memory of the loaded dataset")
+    p_memory.add_argument("--data", default=None, help="workbook/CSV path (default: WORLDCUP_DATA)")
+
+    p_engine = sub.add_parser("engine", help="engine load/latency/memory benchmark")
+    p_engine.add_argument("--scales", type=int, nargs="+", default=list(DEFAULT_SCALES))
+    p_engine.add_argument("--repeat", type=int, default=5)
+    p_engine.add_argument("--report", default="bench_report.json", help="where to write the JSON report")
+    p_engine.add_argument("--baseline", default=None, help="previous report to compare against")
+    p_engine.add_argument("--threshold", type=float, default=REGRESSION_THRESHOLD)
+
+    p_pipeline = sub.add_parser("pipeline", help="generate data and profile read/dedup/groupby at scale")
+    p_pipeline.add_argument("--rows", type=int, nargs="+", default=[1_000_000])
+    p_pipeline.add_argument("--format", choices=("parquet", "csv", "xlsx"), default="parquet")
+    p_pipeline.add_argument("--workdir", default=None, help="where generated files go (default: temp dir)")
+
+    p_refresh = sub.add_parser("refresh", help="appended vs. edited source: delta or full reload, result check")
+    p_refresh.add_argument("--scales", type=int, nargs="+", default=[1, 10])
+
+    p_consistency = sub.add_parser("consistency", help="aggregate cube vs. live computation, full build and appended delta")
+    p_consistency.add_argument("--scales", type=int, nargs="+", default=[1, 10])
+
+    p_backends = sub.add_parser("backends", help="pandas vs DuckDB latency and result parity")
+    p_backends.add_argument("--scales", type=int, nargs="+", default=list(DEFAULT_SCALES))
+    p_backends.add_argument("--repeat", type=int, default=5)
+
+    p_auth = sub.add_parser("auth", help="login verification throughput under concurrent sessions")
+    p_auth.add_argument("--sessions", type=int, nargs="+", default=[1, 4, 16])
+    p_auth.add_argument("--logins", type=int, default=64)
+
+    p_chatbot = sub.add_parser("chatbot", help="intent retrieval accuracy and latency (BM25 vs token overlap)")
+    p_chatbot.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 50000])
+    p_chatbot.add_argument("--queries", type=int, default=500)
+
+    p_facts = sub.add_parser("facts", help="data-grounded chatbot answers: build time, reply latency, fact check")
+    p_facts.add_argument("--scales", type=int, nargs="+", default=[1, 10, 100])
+    p_facts.add_argument("--queries", type=int, default=2000)
+
+    p_replies = sub.add_parser("replies", help="chatbot reply cache hit rate and latency on skewed traffic")
+    p_replies.add_argument("--messages", type=int, default=20000)
+    p_replies.add_argument("--skew", type=float, default=1.2, help="Zipf exponent of question popularity")
+
+    p_kpis = sub.add_parser("kpis", help="KPI strip counters vs. recount, delta fold time, exactness check")
+    p_kpis.add_argument("--scales", type=int, nargs="+", default=[1, 10, 100])
+    p_kpis.add_argument("--queries", type=int, default=200)
+
+    args = parser.parse_args(argv)
+    if args.command == "startup":
+        failures = startup(args.runs)
+        if failures:
+            print(f"FAILED: {', '.join(failures)}")
+            return 1
+        print("OK: all modules within budget")
+    elif args.command == "memory":
+        memory(args.data)
+    elif args.command == "pipeline":
+        for rows in args.rows:
+            print(f"-- {rows} rows ({args.format})")
+            pipeline(rows, args.format, args.workdir)
+    elif args.command == "refresh":
+        failures = []
+        for factor in args.scales:
+            print(f"-- {factor}x")
+            failures.extend(refresh_check(factor))
+        if failures:
+            print(f"FAILED: {failures}")
+            return 1
+    elif args.command == "consistency":
+        mismatches = consistency(args.scales)
+        if mismatches:
+            print(f"FAILED: {len(mismatches)} cube view(s) differ from the live computation")
+            return 1
+    elif args.command == "chatbot":
+        chatbot_bench(args.sizes, args.queries)
+    elif args.command == "facts":
+        failures = facts_bench(args.scales, args.queries)
+        if failures:
+            print(f"FAILED: scales {failures} (fact mismatch or p99 over {FACT_REPLY_BUDGET_MS} ms)")
+            return 1
+    elif args.command == "kpis":
+        mismatches = kpi_bench(args.scales, args.queries)
+        if mismatches:
+            print(f"FAILED: {len(mismatches)} KPI(s) differ from the frames")
+            return 1
+    elif args.command == "replies":
+        reply_cache_bench(args.messages, args.skew)
+    elif args.command == "auth":
+        auth_throughput(args.sessions, args.logins)
+        if auth_revocation():
+            print("FAILED: credential changes from another process were not picked up")
+            return 1
+    elif args.command == "backends":
+        mismatches = backends(args.scales, args.repeat)
+        if mismatches:
+            print(f"FAILED: {len(mismatches)} result(s) differ between backends")
+            return 1
+    elif args.command == "engine":
+        report = run_engine_bench(args.scales, args.repeat)
+        with open(args.report, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"report written to {args.report}")
+        if args.baseline:
+            with open(args.baseline) as f:
+                baseline = json.load(f)
+            regressions = compare_reports(baseline, report, args.threshold)
+            if regressions:
+                print(f"FAILED: {len(regressions)} regression(s) vs {args.baseline}")
+                return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
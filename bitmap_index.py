@@ -0,0 +1,134 @@
+import threading
+
+import numpy as np
+import pandas as pd
+
+# ------------------------
+# Bitmap indexes over the match table for the Dashboard filters
+#
+# Every label column gets a sorted-position index (row positions grouped by
+# category code); the packed bitmap of one value is materialized from it the
+# first time that value is selected and then reused. A Year range is two
+# binary searches over the year-sorted positions. Any combination of filters
+# is an OR of bitmaps within a dimension and an AND across dimensions, so no
+# filter ever rescans the frames.
+# ------------------------
+LABEL_COLUMNS = ("Country", "Stadium", "Round")
+
+_lock = threading.Lock()
+_indexes = {}  # dataset version -> MatchIndex (latest only)
+
+
+class PositionIndex:
+    """Row positions grouped by value, plus a bitmap cache per value."""
+
+    def __init__(self, codes: np.ndarray, labels, n_rows: int, rows: np.ndarray = None):
+        # rows[i] is the row that codes[i] belongs to (default: row i)
+        self.n_rows = n_rows
+        order = np.argsort(codes, kind="stable")
+        bounds = np.searchsorted(codes[order], np.arange(len(labels) + 1))
+        if rows is not None:
+            order = rows[order]
+        self._positions = {
+            label: order[bounds[i]:bounds[i + 1]]
+            for i, label in enumerate(labels)
+            if bounds[i + 1] > bounds[i]
+        }
+        self._bitmaps = {}
+
+    def values(self) -> list:
+        return sorted(self._positions)
+
+    def bitmap(self, value) -> np.ndarray:
+        bits = self._bitmaps.get(value)
+        if bits is None:
+            bits = to_bitmap(self._positions.get(value, ()), self.n_rows)
+            self._bitmaps[value] = bits
+        return bits
+
+
+def to_bitmap(positions, n_rows: int) -> np.ndarray:
+    mask = np.zeros(n_rows, dtype=bool)
+    mask[np.asarray(positions, dtype=np.int64)] = True
+    return np.packbits(mask)
+
+
+def _codes(column: pd.Series):
+    if not isinstance(column.dtype, pd.CategoricalDtype):
+        column = column.astype("category")
+    # Unused categories (e.g. left over after a filter) get no positions
+    return column.cat.codes.to_numpy(), list(column.cat.categories)
+
+
+class MatchIndex:
+    def __init__(self, match_df: pd.DataFrame, df: pd.DataFrame):
+        n = len(match_df)
+        self.n_rows = n
+        self.columns = {}
+        for col in LABEL_COLUMNS:
+            codes, labels = _codes(match_df[col])
+            self.columns[col] = PositionIndex(codes, labels, n)
+
+        # A match involves both its Team and its Opponent
+        teams = pd.api.types.union_categoricals(
+            [match_df["Team"].astype("category"), match_df["Opponent"].astype("category")],
+            sort_categories=True,
+        )
+        rows = np.tile(np.arange(n), 2)
+        self.columns["Team"] = PositionIndex(np.asarray(teams.codes), list(teams.categories), n, rows)
+
+        years = match_df["Year"].to_numpy()
+        self._year_order = np.argsort(years, kind="stable")
+        self._sorted_years = years[self._year_order]
+
+        # Team rows -> position of their match, to carry a match bitmap over to df
+        match_keys = pd.MultiIndex.from_frame(match_df[["Year", "Game #"]])
+        self._team_row_match = match_keys.get_indexer(pd.MultiIndex.from_frame(df[["Year", "Game #"]]))
+
+    def year_range(self) -> tuple:
+        return int(self._sorted_years[0]), int(self._sorted_years[-1])
+
+    def values(self, column: str) -> list:
+        return self.columns[column].values()
+
+    def year_bitmap(self, first: int, last: int) -> np.ndarray:
+        lo = np.searchsorted(self._sorted_years, first, side="left")
+        hi = np.searchsorted(self._sorted_years, last, side="right")
+        return to_bitmap(self._year_order[lo:hi], self.n_rows)
+
+    def select(self, years=None, **filters) -> np.ndarray:
+        """Boolean mask over match rows.
+
+        `years` is an inclusive (first, last) range; every other keyword is a
+        column from `self.columns` with the accepted values. Empty or None
+        filters are ignored.
+        """
+        bits = None
+        if years is not None:
+            bits = self.year_bitmap(*years)
+        for col, wanted in filters.items():
+            if not wanted:
+                continue
+            index = self.columns[col]
+            any_of = np.bitwise_or.reduce([index.bitmap(v) for v in wanted])
+            bits = any_of if bits is None else bits & any_of
+        if bits is None:
+            return np.ones(self.n_rows, dtype=bool)
+        return np.unpackbits(bits, count=self.n_rows).astype(bool)
+
+    def team_rows(self, match_mask: np.ndarray) -> np.ndarray:
+        """Mask over team rows (df) that belong to the selected matches."""
+        return match_mask[self._team_row_match]
+
+
+def get_index(match_df: pd.DataFrame, df: pd.DataFrame, version: str) -> MatchIndex:
+    index = _indexes.get(version)
+    if index is not None:
+        return index
+    with _lock:
+        index = _indexes.get(version)
+        if index is None:
+            index = MatchIndex(match_df, df)
+            _indexes.clear()  # only the current dataset version is kept
+            _indexes[version] = index
+    return index
@@ -0,0 +1,300 @@
+import numpy as np
+import pandas as pd
+import plotly.express as px
+
+from pushdown import downsample, top_n
+from telemetry import timed
+
+# Largest chart payloads allowed before data is reduced server-side
+TREEMAP_MAX_ITEMS = 30   # countries in the Q2 treemap; the rest become "Other"
+LINE_MAX_POINTS = 500    # points in the goals-over-time lines (LTTB)
+
+# -------------------------------------------------
+# Helper for shades
+# -------------------------------------------------
+purple_shades = ["#c4b5fd", "#a78bfa", "#6d28d9"]
+
+
+def shade_colors(labels, shades=purple_shades):
+    """Pick a shade per label from a stable hash of the label.
+
+    Vectorized over the whole column, and the same label always gets the same
+    shade, so figures are identical across reruns, sessions and processes.
+    """
+    codes = pd.util.hash_array(np.asarray(labels, dtype=object)) % len(shades)
+    return np.asarray(shades, dtype=object)[codes].tolist()
+
+@timed("chart.theme")
+def apply_dark_theme(fig, show_legend=True):
+
+    # Transparent background + global white color
+    fig.update_layout(
+        paper_bgcolor='rgba(0,0,0,0)',
+        plot_bgcolor='rgba(0,0,0,0)',
+        font=dict(color="white"),
+        showlegend=show_legend,
+
+        # Chart Title (Center + Bold + White)
+        title=dict(
+            x=0.5,  # center align
+            xanchor="center",
+            font=dict(
+                color="lavender",
+                size=20,
+                family="Arial Black"
+            )
+        ),
+
+        # Legend styling (if enabled)
+        legend=dict(
+            font=dict(color="white"),
+            bgcolor='rgba(0,0,0,0)'
+        ),
+    )
+
+    # X-axis styling
+    fig.update_xaxes(
+        showgrid=False,
+        zeroline=False,
+        title_font=dict(color="white", size=15, family="Arial Black"),
+        tickfont=dict(color="white", size=13, family="Arial"),
+    )
+
+    # Y-axis styling
+    fig.update_yaxes(
+        showgrid=False,
+        zeroline=False,
+        title_font=dict(color="white", size=15, family="Arial Black"),
+        tickfont=dict(color="white", size=13, family="Arial"),
+    )
+
+    return fig
+
+
+# -------------------------------------------------
+# Home – matches by host country (pie, top 5)
+# -------------------------------------------------
+def home_pie(match_df):
+    host_counts = (
+        match_df["Country"]
+        .value_counts(sort=False)
+        .reset_index()
+    )
+    host_counts.columns = ["Country", "Matches"]
+    host_counts = top_n(host_counts, "Matches", 5)
+    fig = px.pie(
+        host_counts,
+        values="Matches",
+        names="Country",
+        hole=0.4,)
+    fig.update_layout(
+    paper_bgcolor='rgba(0,0,0,0)',   # chart outer background
+    plot_bgcolor='rgba(0,0,0,0)',     # inside graph background
+    legend=dict(
+        font=dict(color="white"),
+        )
+    )
+    return fig
+
+
+# -------------------------------------------------
+# Visuals tab – one chart per question (aggs = aggregates.get_aggregates())
+# -------------------------------------------------
+def visual_q1(aggs):
+    # Q1 – hosting countries (bar)
+    fig = px.bar(
+        aggs["q1"],
+        x="Times_Hosted",
+        y="Country",
+        orientation="h",
+        text="Times_Hosted",
+        color="Times_Hosted",
+        title="Top Hosting Nations",
+    )
+    fig.update_traces(textposition="outside")
+    return apply_dark_theme(fig, show_legend=False)
+
+
+def visual_q2(aggs):
+    # Q2 – stadium with most games per country (TREEMAP)
+    fig = px.treemap(
+        top_n(aggs["q2"], "Matches", TREEMAP_MAX_ITEMS, label_col=["Country", "Stadium"]),
+        path=["Country", "Stadium"],
+        values="Matches",
+        title="Stadium Match Frequency"
+    )
+    #  Enable labels inside treemap blocks
+    fig.update_traces(
+        textinfo="label+value",
+        hovertemplate="<b>%{label}</b><br>Matches: %{value}<extra></extra>")
+    return apply_dark_theme(fig, show_legend=True)
+
+
+def visual_q3(aggs):
+    # Q3 – total goals by year (line)
+    fig = px.line(
+        downsample(aggs["q3"], "Year", "Total_Goals", LINE_MAX_POINTS),
+        x="Year",
+        y="Total_Goals",
+        markers=True,
+        text="Total_Goals",
+        title="Goals Over Time",
+    )
+    fig.update_traces(marker_color="#430de5", line_color="#d83cfb")
+    return apply_dark_theme(fig, show_legend=False)
+
+
+def visual_q4(aggs):
+    # Q4 – team conceding most goals (horizontal bar)
+    fig = px.bar(top_n(aggs["q4"], "Goals_Conceded", 10), x="Goals_Conceded", y="Team",
+        color="Goals_Conceded", text="Goals_Conceded", title="Most Goals Conceded",
+    )
+    fig.update_traces(textposition="outside")
+    return apply_dark_theme(fig, show_legend=False)
+
+
+def visual_q5(aggs):
+    # Q5 – stadium with most goals scored (bar, top 10)
+    fig = px.bar(top_n(aggs["q5"], "Total_Goals", 10), x="Total_Goals", y="Stadium", color="Total_Goals", text="Total_Goals", title="Goal-Rich Stadiums",)
+    fig.update_traces(textposition="outside")
+    return apply_dark_theme(fig, show_legend=False)
+
+
+def visual_q6(aggs):
+    # Q6 – rounds with most matches
+    fig = px.bar(
+        aggs["q6"], y="Round", x="Matches", text="Matches", title="Round Match Density", color="Matches"
+    )
+    fig.update_traces(textposition="outside")
+    return apply_dark_theme(fig, show_legend=False)
+
+
+VISUAL_CHARTS = {
+    "q1": visual_q1,
+    "q2": visual_q2,
+    "q3": visual_q3,
+    "q4": visual_q4,
+    "q5": visual_q5,
+    "q6": visual_q6,
+}
+
+
+# -------------------------------------------------
+# Dashboard tab – returns None when the filter leaves nothing to draw
+# -------------------------------------------------
+def dash_q1(aggs):
+    q1_dash = aggs["q1"]
+    if q1_dash.empty:
+        return None
+    fig = px.bar(q1_dash, x="Country", y="Times_Hosted", text="Times_Hosted", title="Top Hosting Nations",)
+    fig.update_traces(
+        marker_color=shade_colors(q1_dash["Country"]),
+        textposition="outside",
+    )
+    return apply_dark_theme(fig, show_legend=False)
+
+
+def dash_q2(aggs):
+    q2_dash = top_n(aggs["q2"], "Matches", TREEMAP_MAX_ITEMS)
+    if q2_dash.empty:
+        return None
+    fig = px.bar(q2_dash, x="Stadium", y="Matches", text="Matches", title="Stadium Match Frequency")
+    fig.update_traces(
+        marker_color=shade_colors(q2_dash["Stadium"]),
+        textposition="outside",
+    )
+    return apply_dark_theme(fig, show_legend=False)
+
+
+def dash_q3(aggs):
+    goals = downsample(aggs["q3"], "Year", "Total_Goals", LINE_MAX_POINTS)
+    if goals.empty:
+        return None
+    fig = px.line(goals, x="Year", y="Total_Goals", markers=True, title="Goals Over Time", text="Total_Goals",)
+    fig.update_traces(marker_color="#b91c1c", line_color="#d83cfb")
+    return apply_dark_theme(fig, show_legend=False)
+
+
+def dash_q4(aggs):
+    conceded = top_n(aggs["q4"], "Goals_Conceded", 10)
+    if conceded.empty:
+        return None
+    fig = px.bar(
+        conceded,
+        x="Goals_Conceded",
+        y="Team",
+        orientation="h",
+        text="Goals_Conceded",
+        title="Most Goals Conceded",
+    )
+    fig.update_traces(
+        marker_color=shade_colors(conceded["Team"]),
+        textposition="outside",
+    )
+    return apply_dark_theme(fig, show_legend=True)
+
+
+def dash_q5(aggs):
+    stadium_goals = top_n(aggs["q5"], "Total_Goals", 5)
+    if stadium_goals.empty:
+        return None
+    fig = px.bar(stadium_goals, x="Stadium", y="Total_Goals", text="Total_Goals", title="Goal-Rich Stadiums",)
+    fig.update_traces(
+        marker_color=shade_colors(stadium_goals["Stadium"]),
+        textposition="outside",
+    )
+    return apply_dark_theme(fig, show_legend=False)
+
+
+def dash_q6(aggs):
+    # Sort rounds by match count (highest → lowest)
+    rounds = aggs["q6"]
+    if rounds.empty:
+        return None
+    fig = px.bar(rounds, x="Round", y="Matches", text="Matches", title="Round Match Density",
+    )
+    fig.update_traces(
+        marker_color=shade_colors(rounds["Round"]), textposition="outside",
+    )
+    return apply_dark_theme(fig, show_legend=False)
+
+
+DASHBOARD_CHARTS = {
+    "q1": dash_q1,
+    "q2": dash_q2,
+    "q3": dash_q3,
+    "q4": dash_q4,
+    "q5": dash_q5,
+    "q6": dash_q6,
+}
+
+
+# -------------------------------------------------
+# Team Explorer
+# -------------------------------------------------
+def team_progression(progression, team):
+    # Results per tournament (stacked bars) for one team
+    if progression.empty:
+        return None
+    results = progression.melt(
+        id_vars=["Year", "Last_Round"], value_vars=["Wins", "Draws", "Losses"],
+        var_name="Result", value_name="Matches",
+    )
+    fig = px.bar(
+        results, x="Year", y="Matches", color="Result", hover_data=["Last_Round"],
+        title=f"{team} – Results per World Cup",
+        color_discrete_map={"Wins": "#a78bfa", "Draws": "#c4b5fd", "Losses": "#6d28d9"},
+    )
+    fig.update_xaxes(type="category")
+    return apply_dark_theme(fig, show_legend=True)
+
+
+def team_h2h_matrix(matrix, value="Wins"):
+    # Head-to-head heatmap: row team's value against the column team
+    if matrix.empty:
+        return None
+    fig = px.imshow(
+        matrix, text_auto=True, color_continuous_scale=["#1e1b4b", "#6d28d9", "#c4b5fd"],
+        labels=dict(x="Opponent", y="Team", color=value), title=f"Head-to-Head {value}",
+    )
+    return apply_dark_theme(fig, show_legend=False)
@@ -1,12 +1,107 @@
-from nltk.tokenize import word_tokenize
-from nltk.stem import WordNetLemmatizer
+import hashlib
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+
+# ------------------------
+# NLP backend (loaded lazily on the first query)
+#   CHATBOT_NLP=nltk  -> NLTK word_tokenize + WordNet lemmatizer
+#   CHATBOT_NLP=light -> regex tokenizer + suffix-rule lemmatizer, no NLTK
+#   CHATBOT_NLP=auto  -> NLTK when it and its data are installed, else light
+# ------------------------
+NLP_BACKEND = os.environ.get("CHATBOT_NLP", "auto").lower()
+
+_nlp = None
+_nlp_lock = threading.Lock()
+_WORD_RE = re.compile(r"[a-z]+")
+
+
+def light_tokenize(text: str):
+    return _WORD_RE.findall(text)
+
+
+def light_lemmatize(token: str) -> str:
+    # Plural nouns only, like WordNetLemmatizer's default noun lemmatization
+    if len(token) <= 3 or token.endswith(("ss", "us", "is")):
+        return token
+    if token.endswith("ies"):
+        return token[:-3] + "y"
+    if token.endswith(("ches", "shes", "xes", "sses", "zes")):
+        return token[:-2]
+    if token.endswith("s"):
+        return token[:-1]
+    return token
+
+
+def _load_nltk():
+    from nltk.tokenize import word_tokenize
+    from nltk.stem import WordNetLemmatizer
+
+    lemmatizer = WordNetLemmatizer()
+    # Touch the tokenizer and WordNet now so missing data fails here
+    lemmatizer.lemmatize(word_tokenize("goals")[0])
+    return word_tokenize, lemmatizer.lemmatize
+
+
+def _get_nlp():
+    global _nlp
+    if _nlp is None:
+        with _nlp_lock:
+            if _nlp is None:
+                if NLP_BACKEND == "light":
+                    _nlp = (light_tokenize, light_lemmatize)
+                elif NLP_BACKEND == "nltk":
+                    _nlp = _load_nltk()
+                else:
+                    try:
+                        _nlp = _load_nltk()
+                    except (ImportError, LookupError):
+                        _nlp = (light_tokenize, light_lemmatize)
+    return _nlp
 
-lemmatizer = WordNetLemmatizer()
 
 # ------------------------
 # Simple corpus: intent phrase -> reply
+# Corpus is a dict that counts its modifications, so the intent index can
+# tell cheaply whether it has to check the corpus for changes.
 # ------------------------
-corpus = {
+class Corpus(dict):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.generation = 0
+
+    def _modified(self, result=None):
+        self.generation += 1
+        return result
+
+    def __setitem__(self, key, value):
+        self._modified(super().__setitem__(key, value))
+
+    def __delitem__(self, key):
+        self._modified(super().__delitem__(key))
+
+    def __ior__(self, other):
+        return self._modified(super().__ior__(other))
+
+    def update(self, *args, **kwargs):
+        self._modified(super().update(*args, **kwargs))
+
+    def pop(self, *args):
+        return self._modified(super().pop(*args))
+
+    def popitem(self):
+        return self._modified(super().popitem())
+
+    def setdefault(self, key, default=None):
+        return self._modified(super().setdefault(key, default))
+
+    def clear(self):
+        self._modified(super().clear())
+
+
+corpus = Corpus({
     "hello": "Hello! How can I assist you today?",
     "hi": "Hi there! What would you like to explore?",
     "hey": "Hey! How can I help you?",
@@ -39,35 +134,391 @@ corpus = {
     "dashboard help": "Use filters like Year and Country to update KPIs and charts dynamically.",
     "how to use dashboard": "The dashboard lets you filter data and view updated statistics instantly.",
     
+    "who won the world cup": "World Cup winners are decided in the 'Final' round matches of the dataset.",
+    "which team won most titles": "Count the 'Final' round wins per team in the dataset to compare titles.",
+    "team performance": "The Team Explorer tab shows each team's wins, draws, losses, goals and head-to-head results.",
+
     "bye": "Goodbye! Have a great day!",
     "thank you": "You're welcome! Happy exploring!"
-}
+})
 
 # ------------------------
 # Preprocess text
+# Synonyms map onto the words used in the corpus keys, on both sides, so
+# "which nation hosted the most tournaments" reaches "which country hosted
+# most world cups".
 # ------------------------
+SYNONYMS = {
+    "nation": "country", "host": "hosted", "hosting": "hosted", "hosts": "hosted",
+    "tournament": "world cup", "edition": "world cup", "worldcup": "world cup",
+    "venue": "stadium", "arena": "stadium", "ground": "stadium",
+    "scored": "goal", "scoring": "goal", "score": "goal",
+    "concede": "conceded", "conceding": "conceded", "defence": "defense",
+    "stage": "round", "data": "dataset", "app": "application",
+    "game": "match", "fixture": "match", "goodbye": "bye",
+    "won": "win", "winner": "win", "champion": "win", "title": "win",
+    "perform": "performance", "record": "performance",
+}
+
+# Intents answered from the data when get_reply() is given a fact index
+# (facts.py); the corpus reply above is used when the index has no answer.
+DATA_INTENTS = {
+    "hosting nation": "host",
+    "which country hosted most world cups": "host",
+    "most matches stadium": "stadium_matches",
+    "stadium analysis": "stadium_matches",
+    "goals over time": "goals",
+    "goal trend": "goals",
+    "team conceded most goals": "conceded",
+    "worst defense team": "conceded",
+    "goal rich stadiums": "stadium_goals",
+    "stadiums with most goals": "stadium_goals",
+    "round analysis": "rounds",
+    "which round has most matches": "rounds",
+    "who won the world cup": "champion",
+    "which team won most titles": "champion",
+    "team performance": "team",
+}
+
+
+def _expand(tokens):
+    for token in tokens:
+        yield from SYNONYMS.get(token, token).split()
+
+
 def preprocess_text(text: str):
-    tokens = word_tokenize(text.lower())
-    return [lemmatizer.lemmatize(t) for t in tokens if t.isalpha()]
+    tokenize, lemmatize = _get_nlp()
+    tokens = tokenize(text.lower())
+    return list(_expand(lemmatize(t) for t in tokens if t.isalpha()))
 
 # ------------------------
-# Get reply using fuzzy keyword matching on keys of corpus
+# Intent index: BM25 weights of every (intent key, term) pair, precomputed
+# once and stored column-wise (per term: intent positions + weights, like a
+# CSC sparse matrix). Scoring a query is one sparse matrix-vector product
+# (a bincount over the query terms' columns) followed by a top-k selection,
+# so it stays sub-millisecond with tens of thousands of intents.
 # ------------------------
-def get_reply(user_input: str) -> str:
-    user_tokens = set(preprocess_text(user_input))
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+
+def build_index(entries):
+    import numpy as np
+
+    keys = list(entries)
+    docs = [preprocess_text(key) for key in keys]
+    lengths = np.array([len(doc) for doc in docs], dtype=np.float64)
+    avg_length = lengths.mean() if len(docs) else 0.0
+
+    counts = {}  # term -> {position: term frequency}
+    for position, doc in enumerate(docs):
+        for token in doc:
+            column = counts.setdefault(token, {})
+            column[position] = column.get(position, 0) + 1
+
+    n = len(keys)
+    vocabulary, columns = {}, []
+    for token, column in counts.items():
+        rows = np.fromiter(column, dtype=np.int64, count=len(column))
+        tf = np.fromiter(column.values(), dtype=np.float64, count=len(column))
+        idf = np.log(1 + (n - len(column) + 0.5) / (len(column) + 0.5))
+        norm = BM25_K1 * (1 - BM25_B + BM25_B * lengths[rows] / (avg_length or 1.0))
+        vocabulary[token] = len(columns)
+        columns.append((rows, idf * tf * (BM25_K1 + 1) / (tf + norm)))
+    return {"keys": keys, "vocabulary": vocabulary, "columns": columns, "fingerprint": corpus_fingerprint(keys)}
+
+
+def corpus_fingerprint(keys) -> str:
+    """Hash of the intent keys (what the index is built from; replies are looked up live)."""
+    digest = hashlib.sha256()
+    for key in sorted(keys):
+        digest.update(key.encode())
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+
+_index = None  # built on the first query, then reused
+_indexed = (None, None)  # (corpus object, its generation) last checked against _index
+
+
+def rebuild_index():
+    """Re-index after `corpus` has been modified."""
+    global _index, _indexed
+    _index = build_index(corpus)
+    _indexed = (corpus, corpus.generation)
+    return _index
+
+
+def _current_index():
+    """The intent index, rebuilt when the corpus keys changed since it was built.
+
+    Any change (an edit, a removed and an added intent, or a new corpus
+    object) is noticed through the corpus's generation; the keys are then
+    fingerprinted, and a rebuild happens only if they differ.
+    """
+    global corpus, _indexed
+    if not isinstance(corpus, Corpus):
+        corpus = Corpus(corpus)  # replaced by a plain dict
+    index = _index
+    if index is not None and _indexed[0] is corpus and _indexed[1] == corpus.generation:
+        return index
+    if index is None or index["fingerprint"] != corpus_fingerprint(corpus):
+        return rebuild_index()
+    _indexed = (corpus, corpus.generation)  # only replies changed
+    return index
+
+
+def _scores(tokens, index):
+    import numpy as np
+
+    hits = [index["columns"][index["vocabulary"][t]] for t in set(tokens) if t in index["vocabulary"]]
+    if not hits:
+        return None
+    rows = np.concatenate([rows for rows, _ in hits])
+    weights = np.concatenate([weights for _, weights in hits])
+    return np.bincount(rows, weights=weights, minlength=len(index["keys"]))
+
+
+def top_intents(tokens, index, k: int = 5):
+    """The k best (key, score) pairs for preprocessed query tokens."""
+    import numpy as np
+
+    scores = _scores(tokens, index)
+    if scores is None:
+        return []
+    k = min(k, len(scores))
+    best = np.argpartition(-scores, k - 1)[:k]
+    # Highest score first; ties go to the key listed first in the corpus
+    best = best[np.lexsort((best, -scores[best]))]
+    return [(index["keys"][p], float(scores[p])) for p in best if scores[p] > 0]
+
+
+def _score(tokens, index):
+    best = top_intents(tokens, index, k=1)
+    if not best:
+        return None, 0
+    return best[0]
+
+
+def match_intent(user_input: str):
+    """Return (best_key, BM25 score); best_key is None when no term matches."""
+    return _score(set(preprocess_text(user_input)), _current_index())
+
+
+FALLBACK_REPLY = "Sorry, I didn't understand that. You can ask about the project, dataset, goals, stadiums, rounds or dashboard."
+
+
+# ------------------------
+# Reply cache
+# A few questions make up most of the traffic, so replies are memoized in a
+# process-wide LRU shared by every session. A reply is stored under the
+# message's surface form (lowercase, single spaces), so an exact repeat skips
+# tokenization, and under its lemma form (the set of query terms, plus the
+# entities named when answering from data), so "Goals over time?" and
+# "goal over times" share an entry. Entries expire after REPLY_CACHE_TTL
+# seconds. The cache is emptied when the intent index is rebuilt (i.e. the
+# corpus changed) or a different fact index is passed in.
+# ------------------------
+REPLY_CACHE_SIZE = int(os.environ.get("CHATBOT_CACHE_SIZE", "1024"))  # 0 disables the cache
+REPLY_CACHE_TTL = float(os.environ.get("CHATBOT_CACHE_TTL", "3600"))  # seconds
+
+
+class ReplyCache:
+    def __init__(self, maxsize: int = REPLY_CACHE_SIZE, ttl: float = REPLY_CACHE_TTL):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        # key -> (expires_at, (matched corpus key, data answer or None))
+        self._entries = OrderedDict()
+        self._index = None  # intent index the entries were computed with
+        self._facts = None  # ...and the fact index, for entries answered from data
+        self._lock = threading.Lock()
+        # Per key kind: "text" is looked up for every message, "lemma" only
+        # after a text miss
+        self.hits = {"text": 0, "lemma": 0}
+        self.misses = {"text": 0, "lemma": 0}
+        self.expired = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def bind(self, index, facts=None):
+        """Drop every entry if `index` or `facts` differs from the ones they were computed with."""
+        if index is self._index and (facts is None or facts is self._facts):
+            return
+        with self._lock:
+            # Entries computed without facts stay valid when the first fact index arrives
+            stale = index is not self._index or self._facts is not None
+            if stale and self._entries:
+                self.invalidations += 1
+                self._entries.clear()
+            self._index = index
+            if facts is not None:
+                self._facts = facts
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses[key[0]] += 1
+                return None
+            expires_at, value = entry
+            if expires_at < time.monotonic():
+                del self._entries[key]
+                self.expired += 1
+                self.misses[key[0]] += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits[key[0]] += 1
+            return value
+
+    def put(self, key, value):
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            hits, misses = sum(self.hits.values()), sum(self.misses.values())
+            stats = {
+                "hits": hits,
+                "misses": misses,
+                "expired": self.expired,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations,
+                "size": len(self._entries),
+                "maxsize": self.maxsize,
+                "hit_rate": hits / (hits + misses) if hits + misses else 0.0,
+            }
+            for kind in self.hits:
+                lookups = self.hits[kind] + self.misses[kind]
+                stats[f"{kind}_hits"] = self.hits[kind]
+                stats[f"{kind}_misses"] = self.misses[kind]
+                stats[f"{kind}_hit_rate"] = self.hits[kind] / lookups if lookups else 0.0
+            return stats
+
+
+reply_cache = ReplyCache()
+
+
+# ------------------------
+# Get reply from the best-ranked corpus key (or the data, see DATA_INTENTS)
+# ------------------------
+def _resolve(user_input: str, tokens, index, facts):
+    """(matched corpus key or None, data answer or None) for a message."""
+    best_key, _ = _score(set(tokens), index)
+    answer = None
+    if facts is not None:
+        # Any other message that names a year, team, stadium or host country
+        # gets that entity's summary
+        answer = facts.answer(DATA_INTENTS.get(best_key, "summary"), user_input) or None
+    return best_key, answer
+
+
+def get_reply(user_input: str, facts=None) -> str:
+    """Reply to a message; with a facts.FactIndex, data questions get computed answers."""
+    index = _current_index()
+    if REPLY_CACHE_SIZE <= 0:
+        resolved = _resolve(user_input, preprocess_text(user_input), index, facts)
+    else:
+        reply_cache.bind(index, facts)
+        text_key = ("text", " ".join(user_input.lower().split()), facts is not None)
+        resolved = reply_cache.get(text_key)
+        if resolved is None:
+            tokens = preprocess_text(user_input)
+            entities = None if facts is None else tuple(sorted(facts.entities(user_input).items()))
+            lemma_key = ("lemma", tuple(sorted(set(tokens))), entities)
+            resolved = reply_cache.get(lemma_key)
+            if resolved is None:
+                resolved = _resolve(user_input, tokens, index, facts)
+                reply_cache.put(lemma_key, resolved)
+            reply_cache.put(text_key, resolved)
+
+    best_key, answer = resolved
+    if answer:
+        return answer
+    # Replies are looked up here rather than cached, so edited corpus
+    # replies show up at once
+    return corpus.get(best_key, FALLBACK_REPLY) if best_key is not None else FALLBACK_REPLY
+
+
+# ------------------------
+# Batch / async API (offline evaluation of logged questions)
+# Each result is a (reply, matched_key, score) tuple; matched_key is None
+# and score 0 when the fallback reply was given.
+# ------------------------
+PROCESS_POOL_THRESHOLD = 20000  # unique questions before fanning out
+BATCH_CHUNK_SIZE = 5000
+
+
+def _preprocess_many(texts):
+    tokenize, lemmatize = _get_nlp()
+    lemmas = {}  # each distinct token is lemmatized once per batch
+    result = []
+    for text in texts:
+        tokens = []
+        for t in tokenize(text.lower()):
+            if t.isalpha():
+                lemma = lemmas.get(t)
+                if lemma is None:
+                    lemma = lemmas[t] = lemmatize(t)
+                tokens.append(lemma)
+        result.append(set(_expand(tokens)))
+    return result
+
+
+def _replies_for_unique(texts):
+    index = _current_index()
+    results = []
+    for tokens in _preprocess_many(texts):
+        key, score = _score(tokens, index)
+        if key is None:
+            results.append((FALLBACK_REPLY, None, 0))
+        else:
+            results.append((corpus[key], key, score))
+    return results
+
+
+def _init_worker(entries):
+    global corpus
+    corpus = Corpus(entries)
+    rebuild_index()
+
+
+def get_replies(questions, workers: int = None):
+    """Answer many questions at once; returns a list of (reply, key, score).
+
+    Duplicate questions are answered once. Batches with more than
+    PROCESS_POOL_THRESHOLD unique questions are split into chunks and spread
+    over a process pool (`workers` processes, default: CPU count);
+    pass workers=1 to stay in-process.
+    """
+    questions = list(questions)
+    unique = list(dict.fromkeys(questions))
+
+    if workers == 1 or len(unique) <= PROCESS_POOL_THRESHOLD:
+        answers = _replies_for_unique(unique)
+    else:
+        from concurrent.futures import ProcessPoolExecutor
 
-    best_key = None
-    best_score = 0
+        chunks = [unique[i:i + BATCH_CHUNK_SIZE] for i in range(0, len(unique), BATCH_CHUNK_SIZE)]
+        answers = []
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(dict(corpus),)) as pool:
+            for part in pool.map(_replies_for_unique, chunks):
+                answers.extend(part)
 
-    for key in corpus.keys():
-        key_tokens = set(preprocess_text(key))
-        score = len(user_tokens & key_tokens)  # common words
+    by_question = dict(zip(unique, answers))
+    return [by_question[q] for q in questions]
 
-        if score > best_score:
-            best_score = score
-            best_key = key
 
-    if best_score == 0 or best_key is None:
-        return "Sorry, I didn't understand that. You can ask about the project, dataset, goals, stadiums, rounds or dashboard."
+async def get_replies_async(questions, workers: int = None):
+    """asyncio-friendly get_replies: runs the batch off the event loop."""
+    import asyncio
 
-    return corpus[best_key]
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(None, get_replies, list(questions), workers)
@@ -0,0 +1,265 @@
+import hashlib
+import os
+import threading
+
+import numpy as np
+import pandas as pd
+
+from schema import append_frames, compact_frame, compact_frames
+from telemetry import span
+
+# ------------------------
+# Paths
+# ------------------------
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+# Either a results workbook/CSV or a store directory built by ingest.py
+DATA_PATH = os.environ.get("WORLDCUP_DATA", os.path.join(BASE_DIR, "data", "world_cup_results.xlsx"))
+# Tournament to show when DATA_PATH is a store (None = the first one ingested)
+TOURNAMENT = os.environ.get("WORLDCUP_TOURNAMENT") or None
+
+
+def parse_year_range(text):
+    """Inclusive (first, last) from "1990-2014" or "2014"; None when empty."""
+    if not text:
+        return None
+    first, _, last = text.partition("-")
+    return int(first), int(last or first)
+
+
+# Years read from a store (None = all); pruned at the partition level
+YEARS = parse_year_range(os.environ.get("WORLDCUP_YEARS"))
+CACHE_DIR = os.path.join(BASE_DIR, ".cache")
+
+# ------------------------
+# Process-wide memo (shared by every Streamlit session in this process)
+# ------------------------
+_lock = threading.Lock()
+_file_versions = {}  # path -> ((mtime_ns, size), version)
+_frames = {}         # path -> (source_version, version, df, match_df)
+_deltas = {}         # version -> (previous_version, delta_df, delta_match)
+_row_hashes = {}     # path -> content hash of every loaded row, in load order
+MAX_DELTAS = 16
+
+
+def _file_digest(path: str) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            h.update(block)
+    return h.hexdigest()
+
+
+def dataset_version(path: str = DATA_PATH) -> str:
+    """Version of the workbook: its content hash, re-hashed only when mtime/size change."""
+    if os.path.isdir(path):
+        path = os.path.join(path, "manifest.json")
+    st = os.stat(path)
+    stamp = (st.st_mtime_ns, st.st_size)
+    cached = _file_versions.get(path)
+    if cached is not None and cached[0] == stamp:
+        return cached[1]
+    version = _file_digest(path)[:16]
+    _file_versions[path] = (stamp, version)
+    return version
+
+
+def _cache_path(path: str, version: str) -> str:
+    name = os.path.splitext(os.path.basename(path))[0]
+    return os.path.join(CACHE_DIR, f"{name}-{version}.parquet")
+
+
+def _read_source(path: str, version: str) -> pd.DataFrame:
+    cache_file = _cache_path(path, version)
+    if os.path.exists(cache_file):
+        try:
+            with span("load.read_cache"):
+                return pd.read_parquet(cache_file)
+        except Exception:
+            pass  # corrupt/partial cache file -> rebuild from the workbook
+
+    with span("load.parse"):
+        if path.endswith(".csv"):
+            raw = pd.read_csv(path)
+        elif path.endswith(".parquet"):
+            return pd.read_parquet(path)  # already columnar; no cache copy needed
+        else:
+            raw = pd.read_excel(path)
+
+    try:
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        tmp_file = f"{cache_file}.{os.getpid()}.tmp"
+        raw.to_parquet(tmp_file, index=False)
+        os.replace(tmp_file, cache_file)
+        _prune_cache(path, keep=cache_file)
+    except Exception:
+        # Parquet engine (pyarrow) missing or cache dir not writable:
+        # still serve the data, only the on-disk cache is skipped.
+        pass
+    return raw
+
+
+def _prune_cache(path: str, keep: str):
+    prefix = os.path.splitext(os.path.basename(path))[0] + "-"
+    for name in os.listdir(CACHE_DIR):
+        full = os.path.join(CACHE_DIR, name)
+        if name.startswith(prefix) and name.endswith(".parquet") and full != keep:
+            try:
+                os.remove(full)
+            except OSError:
+                pass
+
+
+def derive_frames(raw: pd.DataFrame):
+    """Build the team-row frame (df) and one-row-per-match frame (match_df)."""
+    with span("load.compact"):
+        df = compact_frame(raw)
+        df["Total_Goals_in_Match"] = pd.to_numeric(df["Team G"] + df["Opponent G"], downcast="integer")
+
+    # drop_duplicates already returns a new frame; no extra copy needed
+    with span("load.dedup"):
+        match_df = df.drop_duplicates(subset=["Year", "Game #"])
+    return df, match_df
+
+
+def row_hashes(frame: pd.DataFrame) -> np.ndarray:
+    """Content hash of each source row, independent of the column dtypes.
+
+    Labels hash by value (a categorical and an object column agree) and
+    numbers as float64, so a compacted frame, a re-read workbook and pushed
+    rows hash alike. Derived columns are not part of the content.
+    """
+    columns = sorted(c for c in frame.columns if c != "Total_Goals_in_Match")
+    normalized = pd.DataFrame({
+        col: frame[col].astype("float64") if pd.api.types.is_numeric_dtype(frame[col].dtype) else frame[col]
+        for col in columns
+    })
+    return pd.util.hash_pandas_object(normalized, index=False).to_numpy()
+
+
+def _split_appended(path: str, match_df: pd.DataFrame, raw: pd.DataFrame, hashes: np.ndarray):
+    """Rows appended to `raw` since the last load of `path`, or None if history changed.
+
+    The previously loaded rows must come first and be unchanged (an edited
+    score keeps its (Year, Game #) key, so keys alone are not enough), and
+    the appended rows must belong to new matches.
+    """
+    previous = _row_hashes.get(path)
+    if previous is None or len(hashes) < len(previous) or not np.array_equal(hashes[:len(previous)], previous):
+        return None
+    appended = raw.iloc[len(previous):]
+    old_keys = pd.MultiIndex.from_frame(match_df[["Year", "Game #"]].astype("int64"))
+    if pd.MultiIndex.from_frame(appended[["Year", "Game #"]].astype("int64")).isin(old_keys).any():
+        return None  # rows added to an existing match
+    return appended.reset_index(drop=True)
+
+
+def _apply_delta(path: str, entry, delta_raw: pd.DataFrame, version: str, source_version: str):
+    _, old_version, df, match_df = entry
+    # Continue the row labels so the result matches a fresh load
+    delta_raw.index = pd.RangeIndex(len(df), len(df) + len(delta_raw))
+    delta_df, delta_match = derive_frames(delta_raw)
+    df = append_frames(df, delta_df)
+    match_df = append_frames(match_df, delta_match)
+    _deltas[version] = (old_version, delta_df, delta_match)
+    while len(_deltas) > MAX_DELTAS:
+        del _deltas[next(iter(_deltas))]
+    _frames[path] = (source_version, version, df, match_df)
+    return df, match_df
+
+
+# ------------------------
+# Public API
+# ------------------------
+def load_data(path: str = DATA_PATH):
+    """Return (df, match_df, version) for the workbook at `path`.
+
+    The workbook is parsed once per content version into a Parquet cache and
+    the derived frames are memoized for the whole process. Editing the xlsx
+    changes its version, which invalidates both automatically; when the edit
+    only appends new matches, they are applied as a delta (see delta_for()).
+    Callers must treat the returned frames as read-only.
+    """
+    source_version = dataset_version(path)
+    entry = _frames.get(path)
+    if entry is not None and entry[0] == source_version:
+        return entry[2], entry[3], entry[1]
+
+    with _lock:
+        entry = _frames.get(path)
+        if entry is not None and entry[0] == source_version:
+            return entry[2], entry[3], entry[1]
+
+        if os.path.isdir(path):
+            # Partitioned store: read only the selected tournament (and years)
+            from ingest import load_store
+
+            df, match_df, version = load_store(path, TOURNAMENT, YEARS)
+            df, match_df = compact_frames(df, match_df)
+        else:
+            version = source_version
+            raw = _read_source(path, source_version)
+            with span("load.hash"):
+                hashes = row_hashes(raw)
+            delta_raw = None if entry is None else _split_appended(path, entry[3], raw, hashes)
+            _row_hashes[path] = hashes
+            if delta_raw is not None:
+                df, match_df = _apply_delta(path, entry, delta_raw, source_version, source_version)
+                return df, match_df, source_version
+            df, match_df = derive_frames(raw)
+        _frames[path] = (source_version, version, df, match_df)
+    return df, match_df, version
+
+
+def refresh_data(path: str = DATA_PATH) -> dict:
+    """Refresh hook: pick up rows appended to the source since the last load."""
+    before = _frames.get(path)
+    df, match_df, version = load_data(path)
+    delta = _deltas.get(version)
+    return {
+        "version": version,
+        "changed": before is None or before[1] != version,
+        "incremental": delta is not None and before is not None and delta[0] == before[1],
+        "new_rows": 0 if delta is None else len(delta[1]),
+        "new_matches": 0 if delta is None else len(delta[2]),
+    }
+
+
+def append_rows(rows: pd.DataFrame, path: str = DATA_PATH):
+    """Push new team rows (e.g. one live match) without touching the source file.
+
+    Rows use the workbook's columns; ones whose (Year, Game #) is already
+    loaded are ignored. Returns (df, match_df, version). Pushed rows are kept
+    until the source file itself changes.
+    """
+    load_data(path)
+    with _lock:
+        entry = _frames[path]
+        old_keys = pd.MultiIndex.from_frame(entry[3][["Year", "Game #"]].astype("int64"))
+        rows = rows[~pd.MultiIndex.from_frame(rows[["Year", "Game #"]].astype("int64")).isin(old_keys)]
+        if rows.empty:
+            return entry[2], entry[3], entry[1]
+        digest = hashlib.sha256(entry[1].encode())
+        digest.update(pd.util.hash_pandas_object(rows, index=False).to_numpy().tobytes())
+        version = digest.hexdigest()[:16]
+        if path in _row_hashes:
+            _row_hashes[path] = np.concatenate([_row_hashes[path], row_hashes(rows)])
+        df, match_df = _apply_delta(path, entry, rows.reset_index(drop=True).copy(), version, entry[0])
+    return df, match_df, version
+
+
+def is_current(version: str) -> bool:
+    """Whether load_data() currently serves `version` for some source."""
+    return any(entry[1] == version for entry in list(_frames.values()))
+
+
+def delta_for(version: str):
+    """(previous_version, delta_df, delta_match) if `version` was built incrementally."""
+    return _deltas.get(version)
+
+
+def clear_cache():
+    with _lock:
+        _frames.clear()
+        _file_versions.clear()
+        _deltas.clear()
+        _row_hashes.clear()
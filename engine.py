@@ -0,0 +1,179 @@
+from typing import NamedTuple
+
+import numpy as np
+import pandas as pd
+
+import aggregates
+import data_loader
+import kpis as kpi_sketch
+import sql_backend
+from bitmap_index import get_index
+from facts import get_fact_index
+from pushdown import top_n as take_top_n
+from team_index import get_team_index
+
+# ------------------------
+# Headless analytics engine
+# Everything the Visuals and Dashboard tabs compute, without Streamlit, so it
+# can be imported by the app, by benchmark.py and by offline jobs alike.
+# ------------------------
+ALL = aggregates.ALL
+QUESTIONS = aggregates.QUESTIONS
+# "pandas" (aggregate cube + bitmap indexes) or "duckdb" (sql_backend.py)
+BACKEND = sql_backend.BACKEND
+
+# How many rows each tab shows per question (None = all)
+VISUAL_TOP_N = {"q4": 10, "q5": 10}
+DASHBOARD_TOP_N = {"q4": 10, "q5": 5}
+
+
+class Dataset(NamedTuple):
+    df: pd.DataFrame        # one row per team per match
+    match_df: pd.DataFrame  # one row per match
+    version: str
+
+
+def load(path: str = data_loader.DATA_PATH) -> Dataset:
+    data = Dataset(*data_loader.load_data(path))
+    if BACKEND == "duckdb" and data_loader.delta_for(data.version) is None:
+        # Rows pushed with append_rows() exist only in memory, so versions
+        # built from a delta are queried from the frames instead
+        sql_backend.register(data.version, path)
+    return data
+
+
+def from_frame(raw: pd.DataFrame, version: str) -> Dataset:
+    """Dataset from an in-memory results frame (e.g. synthetic benchmark data)."""
+    df, match_df = data_loader.derive_frames(raw)
+    return Dataset(df, match_df, version)
+
+
+def _use_sql(data: Dataset, backend: str) -> bool:
+    if (backend or BACKEND) != "duckdb":
+        return False
+    if not sql_backend.is_registered(data.version):
+        sql_backend.register(data.version, data.df)
+    return True
+
+
+def countries(data: Dataset) -> list:
+    return sorted(data.match_df["Country"].unique())
+
+
+def views(data: Dataset, country: str = ALL, backend: str = None) -> dict:
+    """All six Q1–Q6 frames for a filter value, served from the aggregate cube."""
+    if _use_sql(data, backend):
+        return sql_backend.views(data.version, country)
+    return aggregates.get_aggregates(data.match_df, data.df, data.version, country)
+
+
+def question(data: Dataset, qid: str, country: str = ALL, top_n: dict = VISUAL_TOP_N) -> pd.DataFrame:
+    frame = views(data, country)[qid]
+    n = top_n.get(qid)
+    if n is None:
+        return frame
+    if qid in aggregates.RANKED_BY:
+        return take_top_n(frame, aggregates.RANKED_BY[qid], n)
+    return frame.head(n)
+
+
+def dashboard(data: Dataset, country: str = ALL) -> dict:
+    return {qid: question(data, qid, country, DASHBOARD_TOP_N) for qid in QUESTIONS}
+
+
+def filter_options(data: Dataset) -> dict:
+    """Values offered by the Dashboard filters."""
+    index = get_index(data.match_df, data.df, data.version)
+    return {
+        "years": index.year_range(),
+        "countries": index.values("Country"),
+        "teams": index.values("Team"),
+        "rounds": index.values("Round"),
+        "stadiums": index.values("Stadium"),
+    }
+
+
+def filtered_views(data: Dataset, country: str = ALL, years=None, teams=(), rounds=(), stadiums=(),
+                   backend: str = None) -> dict:
+    """Q1–Q6 frames for any combination of Dashboard filters.
+
+    A country-only filter is served from the cube; other combinations are
+    resolved with the bitmap indexes and aggregated over the selected rows.
+    `years` is an inclusive (first, last) range, or None for all years.
+    """
+    if _use_sql(data, backend):
+        return sql_backend.views(data.version, country, years, teams, rounds, stadiums)
+    if years is not None and tuple(years) == get_index(data.match_df, data.df, data.version).year_range():
+        years = None
+    if years is None and not (teams or rounds or stadiums):
+        return views(data, country, backend)
+    match_mask, team_mask = select(data, country, years, teams, rounds, stadiums)
+    return aggregates.aggregates_for(data.match_df[match_mask], data.df[team_mask])
+
+
+def select(data: Dataset, country: str = ALL, years=None, teams=(), rounds=(), stadiums=()):
+    """(match mask, team-row mask) for a filter combination."""
+    index = get_index(data.match_df, data.df, data.version)
+    match_mask = index.select(
+        years=years,
+        Country=None if country == ALL else [country],
+        Team=teams, Round=rounds, Stadium=stadiums,
+    )
+    return match_mask, index.team_rows(match_mask)
+
+
+def teams(data: Dataset):
+    """The per-team index (records, progression, head-to-head) for the Team Explorer."""
+    return get_team_index(data.df, data.version)
+
+
+def kpis(data: Dataset, country: str = ALL, years=None, teams=(), rounds=(), stadiums=()) -> dict:
+    """KPI strip numbers (matches, tournaments, teams, goals and averages) for a filter combination.
+
+    Country and year range are read from the running KPI counters; Team,
+    Round and Stadium filters count over the bitmap selection instead.
+    """
+    if not (teams or rounds or stadiums):
+        return kpi_sketch.get_sketch(data.match_df, data.df, data.version).query(country, years)
+    match_mask, team_mask = select(data, country, years, teams, rounds, stadiums)
+    return kpi_sketch.kpis_for(data.match_df[match_mask], data.df[team_mask])
+
+
+def facts(data: Dataset):
+    """The chatbot's fact index (per year, team, stadium and host country)."""
+    return get_fact_index(data.match_df, data.df, data.version)
+
+
+def filter_matches(data: Dataset, country: str = ALL):
+    """The Dashboard filter path: (filtered matches, team rows of those matches)."""
+    filtered = data.match_df
+    if country != ALL:
+        filtered = filtered[filtered["Country"] == country]
+    return filtered, aggregates.team_rows_of(filtered, data.df)
+
+
+# ------------------------
+# Scaled copies of a dataset for load testing
+# ------------------------
+def scale_raw(raw: pd.DataFrame, factor: int) -> pd.DataFrame:
+    """Repeat the tournaments `factor` times, each copy shifted to new years.
+
+    Keeps the real distributions of goals, stadiums and rounds while growing
+    rows, matches and distinct years linearly.
+    """
+    if factor <= 1:
+        return raw.copy()
+    span = int(raw["Year"].max()) - int(raw["Year"].min()) + 4
+    years = raw["Year"].astype("int64").to_numpy()
+    scaled = pd.concat([raw] * factor, ignore_index=True)
+    scaled["Year"] = np.tile(years, factor) + np.repeat(np.arange(factor) * span, len(raw))
+    return scaled
+
+
+def raw_frame(path: str = data_loader.DATA_PATH) -> pd.DataFrame:
+    """The source as read from disk, before derivation (a fresh frame)."""
+    return data_loader._read_source(path, data_loader.dataset_version(path))
+
+
+def synthetic(factor: int, path: str = data_loader.DATA_PATH) -> Dataset:
+    return from_frame(scale_raw(raw_frame(path), factor), f"scaled-{factor}x")
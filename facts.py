@@ -0,0 +1,429 @@
+import re
+import threading
+
+import pandas as pd
+
+# ------------------------
+# Fact index for data-grounded chatbot answers
+#
+# Everything the chatbot can state about the data is computed once per
+# dataset version: per-year, per-team, per-stadium and per-host-country
+# facts plus the overall leaders, held in plain dicts. Answering a message
+# is then an entity lookup (years and names found in the text) and a dict
+# read, with no groupby on the request path.
+# ------------------------
+_lock = threading.Lock()
+_indexes = {}  # dataset version -> FactIndex (latest only)
+
+_TOKEN_RE = re.compile(r"[\w']+")
+_PENALTIES_RE = re.compile(r"^(.*?) win on penalties")
+
+# Which entity each topic looks at first when a message names several
+# (e.g. "Germany" is both a team and a host country)
+TOPIC_ENTITIES = {
+    "host": ("year", "country"),
+    "champion": ("year", "team"),
+    "goals": ("year", "stadium", "team", "country"),
+    "conceded": ("team", "year"),
+    "stadium_matches": ("stadium", "country", "year"),
+    "stadium_goals": ("stadium", "country", "year"),
+    "rounds": ("year",),
+    "team": ("team",),
+    "summary": ("year", "team", "stadium", "country"),
+}
+
+
+def _tokens(text: str) -> list:
+    return _TOKEN_RE.findall(text.lower())
+
+
+def _plural(n: int, word: str, plural: str = None) -> str:
+    return f"{n} {word}" if n == 1 else f"{n} {plural or word + 's'}"
+
+
+def _join(labels) -> str:
+    labels = list(labels)
+    return labels[0] if len(labels) == 1 else ", ".join(labels[:-1]) + " and " + labels[-1]
+
+
+def _leaders(series: pd.Series):
+    """(labels sharing the maximum, maximum) of a labelled count/sum series."""
+    if series.empty:
+        return [], 0
+    top = series.max()
+    return sorted(str(label) for label in series[series == top].index), int(top)
+
+
+def _group_leaders(series: pd.Series, level: str) -> dict:
+    """_leaders() within each value of one index level of a two-level series."""
+    top = series.groupby(level=level, observed=True).transform("max")
+    best = series[series == top].reset_index(name="value")
+    other = [name for name in series.index.names if name != level][0]
+    grouped = {}
+    for group, label, value in best[[level, other, "value"]].itertuples(index=False):
+        grouped.setdefault(group, ([], int(value)))[0].append(str(label))
+    return {group: (sorted(labels), value) for group, (labels, value) in grouped.items()}
+
+
+def _distinct(frame: pd.DataFrame, key: str, value: str) -> dict:
+    """key -> sorted distinct values of `value` for that key."""
+    grouped = {}
+    for k, v in frame[[key, value]].drop_duplicates().itertuples(index=False):
+        grouped.setdefault(k, []).append(v)
+    return {k: sorted(v) for k, v in grouped.items()}
+
+
+def _champion(row):
+    """Winner of a Final match row (shoot-outs are read from the Observation)."""
+    if row["Team G"] != row["Opponent G"]:
+        return str(row["Team"] if row["Team G"] > row["Opponent G"] else row["Opponent"])
+    shootout = _PENALTIES_RE.match(str(row["Observation"]).strip())
+    return shootout.group(1) if shootout else None
+
+
+class FactIndex:
+    def __init__(self, match_df: pd.DataFrame, df: pd.DataFrame):
+        goals = match_df["Total_Goals_in_Match"].astype("int64")
+        matches = match_df.assign(Total_Goals_in_Match=goals)
+
+        # Years
+        by_year = matches.groupby("Year", observed=True)
+        year_goals = by_year["Total_Goals_in_Match"].sum()
+        year_matches = by_year.size()
+        hosts = _distinct(matches.astype({"Country": str}), "Year", "Country")
+        rounds = matches.groupby(["Year", "Round"], observed=True).size()
+        team_goals = df.groupby(["Year", "Team"], observed=True)["Team G"].sum()
+        conceded = df.groupby(["Year", "Team"], observed=True)["Opponent G"].sum()
+        year_teams = df.groupby("Year", observed=True)["Team"].nunique()
+        finals = matches[matches["Round"] == "Final"].sort_values(["Year", "Game #"])
+        # Years without a Final (e.g. 1950's final group) have no champion
+        champions = {int(row["Year"]): _champion(row) for _, row in finals.groupby("Year").tail(1).iterrows()}
+        top_scorers = _group_leaders(team_goals, "Year")
+        most_conceded = _group_leaders(conceded, "Year")
+        busiest_round = _group_leaders(rounds, "Year")
+        self.years = {}
+        for year in year_matches.index:
+            self.years[int(year)] = {
+                "hosts": hosts[year],
+                "matches": int(year_matches[year]),
+                "goals": int(year_goals[year]),
+                "teams": int(year_teams[year]),
+                "champion": champions.get(int(year)),
+                "top_scorers": top_scorers[year],
+                "most_conceded": most_conceded[year],
+                "busiest_round": busiest_round[year],
+            }
+
+        # Teams (one row per team per match, so every match counts for both sides)
+        outcome = (df["Team G"].astype("int64") - df["Opponent G"].astype("int64")).clip(-1, 1)
+        by_team = df.assign(Win=outcome == 1, Draw=outcome == 0, Loss=outcome == -1).groupby("Team", observed=True)
+        team_totals = by_team.agg(
+            matches=("Year", "size"), wins=("Win", "sum"), draws=("Draw", "sum"), losses=("Loss", "sum"),
+            goals_for=("Team G", "sum"), goals_against=("Opponent G", "sum"),
+            first=("Year", "min"), last=("Year", "max"), tournaments=("Year", "nunique"),
+        )
+        titles = pd.Series([y["champion"] for y in self.years.values() if y["champion"]]).value_counts()
+        self.teams = {}
+        for team, row in team_totals.iterrows():
+            facts = {name: int(value) for name, value in row.items()}
+            facts["titles"] = int(titles.get(str(team), 0))
+            self.teams[str(team)] = facts
+
+        # Stadiums
+        by_stadium = matches.groupby("Stadium", observed=True)
+        stadium_totals = by_stadium.agg(
+            matches=("Year", "size"), goals=("Total_Goals_in_Match", "sum"),
+            city=("City", "first"), country=("Country", "first"),
+        )
+        stadium_years = _distinct(matches.astype({"Year": int}), "Stadium", "Year")
+        self.stadiums = {
+            str(stadium): {
+                "matches": int(row["matches"]), "goals": int(row["goals"]),
+                "city": str(row["city"]).strip(), "country": str(row["country"]).strip(), "years": stadium_years[stadium],
+            }
+            for stadium, row in stadium_totals.iterrows()
+        }
+
+        # Host countries
+        by_country = matches.groupby("Country", observed=True)
+        country_years = _distinct(matches.astype({"Year": int}), "Country", "Year")
+        country_matches = by_country.size()
+        country_goals = by_country["Total_Goals_in_Match"].sum()
+        stadium_matches = matches.groupby(["Country", "Stadium"], observed=True).size()
+        stadium_goals = matches.groupby(["Country", "Stadium"], observed=True)["Total_Goals_in_Match"].sum()
+        busiest_stadium = _group_leaders(stadium_matches, "Country")
+        goal_rich_stadium = _group_leaders(stadium_goals, "Country")
+        self.countries = {
+            str(country): {
+                "years": country_years[country],
+                "matches": int(country_matches[country]),
+                "goals": int(country_goals[country]),
+                "busiest_stadium": busiest_stadium[country],
+                "goal_rich_stadium": goal_rich_stadium[country],
+            }
+            for country in country_matches.index
+        }
+
+        # Overall leaders
+        self.leaders = {
+            "host": _leaders(pd.Series({c: len(f["years"]) for c, f in self.countries.items()}, dtype="int64")),
+            "stadium_matches": _leaders(stadium_totals["matches"]),
+            "stadium_goals": _leaders(stadium_totals["goals"]),
+            "conceded": _leaders(team_totals["goals_against"]),
+            "rounds": _leaders(matches.groupby("Round", observed=True).size()),
+            "goals": _leaders(year_goals),
+            "champion": _leaders(titles) if not titles.empty else ([], 0),
+        }
+
+        # Entity names as token tuples, matched longest first
+        self._names = {}
+        for kind, labels in (("team", self.teams), ("stadium", self.stadiums), ("country", self.countries)):
+            for label in labels:
+                self._names.setdefault(tuple(_tokens(label)), {})[kind] = label
+        self._names.pop((), None)
+        self._longest = max((len(name) for name in self._names), default=0)
+
+    # ------------------------
+    # Entities
+    # ------------------------
+    def entities(self, text: str) -> dict:
+        """kind -> label of the first year/team/stadium/country named in `text`.
+
+        A four-digit number that is not a tournament year is returned as
+        "missing_year", so it is not answered with facts about other years.
+        """
+        found = {}
+        tokens = _tokens(text)
+        i = 0
+        while i < len(tokens):
+            if tokens[i].isdigit() and int(tokens[i]) in self.years:
+                found.setdefault("year", int(tokens[i]))
+                i += 1
+                continue
+            if tokens[i].isdigit() and len(tokens[i]) == 4:
+                found.setdefault("missing_year", int(tokens[i]))
+                i += 1
+                continue
+            for n in range(min(self._longest, len(tokens) - i), 0, -1):
+                kinds = self._names.get(tuple(tokens[i:i + n]))
+                if kinds:
+                    for kind, label in kinds.items():
+                        found.setdefault(kind, label)
+                    i += n
+                    break
+            else:
+                i += 1
+        return found
+
+    def answer(self, topic: str, text: str):
+        """Reply to a message on `topic` from the index; None when there is nothing to say."""
+        found = self.entities(text)
+        kinds = TOPIC_ENTITIES.get(topic, ())
+        if "year" in kinds and "missing_year" in found and "year" not in found:
+            return self._missing_year(found["missing_year"])
+        for kind in kinds:
+            if kind in found:
+                reply = getattr(self, f"_{kind}_{topic}", None)
+                if reply is not None:
+                    return reply(found[kind])
+        overall = getattr(self, f"_overall_{topic}", None)
+        # Overall leaders need at least one match
+        return None if overall is None or not self.years else overall()
+
+    # ------------------------
+    # Replies: _<entity kind>_<topic>(label) and _overall_<topic>()
+    # ------------------------
+    def _missing_year(self, year):
+        if not self.years:
+            return f"There is no data for {year} in this dataset."
+        return (
+            f"There is no data for {year} in this dataset; it covers World Cups "
+            f"from {min(self.years)} to {max(self.years)}."
+        )
+
+    def _year_host(self, year):
+        return f"The {year} World Cup was hosted by {_join(self.years[year]['hosts'])}."
+
+    def _country_host(self, country):
+        years = self.countries[country]["years"]
+        return f"{country} hosted the World Cup {_plural(len(years), 'time')} ({_join(map(str, years))})."
+
+    def _overall_host(self):
+        countries, times = self.leaders["host"]
+        if not countries:
+            return None
+        return f"{_join(countries)} hosted the most World Cups ({_plural(times, 'time')} each)." if len(countries) > 1 \
+            else f"{countries[0]} hosted the most World Cups ({_plural(times, 'time')})."
+
+    def _year_champion(self, year):
+        champion = self.years[year]["champion"]
+        if champion is None:
+            return f"The {year} World Cup had no single final match in this dataset."
+        return f"{champion} won the {year} World Cup."
+
+    def _team_champion(self, team):
+        titles = self.teams[team]["titles"]
+        if not titles:
+            return f"{team} has not won a World Cup final in this dataset."
+        years = [str(y) for y, f in self.years.items() if f["champion"] == team]
+        return f"{team} won the World Cup {_plural(titles, 'time')} ({_join(years)})."
+
+    def _overall_champion(self):
+        teams, titles = self.leaders["champion"]
+        if not teams:
+            return None
+        return f"{_join(teams)} won the most World Cup finals ({_plural(titles, 'title')})."
+
+    def _year_goals(self, year):
+        facts = self.years[year]
+        teams, goals = facts["top_scorers"]
+        return (
+            f"{facts['goals']} goals were scored in {facts['matches']} matches at the {year} World Cup "
+            f"({facts['goals'] / facts['matches']:.2f} per match); {_join(teams)} scored the most ({goals})."
+        )
+
+    def _stadium_goals(self, stadium):
+        facts = self.stadiums[stadium]
+        return (
+            f"{_plural(facts['goals'], 'goal')} were scored at {stadium} "
+            f"in {_plural(facts['matches'], 'match', 'matches')}."
+        )
+
+    def _team_goals(self, team):
+        facts = self.teams[team]
+        return (
+            f"{team} scored {facts['goals_for']} and conceded {facts['goals_against']} goals "
+            f"in {facts['matches']} World Cup matches."
+        )
+
+    def _country_goals(self, country):
+        facts = self.countries[country]
+        return (
+            f"{facts['goals']} goals were scored in {facts['matches']} matches at World Cups hosted by {country} "
+            f"({_join(map(str, facts['years']))})."
+        )
+
+    def _overall_goals(self):
+        years, goals = self.leaders["goals"]
+        return f"The highest-scoring World Cup was {_join(map(str, years))} with {goals} goals."
+
+    def _team_conceded(self, team):
+        facts = self.teams[team]
+        return (
+            f"{team} conceded {facts['goals_against']} goals in {facts['matches']} World Cup matches "
+            f"({facts['goals_against'] / facts['matches']:.2f} per match)."
+        )
+
+    def _year_conceded(self, year):
+        teams, goals = self.years[year]["most_conceded"]
+        return f"{_join(teams)} conceded the most goals at the {year} World Cup ({goals})."
+
+    def _overall_conceded(self):
+        teams, goals = self.leaders["conceded"]
+        return f"{_join(teams)} conceded the most World Cup goals ({goals})."
+
+    def _stadium_stadium_matches(self, stadium):
+        facts = self.stadiums[stadium]
+        return (
+            f"{stadium} ({facts['city']}, {facts['country']}) hosted {_plural(facts['matches'], 'match', 'matches')} "
+            f"in {_join(map(str, facts['years']))}."
+        )
+
+    def _country_stadium_matches(self, country):
+        stadiums, matches = self.countries[country]["busiest_stadium"]
+        return f"The busiest stadium in {country} was {_join(stadiums)} with {matches} matches."
+
+    def _year_stadium_matches(self, year):
+        facts = self.years[year]
+        return f"The {year} World Cup had {facts['matches']} matches in {_join(facts['hosts'])}."
+
+    def _overall_stadium_matches(self):
+        stadiums, matches = self.leaders["stadium_matches"]
+        return f"{_join(stadiums)} hosted the most World Cup matches ({matches})."
+
+    _stadium_stadium_goals = _stadium_goals
+
+    def _country_stadium_goals(self, country):
+        stadiums, goals = self.countries[country]["goal_rich_stadium"]
+        return f"The most goals in {country} were scored at {_join(stadiums)} ({goals})."
+
+    def _year_stadium_goals(self, year):
+        return self._year_goals(year)
+
+    def _overall_stadium_goals(self):
+        stadiums, goals = self.leaders["stadium_goals"]
+        return f"The most World Cup goals were scored at {_join(stadiums)} ({goals})."
+
+    def _year_rounds(self, year):
+        rounds, matches = self.years[year]["busiest_round"]
+        return f"At the {year} World Cup, {_join(rounds)} had the most matches ({matches})."
+
+    def _overall_rounds(self):
+        rounds, matches = self.leaders["rounds"]
+        return f"{_join(rounds)} has the most matches overall ({matches})."
+
+    def _team_team(self, team):
+        f = self.teams[team]
+        span = str(f["first"]) if f["first"] == f["last"] else f"{f['first']}–{f['last']}"
+        return (
+            f"{team} played {f['matches']} World Cup matches in {_plural(f['tournaments'], 'tournament')} ({span}): "
+            f"{f['wins']} wins, {f['draws']} draws, {f['losses']} losses, "
+            f"{f['goals_for']} goals scored and {f['goals_against']} conceded."
+        )
+
+    # With no intent matched, a message that names something gets its summary
+    _team_summary = _team_team
+    _stadium_summary = _stadium_stadium_matches
+
+    def _year_summary(self, year):
+        f = self.years[year]
+        champion = f" {f['champion']} won it." if f["champion"] else ""
+        return (
+            f"The {year} World Cup in {_join(f['hosts'])} had {f['teams']} teams, {f['matches']} matches "
+            f"and {f['goals']} goals.{champion}"
+        )
+
+    def _country_summary(self, country):
+        return self._country_host(country)
+
+
+def get_fact_index(match_df: pd.DataFrame, df: pd.DataFrame, version: str) -> FactIndex:
+    index = _indexes.get(version)
+    if index is not None:
+        return index
+    with _lock:
+        index = _indexes.get(version)
+        if index is None:
+            index = FactIndex(match_df, df)
+            _indexes.clear()  # only the current dataset version is kept
+            _indexes[version] = index
+    return index
+
+
+# ------------------------
+# Consistency with direct computation on the frames
+# ------------------------
+def check_facts(index: FactIndex, match_df: pd.DataFrame, df: pd.DataFrame) -> list:
+    """Recompute each stored fact with a scan of the frames; returns [(kind, label, field), ...] that differ."""
+    mismatches = []
+    for year, facts in index.years.items():
+        rows = match_df[match_df["Year"] == year]
+        expected = {"matches": len(rows), "goals": int(rows["Total_Goals_in_Match"].astype("int64").sum()),
+                    "hosts": sorted(set(rows["Country"].astype(str)))}
+        mismatches += [("year", year, k) for k, v in expected.items() if facts[k] != v]
+    for team, facts in index.teams.items():
+        rows = df[df["Team"] == team]
+        diff = rows["Team G"].astype("int64") - rows["Opponent G"].astype("int64")
+        expected = {"matches": len(rows), "wins": int((diff > 0).sum()), "draws": int((diff == 0).sum()),
+                    "goals_for": int(rows["Team G"].astype("int64").sum()),
+                    "goals_against": int(rows["Opponent G"].astype("int64").sum())}
+        mismatches += [("team", team, k) for k, v in expected.items() if facts[k] != v]
+    for stadium, facts in index.stadiums.items():
+        rows = match_df[match_df["Stadium"] == stadium]
+        expected = {"matches": len(rows), "goals": int(rows["Total_Goals_in_Match"].astype("int64").sum())}
+        mismatches += [("stadium", stadium, k) for k, v in expected.items() if facts[k] != v]
+    for country, facts in index.countries.items():
+        rows = match_df[match_df["Country"] == country]
+        if facts["years"] != sorted(set(int(y) for y in rows["Year"])):
+            mismatches.append(("country", country, "years"))
+    return mismatches
@@ -0,0 +1,91 @@
+import json
+import os
+import threading
+from collections import OrderedDict
+
+import plotly.graph_objects as go
+
+from telemetry import span
+
+# ------------------------
+# Bounded LRU cache of rendered (themed) Plotly figures
+# Keyed by (chart id, filter value, dataset version) and shared by every
+# session in the process. Figures are stored as JSON so cached entries are
+# immutable; each hit hands out a fresh Figure object.
+# ------------------------
+FIGURE_CACHE_SIZE = int(os.environ.get("FIGURE_CACHE_SIZE", "256"))
+
+EMPTY = ""  # cached marker for "no figure" (empty filter result)
+
+
+class FigureCache:
+    def __init__(self, maxsize: int = FIGURE_CACHE_SIZE):
+        self.maxsize = maxsize
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.payload_bytes = {}  # chart id -> size of its last built figure JSON
+
+    def get_json(self, key):
+        with self._lock:
+            payload = self._entries.get(key)
+            if payload is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return payload
+
+    def put_json(self, key, payload: str):
+        """Store a figure's JSON (or EMPTY) under `key`."""
+        with self._lock:
+            self.payload_bytes[key[0] if isinstance(key, tuple) else key] = len(payload)
+            self._entries[key] = payload
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def get_or_build(self, key, build):
+        """Return the cached figure for `key`, calling `build()` on a miss.
+
+        `build` may return None (nothing to draw); that is cached as well.
+        """
+        payload = self.get_json(key)
+        if payload is None:
+            chart_id = key[0] if isinstance(key, tuple) else key
+            with span(f"figure.build.{chart_id}"):
+                fig = build()
+                payload = EMPTY if fig is None else fig.to_json()
+            self.put_json(key, payload)
+        if payload == EMPTY:
+            return None
+        # The JSON came from an already validated figure
+        with span("figure.decode"):
+            return go.Figure(json.loads(payload), _validate=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "size": len(self._entries),
+                "maxsize": self.maxsize,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "payload_bytes": dict(self.payload_bytes),
+            }
+
+
+figure_cache = FigureCache()
+
+
+def cached_figure(chart_id: str, filter_value: str, version: str, build):
+    return figure_cache.get_or_build((chart_id, filter_value, version), build)
@@ -0,0 +1,187 @@
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+# ------------------------
+# Synthetic World Cup results for scale testing
+#
+# Produces the workbook's schema (one row per team per match, two rows per
+# Game #) with Poisson-distributed goals, a fixed pool of teams, host
+# countries with their own stadiums/cities, and a group stage followed by
+# knockout rounds in every tournament. Output is written in chunks, so tens
+# of millions of rows never have to fit in memory at once.
+# ------------------------
+COLUMNS = ["Year", "Game #", "Date", "Time", "Round", "Stadium", "City", "Country",
+           "Team", "Team G", "Opponent", "Opponent G", "Observation"]
+
+KICKOFF_TIMES = np.array(["13:00", "15:00", "16:00", "17:30", "19:00", "20:00", "21:00"], dtype=object)
+GROUP_ROUNDS = np.array([f"Group {c}" for c in "ABCDEFGH"], dtype=object)
+KNOCKOUT_ROUNDS = ["Round of 16"] * 8 + ["Quarter-finals"] * 4 + ["Semi-finals"] * 2 + ["Third place", "Final"]
+
+XLSX_MAX_ROWS = 1_048_575  # sheet limit minus the header row
+MAX_YEAR = 9999            # keeps every Date representable
+
+
+def _round_labels(games_per_tournament: int) -> np.ndarray:
+    knockout = KNOCKOUT_ROUNDS if games_per_tournament >= 2 * len(KNOCKOUT_ROUNDS) else []
+    group_games = games_per_tournament - len(knockout)
+    groups = GROUP_ROUNDS[np.arange(group_games) % len(GROUP_ROUNDS)]
+    return np.concatenate([groups, np.array(knockout, dtype=object)])
+
+
+def generate_chunks(rows: int, chunk_rows: int = 1_000_000, seed: int = 42, n_teams: int = 200,
+                    n_countries: int = 40, stadiums_per_country: int = 12, games_per_tournament: int = None,
+                    goal_rate: float = 1.4, first_year: int = 1930):
+    """Yield DataFrames of at most `chunk_rows` rows, `rows` rows in total.
+
+    Tournaments are four years apart. By default they have 64 games, growing
+    only when that is needed to keep every year below MAX_YEAR.
+    """
+    rng = np.random.default_rng(seed)
+    matches_total = rows // 2
+    max_tournaments = (MAX_YEAR - first_year) // 4 + 1
+    if games_per_tournament is None:
+        games_per_tournament = max(64, -(-matches_total // max_tournaments))
+    n_tournaments = -(-matches_total // games_per_tournament)
+    if n_tournaments > max_tournaments:
+        raise ValueError(f"{n_tournaments} tournaments would run past year {MAX_YEAR}; "
+                         f"raise games_per_tournament")
+    rounds = _round_labels(games_per_tournament)
+
+    teams = np.array([f"Team {i:04d}" for i in range(n_teams)], dtype=object)
+    countries = np.array([f"Country {i:03d}" for i in range(n_countries)], dtype=object)
+    # A few countries host far more often than the rest, like the real data
+    host_weights = 1.0 / np.arange(1, n_countries + 1)
+    host_weights /= host_weights.sum()
+    tournament_hosts = rng.choice(n_countries, size=n_tournaments, p=host_weights)
+    # Each country has its own stadiums; lower-numbered ones are used more
+    stadium_weights = 1.0 / np.arange(1, stadiums_per_country + 1)
+    stadium_weights /= stadium_weights.sum()
+
+    chunk_matches = max(1, chunk_rows // 2)
+    for start in range(0, matches_total, chunk_matches):
+        match_index = np.arange(start, min(start + chunk_matches, matches_total))
+        n = len(match_index)
+
+        t_index = match_index // games_per_tournament
+        game = match_index % games_per_tournament
+        years = first_year + 4 * t_index
+        hosts = tournament_hosts[t_index]
+        stadium_no = rng.choice(stadiums_per_country, size=n, p=stadium_weights)
+
+        home = rng.integers(0, n_teams, size=n)
+        away = (home + rng.integers(1, n_teams, size=n)) % n_teams
+        home_goals = rng.poisson(goal_rate, size=n)
+        away_goals = rng.poisson(goal_rate, size=n)
+
+        country = countries[hosts]
+        venue = pd.Series(country).str.cat(pd.Series(stadium_no + 1).astype(str), sep=" Stadium ").to_numpy()
+        city = pd.Series(country).str.cat(pd.Series(stadium_no + 1).astype(str), sep=" City ").to_numpy()
+        # Four games a day from 10 June; long tournaments wrap within the year
+        dates = (pd.to_datetime(pd.Series(years).astype(str) + "-06-10")
+                 + pd.to_timedelta((game // 4) % 200, unit="D")).to_numpy()
+
+        # Two rows per match: home perspective, then away perspective
+        def paired(a, b=None):
+            out = np.empty(2 * n, dtype=np.asarray(a).dtype)
+            out[0::2] = a
+            out[1::2] = a if b is None else b
+            return out
+
+        chunk = pd.DataFrame({
+            "Year": paired(years),
+            "Game #": paired(game + 1),
+            "Date": paired(dates),
+            "Time": paired(KICKOFF_TIMES[game % len(KICKOFF_TIMES)]),
+            "Round": paired(rounds[game]),
+            "Stadium": paired(venue),
+            "City": paired(city),
+            "Country": paired(country),
+            "Team": paired(teams[home], teams[away]),
+            "Team G": paired(home_goals, away_goals),
+            "Opponent": paired(teams[away], teams[home]),
+            "Opponent G": paired(away_goals, home_goals),
+            "Observation": "",
+        }, columns=COLUMNS)
+
+        yield chunk
+
+
+# ------------------------
+# Writers
+# ------------------------
+def write(chunks, out: str, log=print) -> int:
+    """Write chunks to `out`; the format follows the extension. Returns rows written."""
+    ext = os.path.splitext(out)[1].lower()
+    tmp = f"{out}.tmp-{os.getpid()}{ext}"
+    written = 0
+    if ext == ".parquet":
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        writer = None
+        try:
+            for chunk in chunks:
+                table = pa.Table.from_pandas(chunk, preserve_index=False)
+                if writer is None:
+                    writer = pq.ParquetWriter(tmp, table.schema)
+                writer.write_table(table)
+                written += len(chunk)
+                log(f"{written} rows")
+        finally:
+            if writer is not None:
+                writer.close()
+    elif ext == ".csv":
+        for chunk in chunks:
+            chunk.to_csv(tmp, mode="a" if written else "w", header=not written, index=False)
+            written += len(chunk)
+            log(f"{written} rows")
+    elif ext in (".xlsx", ".xlsm"):
+        from openpyxl import Workbook
+
+        wb = Workbook(write_only=True)
+        ws = wb.create_sheet()
+        ws.append(COLUMNS)
+        for chunk in chunks:
+            if written + len(chunk) > XLSX_MAX_ROWS:
+                raise ValueError(f"xlsx holds at most {XLSX_MAX_ROWS} rows; use .parquet or .csv")
+            for row in chunk.itertuples(index=False):
+                ws.append([v.to_pydatetime() if isinstance(v, pd.Timestamp) else v for v in row])
+            written += len(chunk)
+            log(f"{written} rows")
+        wb.save(tmp)
+    else:
+        raise ValueError(f"Unsupported output format: {out}")
+    os.replace(tmp, out)
+    return written
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Generate synthetic World Cup results")
+    parser.add_argument("--rows", type=int, default=1_000_000, help="team rows (two per match)")
+    parser.add_argument("--out", default="synthetic_results.parquet", help=".parquet, .csv or .xlsx")
+    parser.add_argument("--chunk-rows", type=int, default=1_000_000)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--teams", type=int, default=200)
+    parser.add_argument("--countries", type=int, default=40)
+    parser.add_argument("--stadiums-per-country", type=int, default=12)
+    parser.add_argument("--games-per-tournament", type=int, default=None,
+                        help="default: 64, or more when needed to stay below year %d" % MAX_YEAR)
+    args = parser.parse_args(argv)
+
+    started = time.perf_counter()
+    chunks = generate_chunks(
+        args.rows, args.chunk_rows, args.seed, args.teams, args.countries,
+        args.stadiums_per_country, args.games_per_tournament,
+    )
+    written = write(chunks, args.out)
+    print(f"wrote {written} rows to {args.out} in {time.perf_counter() - started:.1f}s")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,329 @@
+import argparse
+import hashlib
+import json
+import os
+import re
+import shutil
+import sys
+import time
+
+import pandas as pd
+
+# ------------------------
+# Multi-source ingestion into a partitioned Parquet store
+#
+#   store/
+#     manifest.json                        sources, row counts, store version
+#     teams/Tournament=<t>/Year=<y>/*.parquet    one row per team per match (df)
+#     matches/Tournament=<t>/Year=<y>/*.parquet  one row per match (match_df)
+#
+# Sources (xlsx / csv / parquet) are streamed in chunks, normalized to the
+# dashboard schema, de-duplicated incrementally across chunks and sources,
+# and appended to the store; nothing is held in memory beyond one chunk and
+# the set of keys already written.
+# ------------------------
+SCHEMA_COLUMNS = ["Year", "Game #", "Team", "Opponent", "Team G", "Opponent G", "Stadium", "Country", "Round"]
+OPTIONAL_COLUMNS = ["Date", "Time", "City", "Observation"]
+INT_COLUMNS = ["Year", "Game #", "Team G", "Opponent G", "Total_Goals_in_Match"]
+STRING_COLUMNS = ["Team", "Opponent", "Stadium", "Country", "Round", "City", "Time", "Observation"]
+PARTITION_COLUMNS = ["Tournament", "Year"]
+MATCH_KEY = ["Tournament", "Year", "Game #"]
+TEAM_KEY = MATCH_KEY + ["Team"]
+
+CHUNK_ROWS = 100_000
+
+# Source header (lowercased, letters/digits only) -> schema column
+COLUMN_ALIASES = {
+    "year": "Year", "season": "Year",
+    "game": "Game #", "gamenumber": "Game #", "gameno": "Game #", "matchid": "Game #", "matchnumber": "Game #",
+    "team": "Team",
+    "opponent": "Opponent", "opponentteam": "Opponent",
+    "teamg": "Team G", "teamgoals": "Team G", "goalsfor": "Team G",
+    "opponentg": "Opponent G", "opponentgoals": "Opponent G", "goalsagainst": "Opponent G",
+    "stadium": "Stadium", "venue": "Stadium",
+    "country": "Country", "hostcountry": "Country", "host": "Country",
+    "round": "Round", "stage": "Round",
+    "date": "Date", "time": "Time", "city": "City",
+    "observation": "Observation", "notes": "Observation",
+    "tournament": "Tournament", "competition": "Tournament",
+}
+
+
+def _alias(name) -> str:
+    key = re.sub(r"[^a-z0-9]", "", str(name).lower())
+    return COLUMN_ALIASES.get(key, str(name))
+
+
+# ------------------------
+# Chunked readers
+# ------------------------
+def _read_xlsx_chunks(path: str, chunk_rows: int):
+    from openpyxl import load_workbook
+
+    wb = load_workbook(path, read_only=True, data_only=True)
+    try:
+        rows = wb.active.iter_rows(values_only=True)
+        header = next(rows, None)
+        if header is None:
+            return
+        batch = []
+        for row in rows:
+            batch.append(row)
+            if len(batch) >= chunk_rows:
+                yield pd.DataFrame(batch, columns=header)
+                batch = []
+        if batch:
+            yield pd.DataFrame(batch, columns=header)
+    finally:
+        wb.close()
+
+
+def _read_parquet_chunks(path: str, chunk_rows: int):
+    import pyarrow.parquet as pq
+
+    for batch in pq.ParquetFile(path).iter_batches(batch_size=chunk_rows):
+        yield batch.to_pandas()
+
+
+def read_chunks(path: str, chunk_rows: int = CHUNK_ROWS):
+    ext = os.path.splitext(path)[1].lower()
+    if ext in (".xlsx", ".xlsm"):
+        yield from _read_xlsx_chunks(path, chunk_rows)
+    elif ext == ".csv":
+        yield from pd.read_csv(path, chunksize=chunk_rows)
+    elif ext == ".parquet":
+        yield from _read_parquet_chunks(path, chunk_rows)
+    else:
+        raise ValueError(f"Unsupported source format: {path}")
+
+
+# ------------------------
+# Normalization
+# ------------------------
+def normalize_chunk(chunk: pd.DataFrame, tournament: str) -> pd.DataFrame:
+    """Rename to the dashboard schema, fix dtypes and add derived columns."""
+    chunk = chunk.rename(columns=_alias)
+    missing = [c for c in SCHEMA_COLUMNS if c not in chunk.columns]
+    if missing:
+        raise ValueError(f"Source is missing required columns: {missing}")
+
+    out = pd.DataFrame(index=chunk.index)
+    if "Tournament" in chunk.columns:
+        out["Tournament"] = chunk["Tournament"].fillna(tournament).astype(str)
+    else:
+        out["Tournament"] = tournament
+    for col in SCHEMA_COLUMNS + OPTIONAL_COLUMNS:
+        out[col] = chunk[col] if col in chunk.columns else None
+
+    # Rows without a match key or score cannot be placed; drop them
+    for col in ["Year", "Game #", "Team G", "Opponent G"]:
+        out[col] = pd.to_numeric(out[col], errors="coerce")
+    out = out.dropna(subset=["Year", "Game #", "Team", "Team G", "Opponent G"])
+
+    out["Total_Goals_in_Match"] = out["Team G"] + out["Opponent G"]
+    for col in INT_COLUMNS:
+        out[col] = out[col].astype("int64")
+    out["Date"] = pd.to_datetime(out["Date"], errors="coerce")
+    for col in STRING_COLUMNS:
+        out[col] = out[col].astype(object).where(out[col].notna(), None)
+        out[col] = out[col].map(lambda v: v if v is None else str(v).strip())
+    return out.reset_index(drop=True)
+
+
+# ------------------------
+# Incremental de-duplication
+# ------------------------
+class Deduplicator:
+    """Remembers 64-bit hashes of keys already written and filters repeats."""
+
+    def __init__(self, key_columns):
+        self.key_columns = key_columns
+        self.seen = set()
+
+    def filter(self, chunk: pd.DataFrame) -> pd.DataFrame:
+        chunk = chunk.drop_duplicates(subset=self.key_columns)
+        hashes = pd.util.hash_pandas_object(chunk[self.key_columns], index=False).to_numpy()
+        seen = self.seen
+        keep = [h not in seen for h in hashes.tolist()]
+        seen.update(hashes[keep].tolist())
+        return chunk[keep]
+
+
+# ------------------------
+# Store writer
+# ------------------------
+def _arrow_schema():
+    import pyarrow as pa
+
+    fields = [pa.field("Tournament", pa.string())]
+    for col in SCHEMA_COLUMNS + OPTIONAL_COLUMNS + ["Total_Goals_in_Match"]:
+        if col in INT_COLUMNS:
+            fields.append(pa.field(col, pa.int64()))
+        elif col == "Date":
+            fields.append(pa.field(col, pa.timestamp("us")))
+        else:
+            fields.append(pa.field(col, pa.string()))
+    return pa.schema(fields)
+
+
+def _write_partitioned(frame: pd.DataFrame, root: str, part_no: int):
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    if frame.empty:
+        return
+    table = pa.Table.from_pandas(frame, schema=_arrow_schema(), preserve_index=False)
+    pq.write_to_dataset(
+        table,
+        root,
+        partition_cols=PARTITION_COLUMNS,
+        basename_template=f"part-{part_no:06d}-{{i}}.parquet",
+        existing_data_behavior="overwrite_or_ignore",
+    )
+
+
+def parse_source(spec: str):
+    """'path' or 'path:Tournament name' -> (path, tournament)."""
+    path, sep, tournament = spec.partition(":")
+    if not sep or not tournament or os.path.sep in tournament:
+        path, tournament = spec, ""
+    if not tournament:
+        tournament = os.path.splitext(os.path.basename(path))[0]
+    return path, tournament
+
+
+def ingest(sources, store_dir: str, chunk_rows: int = CHUNK_ROWS, log=print) -> dict:
+    """Stream `sources` [(path, tournament), ...] into a fresh store at `store_dir`."""
+    started = time.perf_counter()
+    tmp_dir = f"{store_dir}.tmp-{os.getpid()}"
+    shutil.rmtree(tmp_dir, ignore_errors=True)
+    os.makedirs(tmp_dir)
+
+    teams_seen = Deduplicator(TEAM_KEY)
+    matches_seen = Deduplicator(MATCH_KEY)
+    digest = hashlib.sha256()
+    manifest = {"sources": [], "team_rows": 0, "match_rows": 0}
+    part_no = 0
+
+    for path, tournament in sources:
+        rows_in = rows_out = 0
+        for raw in read_chunks(path, chunk_rows):
+            chunk = normalize_chunk(raw, tournament)
+            rows_in += len(raw)
+
+            teams = teams_seen.filter(chunk)
+            matches = matches_seen.filter(teams)
+            _write_partitioned(teams, os.path.join(tmp_dir, "teams"), part_no)
+            _write_partitioned(matches, os.path.join(tmp_dir, "matches"), part_no)
+            part_no += 1
+
+            rows_out += len(teams)
+            manifest["team_rows"] += len(teams)
+            manifest["match_rows"] += len(matches)
+            digest.update(pd.util.hash_pandas_object(teams, index=False).to_numpy().tobytes())
+        manifest["sources"].append({"path": path, "tournament": tournament, "rows_read": rows_in, "rows_kept": rows_out})
+        log(f"{path} [{tournament}]: {rows_in} rows read, {rows_out} kept")
+
+    manifest["version"] = digest.hexdigest()[:16]
+    manifest["seconds"] = round(time.perf_counter() - started, 3)
+    with open(os.path.join(tmp_dir, "manifest.json"), "w") as f:
+        json.dump(manifest, f, indent=2)
+
+    # Swap the finished store into place
+    shutil.rmtree(store_dir, ignore_errors=True)
+    os.replace(tmp_dir, store_dir)
+    log(f"store {store_dir}: {manifest['team_rows']} team rows, {manifest['match_rows']} matches "
+        f"in {manifest['seconds']}s (version {manifest['version']})")
+    return manifest
+
+
+# ------------------------
+# Store reader
+# ------------------------
+def is_store(path: str) -> bool:
+    return os.path.isfile(os.path.join(path, "manifest.json"))
+
+
+def read_manifest(store_dir: str) -> dict:
+    with open(os.path.join(store_dir, "manifest.json")) as f:
+        return json.load(f)
+
+
+def read_store(store_dir: str, kind: str = "matches", columns=None, tournament=None, years=None,
+               year_range=None) -> pd.DataFrame:
+    """Read part of the store; tournament/year filters prune whole partitions.
+
+    `years` is a list of years, `year_range` an inclusive (first, last).
+    """
+    filters = []
+    if tournament is not None:
+        filters.append(("Tournament", "=", tournament))
+    if years is not None:
+        filters.append(("Year", "in", [int(y) for y in years]))
+    if year_range is not None:
+        filters += [("Year", ">=", int(year_range[0])), ("Year", "<=", int(year_range[1]))]
+    frame = pd.read_parquet(
+        os.path.join(store_dir, kind),
+        columns=columns,
+        filters=filters or None,
+    )
+    # Partition columns come back as categoricals of their path strings
+    if "Year" in frame.columns:
+        frame["Year"] = frame["Year"].astype("int64")
+    if "Tournament" in frame.columns:
+        frame["Tournament"] = frame["Tournament"].astype(str)
+    if {"Tournament", "Year", "Game #"} <= set(frame.columns):
+        frame = frame.sort_values(["Tournament", "Year", "Game #"], kind="stable").reset_index(drop=True)
+    return frame
+
+
+def tournaments(store_dir: str) -> list:
+    """Tournaments in the store, in the order they were ingested."""
+    return list(dict.fromkeys(source["tournament"] for source in read_manifest(store_dir)["sources"]))
+
+
+def resolve_tournament(store_dir: str, tournament=None) -> str:
+    """The tournament a load reads: `tournament`, or the first one ingested.
+
+    Matches are keyed by (Year, Game #) downstream, and those keys repeat
+    across tournaments, so a load always covers exactly one of them.
+    """
+    known = tournaments(store_dir)
+    if tournament is None:
+        if not known:
+            raise ValueError(f"Store {store_dir} has no tournaments")
+        return known[0]
+    if tournament not in known:
+        raise ValueError(f"Tournament {tournament!r} is not in {store_dir} (has {known})")
+    return tournament
+
+
+def load_store(store_dir: str, tournament=None, year_range=None):
+    """(df, match_df, version) for one tournament (default: the first ingested).
+
+    Only that tournament's partitions are read, and with `year_range`
+    (inclusive first, last) only those years' partitions.
+    """
+    manifest = read_manifest(store_dir)
+    tournament = resolve_tournament(store_dir, tournament)
+    df = read_store(store_dir, "teams", tournament=tournament, year_range=year_range)
+    match_df = read_store(store_dir, "matches", tournament=tournament, year_range=year_range)
+    version = f"{manifest['version']}-{tournament}"
+    if year_range is not None:
+        version += f"-{year_range[0]}-{year_range[1]}"
+    return df, match_df, version
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Ingest match sources into a partitioned Parquet store")
+    parser.add_argument("sources", nargs="+", help="xlsx/csv/parquet files, optionally as path:Tournament")
+    parser.add_argument("--out", default="store", help="store directory (replaced atomically)")
+    parser.add_argument("--chunk-rows", type=int, default=CHUNK_ROWS)
+    args = parser.parse_args(argv)
+
+    ingest([parse_source(s) for s in args.sources], args.out, args.chunk_rows)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
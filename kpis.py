@@ -0,0 +1,229 @@
+import threading
+
+import numpy as np
+import pandas as pd
+
+import data_loader
+
+# ------------------------
+# Running KPI counters for the KPI strip
+#
+# Matches and goals are counted per (host country, year) cell, and the teams
+# of each cell are kept in a HyperLogLog-style distinct sketch: exact team
+# hashes while a cell is small (the "sparse" form of HLL++), dense registers
+# once it has more than SPARSE_LIMIT teams. A country / year-range selection
+# sums the counters and unions the sketches of its cells, so the strip never
+# rescans the frames; there are only as many cells as tournaments. Rows
+# appended to the data (data_loader.delta_for()) are added to the previous
+# version's counters instead of rebuilding them.
+# ------------------------
+ALL = "All"
+HLL_PRECISION = 10                       # 2**10 dense registers, ~3% standard error
+SPARSE_LIMIT = 1 << (HLL_PRECISION - 2)  # distinct teams a cell keeps exactly
+
+_lock = threading.Lock()
+_sketches = {}  # dataset version -> KpiSketch (latest only)
+
+
+def _hll_alpha(m: int) -> float:
+    return {16: 0.673, 32: 0.697, 64: 0.709}.get(m, 0.7213 / (1 + 1.079 / m))
+
+
+def hll_estimate(registers: np.ndarray) -> float:
+    """HyperLogLog cardinality estimate (with linear counting for small sets)."""
+    m = len(registers)
+    raw = _hll_alpha(m) * m * m / np.sum(np.ldexp(1.0, -registers.astype(np.int64)))
+    zeros = int(np.count_nonzero(registers == 0))
+    if raw <= 2.5 * m and zeros:
+        return m * np.log(m / zeros)
+    return float(raw)
+
+
+def hll_registers(hashes: np.ndarray, precision: int = HLL_PRECISION) -> np.ndarray:
+    """Dense HyperLogLog registers of 64-bit hashes."""
+    rest_bits = 64 - precision
+    index = (hashes >> np.uint64(rest_bits)).astype(np.int64)
+    rest = hashes & np.uint64((1 << rest_bits) - 1)
+    # Rank = position of the first set bit in the remaining bits (frexp gives
+    # the bit length; float rounding at the very top is clipped back)
+    _, bit_length = np.frexp(rest.astype(np.float64))
+    ranks = np.clip(rest_bits - bit_length + 1, 1, rest_bits + 1).astype(np.uint8)
+    registers = np.zeros(1 << precision, dtype=np.uint8)
+    np.maximum.at(registers, index, ranks)
+    return registers
+
+
+def _team_hashes(teams: pd.Series):
+    """(category codes, 64-bit hash per category) of a team column."""
+    teams = teams.astype("category")
+    labels = np.asarray(teams.cat.categories.astype(str), dtype=object)
+    return teams.cat.codes.to_numpy(np.int64), pd.util.hash_array(labels)
+
+
+class KpiSketch:
+    def __init__(self, precision: int = HLL_PRECISION):
+        self.precision = precision
+        self._cells = {}  # (country, year) -> row
+        self.country = np.empty(0, dtype=object)
+        self.year = np.empty(0, dtype=np.int64)
+        self.matches = np.empty(0, dtype=np.int64)
+        self.goals = np.empty(0, dtype=np.int64)
+        # Sparse cells: distinct (cell, team hash) pairs
+        self.pair_cell = np.empty(0, dtype=np.int64)
+        self.pair_hash = np.empty(0, dtype=np.uint64)
+        # Dense cells: row -> HLL registers
+        self.dense = {}
+
+    def copy(self) -> "KpiSketch":
+        other = KpiSketch(self.precision)
+        other._cells = dict(self._cells)
+        other.country, other.year = self.country.copy(), self.year.copy()
+        other.matches, other.goals = self.matches.copy(), self.goals.copy()
+        other.pair_cell, other.pair_hash = self.pair_cell.copy(), self.pair_hash.copy()
+        other.dense = {row: registers.copy() for row, registers in self.dense.items()}
+        return other
+
+    def _rows(self, keys) -> np.ndarray:
+        """Cell rows for (country, year) keys, adding cells for new ones."""
+        new = [key for key in dict.fromkeys(keys) if key not in self._cells]
+        if new:
+            for key in new:
+                self._cells[key] = len(self._cells)
+            self.country = np.concatenate([self.country, np.array([c for c, _ in new], dtype=object)])
+            self.year = np.concatenate([self.year, np.array([y for _, y in new], dtype=np.int64)])
+            self.matches = np.concatenate([self.matches, np.zeros(len(new), dtype=np.int64)])
+            self.goals = np.concatenate([self.goals, np.zeros(len(new), dtype=np.int64)])
+        return np.array([self._cells[key] for key in keys], dtype=np.int64)
+
+    def add(self, match_df: pd.DataFrame, df: pd.DataFrame):
+        """Count new matches (and their team rows) into the cells."""
+        if len(match_df):
+            by_cell = match_df.groupby(["Country", "Year"], observed=True)["Total_Goals_in_Match"].agg(["size", "sum"])
+            rows = self._rows([(str(c), int(y)) for c, y in by_cell.index])
+            np.add.at(self.matches, rows, by_cell["size"].to_numpy(np.int64))
+            np.add.at(self.goals, rows, by_cell["sum"].to_numpy(np.int64))
+        if len(df):
+            by_cell = df.groupby(["Country", "Year"], observed=True)
+            cell_rows = self._rows([(str(c), int(y)) for c, y in by_cell.size().index])
+            codes, hashes = _team_hashes(df["Team"])
+            self._add_teams(cell_rows[by_cell.ngroup().to_numpy()], hashes[codes])
+
+    def _add_teams(self, cells: np.ndarray, hashes: np.ndarray):
+        for row in set(self.dense).intersection(cells.tolist()):
+            selected = cells == row
+            np.maximum(self.dense[row], hll_registers(hashes[selected], self.precision), out=self.dense[row])
+            cells, hashes = cells[~selected], hashes[~selected]
+
+        cells = np.concatenate([self.pair_cell, cells])
+        hashes = np.concatenate([self.pair_hash, hashes])
+        order = np.lexsort((hashes, cells))
+        cells, hashes = cells[order], hashes[order]
+        keep = np.r_[True, (cells[1:] != cells[:-1]) | (hashes[1:] != hashes[:-1])]
+        cells, hashes = cells[keep], hashes[keep]
+
+        # Cells that outgrew the exact form switch to dense registers
+        counts = np.bincount(cells, minlength=len(self.matches))
+        for row in np.flatnonzero(counts > SPARSE_LIMIT):
+            self.dense[int(row)] = hll_registers(hashes[cells == row], self.precision)
+        sparse = counts[cells] <= SPARSE_LIMIT
+        self.pair_cell, self.pair_hash = cells[sparse], hashes[sparse]
+
+    def distinct_teams(self, mask: np.ndarray) -> float:
+        """Distinct teams over the selected cells: exact unless a dense cell is selected."""
+        hashes = np.unique(self.pair_hash[mask[self.pair_cell]])
+        dense = [registers for row, registers in self.dense.items() if mask[row]]
+        if not dense:
+            return float(len(hashes))
+        registers = np.maximum.reduce(dense + [hll_registers(hashes, self.precision)])
+        return hll_estimate(registers)
+
+    def query(self, country: str = ALL, years=None) -> dict:
+        """KPIs for a host country ("All" for every one) and an inclusive (first, last) year range."""
+        mask = self.matches > 0
+        if country != ALL:
+            mask &= self.country == country
+        if years is not None:
+            mask &= (self.year >= years[0]) & (self.year <= years[1])
+        return _kpis(int(self.matches[mask].sum()), len(np.unique(self.year[mask])),
+                     int(round(self.distinct_teams(mask))), int(self.goals[mask].sum()))
+
+
+def _kpis(matches: int, tournaments: int, teams: int, goals: int) -> dict:
+    return {
+        "matches": matches,
+        "tournaments": tournaments,
+        "teams": teams,
+        "goals": goals,
+        "goals_per_match": goals / matches if matches else 0.0,
+        "goals_per_tournament": goals / tournaments if tournaments else 0.0,
+    }
+
+
+def kpis_for(match_df: pd.DataFrame, df: pd.DataFrame) -> dict:
+    """Exact KPIs over already selected matches and their team rows."""
+    return _kpis(len(match_df), int(match_df["Year"].nunique()), int(df["Team"].nunique()),
+                 int(match_df["Total_Goals_in_Match"].sum()))
+
+
+def build_sketch(match_df: pd.DataFrame, df: pd.DataFrame) -> KpiSketch:
+    sketch = KpiSketch()
+    sketch.add(match_df, df)
+    return sketch
+
+
+def _sketch_from_delta(version: str):
+    delta = data_loader.delta_for(version)
+    if delta is None:
+        return None
+    previous_version, delta_df, delta_match = delta
+    previous = _sketches.get(previous_version)
+    if previous is None:
+        return None
+    # The previous version's sketch may still be read by other sessions
+    sketch = previous.copy()
+    sketch.add(delta_match, delta_df)
+    return sketch
+
+
+def get_sketch(match_df: pd.DataFrame, df: pd.DataFrame, version: str) -> KpiSketch:
+    sketch = _sketches.get(version)
+    if sketch is not None:
+        return sketch
+    with _lock:
+        sketch = _sketches.get(version)
+        if sketch is None:
+            sketch = _sketch_from_delta(version)
+            if sketch is None:
+                sketch = build_sketch(match_df, df)
+            _sketches.clear()  # only the current dataset version is kept
+            _sketches[version] = sketch
+    return sketch
+
+
+# ------------------------
+# Agreement with exact counts from the frames
+# ------------------------
+def check_sketch(sketch: KpiSketch, match_df: pd.DataFrame, df: pd.DataFrame, combos=(), tolerance: float = 0.05) -> list:
+    """Compare sketch KPIs with exact ones; returns [(combo, field), ...] that differ.
+
+    Counters must match exactly; the team count within `tolerance` (relative).
+    `combos` are (country, years) pairs; "All" and every host country are
+    always checked.
+    """
+    countries = sorted(match_df["Country"].astype(str).unique())
+    mismatches = []
+    for country, years in list(combos) + [(ALL, None)] + [(c, None) for c in countries]:
+        selected = match_df if country == ALL else match_df[match_df["Country"] == country]
+        if years is not None:
+            selected = selected[selected["Year"].between(*years)]
+        rows = df[pd.MultiIndex.from_frame(df[["Year", "Game #"]]).isin(
+            pd.MultiIndex.from_frame(selected[["Year", "Game #"]]))]
+        expected, got = kpis_for(selected, rows), sketch.query(country, years)
+        for field, value in expected.items():
+            if field == "teams":
+                wrong = abs(got[field] - value) > max(1, tolerance * value)
+            else:
+                wrong = got[field] != value
+            if wrong:
+                mismatches.append(((country, years), field))
+    return mismatches
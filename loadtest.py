@@ -0,0 +1,233 @@
+import argparse
+import contextlib
+import gc
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+
+import numpy as np
+
+# ------------------------
+# Load test of concurrent dashboard sessions
+#
+# Each simulated session is a headless Streamlit AppTest of app.py: it loads
+# the page, logs in with a test account, then for every step switches the
+# sidebar question and the Dashboard country, one script rerun each. The
+# sessions of a level run at the same time, each in its own thread, released
+# together by a barrier. Like the sessions of a Streamlit server they share
+# this process, so the loaded data, every process-wide cache and its locks,
+# while each keeps its own session state. Logins go to a throwaway credential
+# store, not auth.db.
+# ------------------------
+APP_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "app.py")
+USERNAME, PASSWORD = "loadtest", "loadtest-password"  # created in the throwaway store
+RUN_TIMEOUT = 120  # seconds per rerun before AppTest gives up
+
+
+def rss_mb() -> float:
+    """Resident set size of this process (peak RSS where /proc is missing)."""
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    import resource
+
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024 if sys.platform == "darwin" else 1024)
+
+
+class _KeepRuntime(type):
+    """Metaclass of the Runtime class AppTest sees while runs overlap.
+
+    AppTest installs a mock Runtime singleton at the start of every run and
+    clears it at the end, which would pull it from under any run still in
+    flight. Here the first mock becomes the shared Runtime, as the sessions of
+    a real server share one, and AppTest's install and clear go nowhere.
+    """
+
+    def __setattr__(cls, name, value):
+        from streamlit.runtime import Runtime
+
+        if name == "_instance":
+            if value is not None and Runtime._instance is None:
+                Runtime._instance = value
+            return
+        super().__setattr__(name, value)
+
+
+@contextlib.contextmanager
+def overlapping_runs():
+    """Let AppTest runs of different sessions overlap in threads."""
+    from unittest import mock
+
+    from streamlit.runtime import Runtime
+    from streamlit.testing.v1.util import patch_config_options
+
+    shared = _KeepRuntime("Runtime", (Runtime,), {})
+    # Patched once around the level, so each run's own patch and restore of
+    # config.get_option swaps between equivalent mocks
+    with patch_config_options({"global.appTest": True}), \
+            mock.patch("streamlit.testing.v1.app_test.Runtime", shared):
+        try:
+            yield
+        finally:
+            Runtime._instance = None
+
+
+class InFlight:
+    """Counts reruns in progress across sessions and keeps the peak."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.current = 0
+        self.peak = 0
+
+    @contextlib.contextmanager
+    def track(self):
+        with self._lock:
+            self.current += 1
+            self.peak = max(self.peak, self.current)
+        try:
+            yield
+        finally:
+            with self._lock:
+                self.current -= 1
+
+
+class Session:
+    def __init__(self, in_flight=None):
+        from streamlit.testing.v1 import AppTest
+
+        self.app = AppTest.from_file(APP_PATH, default_timeout=RUN_TIMEOUT)
+        self.in_flight = in_flight or InFlight()
+        self.latencies = []  # seconds per rerun
+        self.errors = []
+
+    def _run(self):
+        started = time.perf_counter()
+        with self.in_flight.track():
+            self.app.run()
+        self.latencies.append(time.perf_counter() - started)
+        self.errors.extend(e.value for e in self.app.exception)
+
+    def login(self):
+        for widget in self.app.text_input:
+            if widget.label == "Username":
+                widget.input(USERNAME)
+            elif widget.label == "Password":
+                widget.input(PASSWORD)
+        next(b for b in self.app.button if b.label == "Login").click()
+        self._run()
+        if not self.app.session_state.logged_in:
+            self.errors.append(f"login as {USERNAME} failed")
+
+    def play(self, steps: int, offset: int = 0, barrier=None):
+        """Open the page, log in, then switch question and country `steps` times."""
+        try:
+            if barrier is not None:
+                barrier.wait()
+            self._run()
+            self.login()
+            questions = self.app.sidebar.radio[0].options
+            countries = self.app.selectbox(key="dash_country").options
+            for step in range(offset, offset + steps):
+                self.app.sidebar.radio[0].set_value(questions[step % len(questions)])
+                self._run()
+                self.app.selectbox(key="dash_country").select(countries[step % len(countries)])
+                self._run()
+        except Exception as e:  # reported with the level, like script exceptions
+            self.errors.append(f"{type(e).__name__}: {e}")
+
+
+def run_level(sessions: int, steps: int) -> dict:
+    """Run `sessions` concurrent sessions; returns throughput, latency and memory."""
+    gc.collect()
+    rss_before = rss_mb()
+    in_flight = InFlight()
+    played = [Session(in_flight) for _ in range(sessions)]
+    barrier = threading.Barrier(sessions + 1)
+    # Different offsets, so sessions do not all ask for the same view at once
+    threads = [
+        threading.Thread(target=session.play, args=(steps, i, barrier), name=f"session-{i}")
+        for i, session in enumerate(played)
+    ]
+    with overlapping_runs():
+        for thread in threads:
+            thread.start()
+        barrier.wait()
+        started = time.perf_counter()
+        for thread in threads:
+            thread.join()
+        wall = time.perf_counter() - started
+    gc.collect()
+    rss_after = rss_mb()  # measured while the sessions (and their state) are alive
+
+    latencies = np.array([s for session in played for s in session.latencies])
+    reruns = len(latencies)
+    if not reruns:  # every session failed before its first rerun
+        latencies = np.array([np.nan])
+    p50, p95, p99 = np.percentile(latencies, [50, 95, 99]) * 1000
+    return {
+        "sessions": sessions,
+        "reruns": reruns,
+        "peak_in_flight": in_flight.peak,
+        "wall_s": wall,
+        "reruns_per_s": reruns / wall,
+        "p50_ms": p50,
+        "p95_ms": p95,
+        "p99_ms": p99,
+        "max_ms": latencies.max() * 1000,
+        "rss_before_mb": rss_before,
+        "rss_after_mb": rss_after,
+        "rss_per_session_mb": (rss_after - rss_before) / sessions,
+        "errors": [str(e) for session in played for e in session.errors],
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Simulate concurrent dashboard sessions with AppTest")
+    parser.add_argument("--sessions", type=int, nargs="+", default=[1, 4, 16], help="concurrent sessions per level")
+    parser.add_argument("--steps", type=int, default=5, help="question + country switches per session")
+    parser.add_argument("--no-warm", action="store_true", help="measure the first level with cold caches")
+    parser.add_argument("--report", help="write the results to this JSON file")
+    args = parser.parse_args(argv)
+
+    # Before app.py first imports auth, so session tokens stay out of auth.db
+    store = tempfile.TemporaryDirectory()
+    os.environ["WORLDCUP_AUTH_DB"] = os.path.join(store.name, "auth.db")
+    import auth
+
+    auth.set_password(USERNAME, PASSWORD)
+
+    if not args.no_warm:
+        started = time.perf_counter()
+        Session().play(1)
+        print(f"warm-up session {time.perf_counter() - started:.1f} s")
+
+    results = []
+    print(f"{'sessions':>8} {'reruns':>7} {'overlap':>7} {'wall s':>8} {'reruns/s':>9} {'p50 ms':>8} {'p95 ms':>8} "
+          f"{'p99 ms':>8} {'RSS MB':>8} {'MB/session':>10}")
+    for sessions in args.sessions:
+        r = run_level(sessions, args.steps)
+        results.append(r)
+        print(f"{r['sessions']:>8} {r['reruns']:>7} {r['peak_in_flight']:>7} {r['wall_s']:>8.1f} {r['reruns_per_s']:>9.2f} "
+              f"{r['p50_ms']:>8.0f} {r['p95_ms']:>8.0f} {r['p99_ms']:>8.0f} {r['rss_after_mb']:>8.0f} "
+              f"{r['rss_per_session_mb']:>10.1f}")
+        for error in r["errors"][:3]:
+            print(f"  error: {error}")
+
+    if args.report:
+        with open(args.report, "w") as f:
+            json.dump({"steps": args.steps, "cpus": os.cpu_count(), "levels": results}, f, indent=2)
+    store.cleanup()
+    return 1 if any(r["errors"] for r in results) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
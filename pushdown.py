@@ -0,0 +1,92 @@
+import threading
+
+import numpy as np
+import pandas as pd
+
+# ------------------------
+# Server-side reduction of chart data
+# Charts only ever show a handful of bars, one block per country or a line
+# a few hundred pixels wide, so the data is cut down before the figure is
+# built instead of shipping every group to the browser:
+#   top_n()          partial selection (nlargest) + optional "Other" bucket
+#   lttb()           Largest-Triangle-Three-Buckets downsampling of a series
+# Row counts in/out per operation are kept in `metrics`.
+# ------------------------
+OTHER = "Other"
+
+_lock = threading.Lock()
+metrics = {}  # operation -> {"calls", "rows_in", "rows_out"}
+
+
+def _record(op: str, rows_in: int, rows_out: int):
+    with _lock:
+        m = metrics.setdefault(op, {"calls": 0, "rows_in": 0, "rows_out": 0})
+        m["calls"] += 1
+        m["rows_in"] += rows_in
+        m["rows_out"] += rows_out
+
+
+def top_n(frame: pd.DataFrame, value_col: str, n: int, label_col=None, other_label: str = OTHER) -> pd.DataFrame:
+    """The n largest rows by `value_col`, largest first, without sorting the whole frame.
+
+    With `label_col` (a column name or list of them), the remaining rows are
+    summed into one row labelled `other_label`, appended at the end.
+    """
+    if len(frame) <= n:
+        _record("top_n", len(frame), len(frame))
+        return frame.sort_values(value_col, ascending=False, kind="stable")
+    top = frame.nlargest(n, value_col, keep="first")
+    if label_col is not None:
+        rest = frame[value_col].sum() - top[value_col].sum()
+        labels = [label_col] if isinstance(label_col, str) else list(label_col)
+        other = {col: other_label if col in labels else None for col in frame.columns}
+        other[value_col] = rest
+        top = pd.concat([top, pd.DataFrame([other], columns=frame.columns)], ignore_index=True)
+    _record("top_n", len(frame), len(top))
+    return top
+
+
+def lttb(x: np.ndarray, y: np.ndarray, threshold: int) -> np.ndarray:
+    """Indices of the points kept by Largest-Triangle-Three-Buckets.
+
+    Keeps the first and last point and, per bucket, the point forming the
+    largest triangle with the previous pick and the next bucket's average,
+    which preserves peaks and troughs of the line.
+    """
+    n = len(x)
+    if threshold >= n or threshold < 3:
+        return np.arange(n)
+    x = np.asarray(x, dtype="float64")
+    y = np.asarray(y, dtype="float64")
+    edges = np.linspace(1, n - 1, threshold - 1).astype(np.int64)
+
+    keep = np.empty(threshold, dtype=np.int64)
+    keep[0] = a = 0
+    for i in range(threshold - 2):
+        start, end = edges[i], edges[i + 1]
+        next_start, next_end = end, edges[i + 2] if i + 2 < len(edges) else n
+        avg_x = x[next_start:next_end].mean()
+        avg_y = y[next_start:next_end].mean()
+        area = np.abs(
+            (x[a] - avg_x) * (y[start:end] - y[a])
+            - (x[a] - x[start:end]) * (avg_y - y[a])
+        )
+        a = start + int(area.argmax())
+        keep[i + 1] = a
+    keep[-1] = n - 1
+    return keep
+
+
+def downsample(frame: pd.DataFrame, x_col: str, y_col: str, max_points: int) -> pd.DataFrame:
+    """`frame` (sorted by x_col) reduced to at most `max_points` rows with LTTB."""
+    if len(frame) <= max_points:
+        _record("lttb", len(frame), len(frame))
+        return frame
+    keep = lttb(frame[x_col].to_numpy(), frame[y_col].to_numpy(), max_points)
+    _record("lttb", len(frame), len(keep))
+    return frame.iloc[keep]
+
+
+def snapshot() -> dict:
+    with _lock:
+        return {op: dict(m) for op, m in metrics.items()}
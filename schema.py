@@ -0,0 +1,73 @@
+import pandas as pd
+
+# ------------------------
+# Compact in-memory representation of the results frames
+# Repeated labels become categoricals and counts become the smallest integer
+# type that holds them, which cuts df/match_df memory several-fold.
+# ------------------------
+CATEGORICAL_COLUMNS = ["Tournament", "Team", "Opponent", "Stadium", "City", "Country", "Round", "Time", "Observation"]
+INTEGER_COLUMNS = ["Year", "Game #", "Team G", "Opponent G", "Total_Goals_in_Match"]
+
+
+def compact_frame(frame: pd.DataFrame) -> pd.DataFrame:
+    """Convert label columns to categoricals and count columns to small ints (in place)."""
+    for col in CATEGORICAL_COLUMNS:
+        if col in frame.columns and not isinstance(frame[col].dtype, pd.CategoricalDtype):
+            frame[col] = frame[col].astype("category")
+    for col in INTEGER_COLUMNS:
+        if col in frame.columns and not frame[col].isna().any():
+            # float -> int is only taken when every value is whole
+            values = frame[col]
+            if values.dtype.kind == "f" and not (values % 1 == 0).all():
+                continue
+            frame[col] = pd.to_numeric(values.astype("int64"), downcast="integer")
+    return frame
+
+
+def compact_frames(*frames: pd.DataFrame) -> tuple:
+    """compact_frame() over frames read separately (e.g. store teams and matches).
+
+    Shared label columns get one categorical dtype built from the union of
+    their values, so codes line up when the frames are joined or compared.
+    """
+    for col in CATEGORICAL_COLUMNS:
+        present = [frame for frame in frames if col in frame.columns]
+        if not present:
+            continue
+        values = pd.concat([frame[col].astype(object) for frame in present], ignore_index=True)
+        dtype = pd.CategoricalDtype(values.astype("category").cat.categories)
+        for frame in present:
+            frame[col] = frame[col].astype(object).astype(dtype)
+    return tuple(compact_frame(frame) for frame in frames)
+
+
+def frame_memory(frame: pd.DataFrame) -> int:
+    return int(frame.memory_usage(deep=True).sum())
+
+
+def memory_report(frames: dict) -> dict:
+    """{name: {"rows", "bytes", "columns": {col: bytes}}} for each frame."""
+    report = {}
+    for name, frame in frames.items():
+        usage = frame.memory_usage(deep=True, index=True)
+        report[name] = {
+            "rows": len(frame),
+            "bytes": int(usage.sum()),
+            "columns": {str(col): int(size) for col, size in usage.items()},
+        }
+    return report
+
+
+def append_frames(base: pd.DataFrame, delta: pd.DataFrame) -> pd.DataFrame:
+    """Concatenate two compact frames, keeping categoricals categorical.
+
+    Categories are merged (and kept sorted, as a fresh load would have them)
+    so the result matches compact_frame() over the combined rows.
+    """
+    base, delta = base.copy(deep=False), delta.copy(deep=False)
+    for col in base.columns:
+        if col in delta.columns and isinstance(base[col].dtype, pd.CategoricalDtype):
+            categories = base[col].cat.categories.union(pd.Index(delta[col].dropna().unique()))
+            base[col] = base[col].cat.set_categories(categories.sort_values())
+            delta[col] = pd.Categorical(delta[col], categories=base[col].cat.categories)
+    return pd.concat([base, delta], ignore_index=False)
@@ -0,0 +1,207 @@
+import os
+import threading
+
+import pandas as pd
+
+import data_loader
+
+# ------------------------
+# Optional DuckDB backend for the Q1–Q6 aggregations
+#
+# Runs the same analytics as aggregates.py as SQL over the Parquet data (the
+# cached copy of the workbook, a .parquet source, or the ingest.py store), so
+# the groupbys run on all cores and can spill to disk instead of needing the
+# full frames in pandas. Selected with WORLDCUP_BACKEND=duckdb; DuckDB is
+# only imported when it is selected.
+# ------------------------
+BACKEND = os.environ.get("WORLDCUP_BACKEND", "pandas").lower()
+DUCKDB_THREADS = int(os.environ.get("WORLDCUP_DUCKDB_THREADS", "0"))  # 0 = all cores
+DUCKDB_MEMORY_LIMIT = os.environ.get("WORLDCUP_DUCKDB_MEMORY") or None  # e.g. "2GB"
+ALL = "All"
+
+_lock = threading.Lock()
+_sources = {}      # dataset version -> file path or DataFrame
+MAX_SOURCES = 8
+_connections = {}  # dataset version -> duckdb connection (latest only)
+
+# q2, q4 and q5 are left unordered, like aggregates.RANKED_BY
+QUERIES = {
+    "q1": """
+        SELECT CAST("Country" AS VARCHAR) AS "Country", count(DISTINCT "Year") AS "Times_Hosted"
+        FROM sel GROUP BY 1 ORDER BY 2 DESC, 1
+    """,
+    "q2": """
+        SELECT "Country", "Stadium", "Matches" FROM (
+            SELECT CAST("Country" AS VARCHAR) AS "Country", CAST("Stadium" AS VARCHAR) AS "Stadium",
+                   count(*) AS "Matches",
+                   row_number() OVER (PARTITION BY "Country" ORDER BY count(*) DESC, CAST("Stadium" AS VARCHAR)) AS rank
+            FROM sel GROUP BY "Country", "Stadium"
+        ) WHERE rank = 1
+    """,
+    "q3": """
+        SELECT "Year", CAST(sum(match_goals) AS BIGINT) AS "Total_Goals"
+        FROM sel GROUP BY 1 ORDER BY 1
+    """,
+    "q4": """
+        SELECT CAST(t."Team" AS VARCHAR) AS "Team", CAST(sum(t."Opponent G") AS BIGINT) AS "Goals_Conceded"
+        FROM teams t SEMI JOIN sel USING ("Year", "Game #")
+        GROUP BY 1
+    """,
+    "q5": """
+        SELECT CAST("Stadium" AS VARCHAR) AS "Stadium", CAST(sum(match_goals) AS BIGINT) AS "Total_Goals"
+        FROM sel GROUP BY 1
+    """,
+    "q6": """
+        SELECT CAST("Round" AS VARCHAR) AS "Round", count(*) AS "Matches"
+        FROM sel GROUP BY 1 ORDER BY 2 DESC, 1
+    """,
+}
+
+
+def available() -> bool:
+    try:
+        import duckdb  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def register(version: str, source):
+    """Make a dataset version queryable: a source path or a results DataFrame."""
+    with _lock:
+        _sources[version] = source
+        while len(_sources) > MAX_SOURCES:
+            del _sources[next(iter(_sources))]
+
+
+def is_registered(version: str) -> bool:
+    return version in _sources
+
+
+def _quote(value: str) -> str:
+    return "'" + str(value).replace("'", "''") + "'"
+
+
+def _table_sql(path: str, version: str):
+    """(teams, matches) SELECTs over the Parquet files behind `path`."""
+    if os.path.isdir(path):
+        from ingest import resolve_tournament
+
+        where = f' WHERE "Tournament" = {_quote(resolve_tournament(path, data_loader.TOURNAMENT))}'
+        if data_loader.YEARS is not None:
+            # Same partitions as data_loader.load_data() reads
+            where += f' AND "Year" BETWEEN {int(data_loader.YEARS[0])} AND {int(data_loader.YEARS[1])}'
+        teams = f"SELECT * FROM read_parquet({_quote(os.path.join(path, 'teams', '**', '*.parquet'))}, hive_partitioning = true){where}"
+        matches = f"SELECT * FROM read_parquet({_quote(os.path.join(path, 'matches', '**', '*.parquet'))}, hive_partitioning = true){where}"
+        return teams, matches
+    if not path.endswith(".parquet"):
+        # The workbook's Parquet cache; data_loader writes it on first read
+        cache_file = data_loader._cache_path(path, version)
+        if not os.path.exists(cache_file):
+            data_loader._read_source(path, version)
+        path = cache_file
+    return f"SELECT * FROM read_parquet({_quote(path)})", None
+
+
+def _connect(version: str):
+    import duckdb
+
+    source = _sources[version]
+    con = duckdb.connect()
+    if DUCKDB_THREADS:
+        con.execute(f"SET threads = {DUCKDB_THREADS}")
+    if DUCKDB_MEMORY_LIMIT:
+        con.execute(f"SET memory_limit = {_quote(DUCKDB_MEMORY_LIMIT)}")
+    con.execute(f"SET temp_directory = {_quote(os.path.join(data_loader.CACHE_DIR, 'duckdb'))}")
+
+    if isinstance(source, pd.DataFrame):
+        # Registered frames are only visible to this connection, not to the
+        # per-thread cursors, so the rows are copied into DuckDB
+        con.register("source_frame", source)
+        con.execute("CREATE TABLE teams AS SELECT * FROM source_frame")
+        con.unregister("source_frame")
+        matches = None
+    else:
+        teams, matches = _table_sql(source, version)
+        con.execute(f"CREATE VIEW teams AS {teams}")
+    if matches is None:
+        # Both team rows of a match carry the same match-level columns
+        matches = """
+            SELECT "Year", "Game #", any_value("Country") AS "Country", any_value("Stadium") AS "Stadium",
+                   any_value("Round") AS "Round", any_value("Team G" + "Opponent G") AS goals
+            FROM teams GROUP BY "Year", "Game #"
+        """
+    else:
+        matches = f'SELECT *, "Team G" + "Opponent G" AS goals FROM ({matches})'
+    con.execute(f'CREATE VIEW matches AS SELECT * EXCLUDE (goals), CAST(goals AS INTEGER) AS match_goals FROM ({matches})')
+    return con
+
+
+def connection(version: str):
+    """A cursor on the DuckDB database for `version` (cursors are per thread)."""
+    con = _connections.get(version)
+    if con is None:
+        with _lock:
+            con = _connections.get(version)
+            if con is None:
+                con = _connect(version)
+                _connections.clear()  # only the current dataset version is kept
+                _connections[version] = con
+    return con.cursor()
+
+
+def _where(country, years, teams, rounds, stadiums):
+    clauses, params = [], []
+    if country != ALL:
+        clauses.append('"Country" = ?')
+        params.append(country)
+    if years is not None:
+        clauses.append('"Year" BETWEEN ? AND ?')
+        params.extend(int(y) for y in years)
+    for col, values in (("Round", rounds), ("Stadium", stadiums)):
+        if values:
+            clauses.append(f'"{col}" IN ({", ".join("?" * len(values))})')
+            params.extend(values)
+    if teams:
+        clauses.append(
+            'EXISTS (SELECT 1 FROM teams t WHERE t."Year" = matches."Year" AND t."Game #" = matches."Game #" '
+            f'AND t."Team" IN ({", ".join("?" * len(teams))}))'
+        )
+        params.extend(teams)
+    return (" WHERE " + " AND ".join(clauses)) if clauses else "", params
+
+
+def views(version: str, country: str = ALL, years=None, teams=(), rounds=(), stadiums=()) -> dict:
+    """Q1–Q6 frames for a filter combination, computed by DuckDB."""
+    where, params = _where(country, years, teams, rounds, stadiums)
+    cur = connection(version)
+    try:
+        selected = f"WITH sel AS (SELECT * FROM matches{where}) "
+        return {qid: cur.execute(selected + sql, params).fetchdf() for qid, sql in QUERIES.items()}
+    finally:
+        cur.close()
+
+
+# ------------------------
+# Parity with the pandas implementation
+# ------------------------
+def check_parity(data, combos=None) -> list:
+    """Compare DuckDB and pandas results; returns [(filters, qid), ...] that differ.
+
+    Covers "All", every host country, and the given filter combinations
+    (tuples of engine.filtered_views() arguments).
+    """
+    import aggregates
+    import engine
+
+    if not is_registered(data.version):
+        register(data.version, data.df)
+    combos = list(combos or []) + [(country,) for country in [ALL] + engine.countries(data)]
+    mismatches = []
+    for combo in combos:
+        expected = engine.filtered_views(data, *combo, backend="pandas")
+        got = views(data.version, *combo)
+        for qid in QUERIES:
+            if not aggregates._same_frame(got[qid], expected[qid]):
+                mismatches.append((combo, qid))
+    return mismatches
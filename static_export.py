@@ -0,0 +1,163 @@
+import argparse
+import hashlib
+import json
+import os
+import shutil
+import sys
+import threading
+import time
+
+import data_loader
+from figure_cache import EMPTY, figure_cache
+
+# ------------------------
+# Build-time export of the charts every visitor sees
+#
+#   artifacts/<dataset version>-<chart code hash>/
+#     manifest.json          version, chart code hash, chart ids, formats, build time
+#     <chart id>.json        pre-serialized Plotly figure (as the figure cache stores it)
+#     <chart id>.html/.png   optional, for sharing outside the app
+#
+# The app preloads the JSON of a matching version into the figure cache, so
+# the Home pie, the Visuals and the unfiltered Dashboard are never rebuilt.
+# The chart code hash covers the modules that shape the figures and the
+# Plotly version, so an export made before a chart change is not served.
+# ------------------------
+ARTIFACT_DIR = os.environ.get("WORLDCUP_ARTIFACTS", os.path.join(data_loader.BASE_DIR, "artifacts"))
+FILTER_VALUE = "All"  # static charts are the unfiltered ones
+CHART_SOURCES = ("charts.py", "pushdown.py", "aggregates.py", "engine.py", "static_export.py")
+
+_lock = threading.Lock()
+_preloaded = {}  # artifact key -> number of charts loaded from artifacts
+_code_hash = None
+
+
+def chart_code_hash() -> str:
+    """Hash of the chart-building sources and the Plotly version (once per process)."""
+    global _code_hash
+    if _code_hash is None:
+        import plotly
+
+        digest = hashlib.sha256(plotly.__version__.encode())
+        for name in CHART_SOURCES:
+            with open(os.path.join(data_loader.BASE_DIR, name), "rb") as f:
+                digest.update(f.read())
+        _code_hash = digest.hexdigest()[:12]
+    return _code_hash
+
+
+def artifact_key(version: str) -> str:
+    """Directory name of the export for `version` built by the current chart code."""
+    return f"{version}-{chart_code_hash()}"
+
+
+def static_charts(data) -> dict:
+    """chart id -> build function for every chart that does not depend on a filter."""
+    import engine
+    from charts import DASHBOARD_CHARTS, VISUAL_CHARTS, home_pie
+
+    views = engine.views(data)
+    builds = {"home_pie": lambda: home_pie(data.match_df)}
+    for qid in engine.QUESTIONS:
+        builds[f"visual_{qid}"] = lambda qid=qid: VISUAL_CHARTS[qid](views)
+        builds[f"dash_{qid}"] = lambda qid=qid: DASHBOARD_CHARTS[qid](views)
+    return builds
+
+
+def export(data, out_dir: str = ARTIFACT_DIR, html: bool = False, png: bool = False, keep: int = 3,
+           log=print) -> str:
+    """Write the static charts of `data` to out_dir/<artifact key>/; returns that path."""
+    if png:
+        try:
+            import kaleido  # noqa: F401
+        except ImportError:
+            raise RuntimeError("PNG export needs kaleido (pip install kaleido)") from None
+
+    target = os.path.join(out_dir, artifact_key(data.version))
+    tmp = f"{target}.tmp-{os.getpid()}"
+    shutil.rmtree(tmp, ignore_errors=True)
+    os.makedirs(tmp)
+
+    charts = []
+    for chart_id, build in static_charts(data).items():
+        started = time.perf_counter()
+        fig = build()
+        with open(os.path.join(tmp, f"{chart_id}.json"), "w") as f:
+            f.write(EMPTY if fig is None else fig.to_json())
+        if fig is not None and html:
+            fig.write_html(os.path.join(tmp, f"{chart_id}.html"), include_plotlyjs="cdn")
+        if fig is not None and png:
+            fig.write_image(os.path.join(tmp, f"{chart_id}.png"))
+        charts.append(chart_id)
+        log(f"{chart_id:<14} {(time.perf_counter() - started) * 1000:8.1f} ms")
+
+    formats = ["json"] + (["html"] if html else []) + (["png"] if png else [])
+    with open(os.path.join(tmp, "manifest.json"), "w") as f:
+        json.dump({"version": data.version, "code": chart_code_hash(), "filter": FILTER_VALUE,
+                   "charts": charts, "formats": formats, "built_at": time.time()}, f, indent=2)
+
+    # Swap the finished directory in, so readers never see a partial export
+    shutil.rmtree(target, ignore_errors=True)
+    os.replace(tmp, target)
+    _prune(out_dir, keep)
+    return target
+
+
+def _prune(out_dir: str, keep: int):
+    exports = [
+        os.path.join(out_dir, name) for name in os.listdir(out_dir)
+        if os.path.isfile(os.path.join(out_dir, name, "manifest.json"))
+    ]
+    exports.sort(key=os.path.getmtime, reverse=True)
+    for old in exports[keep:]:
+        shutil.rmtree(old, ignore_errors=True)
+
+
+def preload(version: str, out_dir: str = ARTIFACT_DIR) -> int:
+    """Put the exported charts of `version` into the figure cache.
+
+    Returns how many were loaded (0 when there is no export for this
+    version and chart code yet). Each export is looked up once per process,
+    whether or not it was found.
+    """
+    key = artifact_key(version)
+    if key in _preloaded:
+        return _preloaded[key]
+    with _lock:
+        if key in _preloaded:
+            return _preloaded[key]
+        loaded = 0
+        folder = os.path.join(out_dir, key)
+        try:
+            with open(os.path.join(folder, "manifest.json")) as f:
+                manifest = json.load(f)
+            if manifest.get("version") == version and manifest.get("code") == chart_code_hash():
+                for chart_id in manifest["charts"]:
+                    with open(os.path.join(folder, f"{chart_id}.json")) as f:
+                        figure_cache.put_json((chart_id, manifest["filter"], version), f.read())
+                    loaded += 1
+        except (OSError, ValueError, KeyError):
+            loaded = 0  # no (complete) export: charts are built on demand
+        _preloaded[key] = loaded
+    return loaded
+
+
+def main(argv=None):
+    import engine
+
+    parser = argparse.ArgumentParser(description="Export the static charts for the current dataset version")
+    parser.add_argument("--data", default=data_loader.DATA_PATH, help="workbook/CSV/store (default: WORLDCUP_DATA)")
+    parser.add_argument("--out", default=ARTIFACT_DIR)
+    parser.add_argument("--html", action="store_true", help="also write standalone HTML")
+    parser.add_argument("--png", action="store_true", help="also write PNG (needs kaleido)")
+    parser.add_argument("--keep", type=int, default=3, help="exported versions to keep")
+    args = parser.parse_args(argv)
+
+    data = engine.load(args.data)
+    target = export(data, args.out, args.html, args.png, args.keep)
+    print(f"exported version {data.version} to {target}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,143 @@
+import threading
+
+import numpy as np
+import pandas as pd
+
+# ------------------------
+# Per-team index for the Team Explorer
+#
+# Team rows are sorted once by (team, year, game) and addressed CSR-style:
+# team t owns positions offsets[t]:offsets[t + 1], already in year order, so
+# a team's record, matches and per-tournament progression only touch that
+# team's rows. Head-to-head totals live in a sparse matrix keyed by
+# team * n_teams + opponent (sorted keys + value columns), so one team's row
+# is a binary search, and a matrix between a few teams is filled from it.
+# Results are by the score after extra time; shoot-outs count as draws.
+# ------------------------
+H2H_COLUMNS = ["Played", "Wins", "Draws", "Losses", "Goals_For", "Goals_Against"]
+
+_lock = threading.Lock()
+_indexes = {}  # dataset version -> TeamIndex (latest only)
+
+
+class TeamIndex:
+    def __init__(self, df: pd.DataFrame):
+        teams = pd.api.types.union_categoricals(
+            [df["Team"].astype("category"), df["Opponent"].astype("category")], sort_categories=True,
+        ).categories
+        self.labels = list(teams)
+        self._codes = {team: i for i, team in enumerate(self.labels)}
+        n_teams = len(self.labels)
+
+        team = pd.Categorical(df["Team"], categories=teams).codes.astype(np.int64)
+        opponent = pd.Categorical(df["Opponent"], categories=teams).codes.astype(np.int64)
+        year = df["Year"].to_numpy(np.int64)
+        game = df["Game #"].to_numpy(np.int64)
+        order = np.lexsort((game, year, team))
+
+        self.positions = order  # row positions in df, grouped by team, year order inside
+        self.offsets = np.searchsorted(team[order], np.arange(n_teams + 1))
+        self.year = year[order]
+        self.game = game[order]
+        self.opponent = opponent[order]
+        self.goals_for = df["Team G"].to_numpy(np.int64)[order]
+        self.goals_against = df["Opponent G"].to_numpy(np.int64)[order]
+        self.outcome = np.sign(self.goals_for - self.goals_against)  # 1 win, 0 draw, -1 loss
+        rounds = df["Round"].astype("category")
+        self.round_labels = np.asarray(rounds.cat.categories, dtype=object)
+        self.round = rounds.cat.codes.to_numpy()[order]
+
+        # Sparse head-to-head matrix
+        keys, inverse = np.unique(team[order] * n_teams + self.opponent, return_inverse=True)
+        self._h2h_keys = keys
+        self._h2h = np.column_stack([
+            np.bincount(inverse, minlength=len(keys)),
+            np.bincount(inverse, weights=self.outcome == 1, minlength=len(keys)),
+            np.bincount(inverse, weights=self.outcome == 0, minlength=len(keys)),
+            np.bincount(inverse, weights=self.outcome == -1, minlength=len(keys)),
+            np.bincount(inverse, weights=self.goals_for, minlength=len(keys)),
+            np.bincount(inverse, weights=self.goals_against, minlength=len(keys)),
+        ]).astype(np.int64)
+        self.n_teams = n_teams
+
+    def teams(self) -> list:
+        return self.labels
+
+    def _slice(self, team: str) -> slice:
+        code = self._codes.get(team)
+        if code is None:
+            return slice(0, 0)
+        return slice(self.offsets[code], self.offsets[code + 1])
+
+    def rows(self, team: str) -> np.ndarray:
+        """Positions of `team`'s rows in df, in year/game order."""
+        return self.positions[self._slice(team)]
+
+    def record(self, team: str) -> dict:
+        s = self._slice(team)
+        outcome = self.outcome[s]
+        goals_for, goals_against = int(self.goals_for[s].sum()), int(self.goals_against[s].sum())
+        return {
+            "Matches": len(outcome),
+            "Wins": int((outcome == 1).sum()),
+            "Draws": int((outcome == 0).sum()),
+            "Losses": int((outcome == -1).sum()),
+            "Goals_For": goals_for,
+            "Goals_Against": goals_against,
+            "Goal_Difference": goals_for - goals_against,
+            "Tournaments": len(np.unique(self.year[s])),
+        }
+
+    def progression(self, team: str) -> pd.DataFrame:
+        """One row per tournament the team played: results, goals and last round reached."""
+        s = self._slice(team)
+        years = self.year[s]
+        if len(years) == 0:
+            return pd.DataFrame(columns=["Year"] + H2H_COLUMNS + ["Last_Round"])
+        starts = np.flatnonzero(np.r_[True, years[1:] != years[:-1]])
+        ends = np.r_[starts[1:], len(years)] - 1
+        outcome = self.outcome[s]
+        return pd.DataFrame({
+            "Year": years[starts],
+            "Played": np.diff(np.r_[starts, len(years)]),
+            "Wins": np.add.reduceat(outcome == 1, starts),
+            "Draws": np.add.reduceat(outcome == 0, starts),
+            "Losses": np.add.reduceat(outcome == -1, starts),
+            "Goals_For": np.add.reduceat(self.goals_for[s], starts),
+            "Goals_Against": np.add.reduceat(self.goals_against[s], starts),
+            # Rows are in game order, so a tournament's last row is its furthest round
+            "Last_Round": self.round_labels[self.round[s][ends]],
+        })
+
+    def head_to_head(self, team: str) -> pd.DataFrame:
+        """Totals against every opponent `team` has played, most played first."""
+        code = self._codes.get(team)
+        if code is None:
+            return pd.DataFrame(columns=["Opponent"] + H2H_COLUMNS)
+        lo, hi = np.searchsorted(self._h2h_keys, [code * self.n_teams, (code + 1) * self.n_teams])
+        frame = pd.DataFrame(self._h2h[lo:hi], columns=H2H_COLUMNS)
+        frame.insert(0, "Opponent", [self.labels[k % self.n_teams] for k in self._h2h_keys[lo:hi]])
+        return frame.sort_values(["Played", "Wins", "Opponent"], ascending=[False, False, True]).reset_index(drop=True)
+
+    def matrix(self, teams, value: str = "Wins") -> pd.DataFrame:
+        """Head-to-head `value` between `teams` (row team vs. column team)."""
+        teams = [t for t in teams if t in self._codes]
+        codes = np.array([self._codes[t] for t in teams], dtype=np.int64)
+        keys = (codes[:, None] * self.n_teams + codes[None, :]).ravel()
+        pos = np.searchsorted(self._h2h_keys, keys)
+        found = (pos < len(self._h2h_keys)) & (self._h2h_keys[np.minimum(pos, len(self._h2h_keys) - 1)] == keys)
+        values = np.where(found, self._h2h[np.minimum(pos, len(self._h2h_keys) - 1), H2H_COLUMNS.index(value)], 0)
+        return pd.DataFrame(values.reshape(len(teams), len(teams)), index=teams, columns=teams)
+
+
+def get_team_index(df: pd.DataFrame, version: str) -> TeamIndex:
+    index = _indexes.get(version)
+    if index is not None:
+        return index
+    with _lock:
+        index = _indexes.get(version)
+        if index is None:
+            index = TeamIndex(df)
+            _indexes.clear()  # only the current dataset version is kept
+            _indexes[version] = index
+    return index
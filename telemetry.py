@@ -0,0 +1,152 @@
+import json
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from functools import wraps
+
+import numpy as np
+
+# ------------------------
+# Hot-path instrumentation
+# Named spans around each stage of a rerun (parse, dedup, groupby, figure
+# build, theme, render) feed per-span histograms shared by the process.
+# Exported as JSON or Prometheus text; the app shows them to admins.
+# ------------------------
+# Upper bounds in seconds, Prometheus style (a +Inf bucket is implied)
+BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+RECENT_SAMPLES = 1024  # per span, used for the p50/p95/p99 estimates
+ENABLED = os.environ.get("WORLDCUP_TELEMETRY", "1") != "0"
+
+_lock = threading.Lock()
+_local = threading.local()  # current trace (list of (name, seconds)) per thread
+
+
+class Histogram:
+    def __init__(self):
+        self.counts = [0] * (len(BUCKETS) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.recent = deque(maxlen=RECENT_SAMPLES)
+
+    def observe(self, seconds: float):
+        i = 0
+        while i < len(BUCKETS) and seconds > BUCKETS[i]:
+            i += 1
+        self.counts[i] += 1
+        self.count += 1
+        self.total += seconds
+        self.recent.append(seconds)
+
+    def summary(self) -> dict:
+        recent = np.fromiter(self.recent, dtype="float64")
+        p50, p95, p99 = np.percentile(recent, [50, 95, 99]) if len(recent) else (0.0, 0.0, 0.0)
+        return {
+            "count": self.count,
+            "sum_ms": self.total * 1000,
+            "mean_ms": self.total * 1000 / self.count if self.count else 0.0,
+            "p50_ms": p50 * 1000,
+            "p95_ms": p95 * 1000,
+            "p99_ms": p99 * 1000,
+            "max_ms": recent.max() * 1000 if len(recent) else 0.0,
+        }
+
+
+histograms = {}  # span name -> Histogram
+
+
+def record(name: str, seconds: float):
+    with _lock:
+        hist = histograms.get(name)
+        if hist is None:
+            hist = histograms[name] = Histogram()
+        hist.observe(seconds)
+    trace = getattr(_local, "trace", None)
+    if trace is not None:
+        trace.append((name, seconds))
+
+
+@contextmanager
+def span(name: str):
+    """Time the enclosed block into the `name` histogram."""
+    if not ENABLED:
+        yield
+        return
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        record(name, time.perf_counter() - started)
+
+
+def timed(name: str):
+    """Decorator form of span()."""
+    def decorate(fn):
+        @wraps(fn)
+        def wrapper(*args, **kwargs):
+            with span(name):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorate
+
+
+def start_trace():
+    """Start collecting every span finished on this thread.
+
+    A Streamlit rerun runs on a single script thread, so one trace is one rerun.
+    """
+    _local.trace = []
+    _local.trace_started = time.perf_counter()
+
+
+def finish_trace(name: str = "rerun") -> list:
+    """Record the whole trace as `name` and return its [(span, seconds), ...]."""
+    spans = getattr(_local, "trace", None)
+    if spans is None:
+        return []
+    _local.trace = None
+    total = time.perf_counter() - _local.trace_started
+    if ENABLED:
+        record(name, total)
+    return spans + [(name, total)]
+
+
+def snapshot() -> dict:
+    with _lock:
+        return {name: hist.summary() for name, hist in sorted(histograms.items())}
+
+
+def reset():
+    with _lock:
+        histograms.clear()
+
+
+# ------------------------
+# Exporters
+# ------------------------
+def export_json(indent: int = 2) -> str:
+    return json.dumps({"generated_at": time.time(), "spans": snapshot()}, indent=indent)
+
+
+def _label(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def export_prometheus(metric: str = "worldcup_span_duration_seconds") -> str:
+    lines = [
+        f"# HELP {metric} Duration of instrumented app stages.",
+        f"# TYPE {metric} histogram",
+    ]
+    with _lock:
+        items = sorted((name, list(h.counts), h.count, h.total) for name, h in histograms.items())
+    for name, counts, count, total in items:
+        label = _label(name)
+        cumulative = 0
+        for bound, n in zip(BUCKETS, counts):
+            cumulative += n
+            lines.append(f'{metric}_bucket{{span="{label}",le="{bound}"}} {cumulative}')
+        lines.append(f'{metric}_bucket{{span="{label}",le="+Inf"}} {count}')
+        lines.append(f'{metric}_sum{{span="{label}"}} {total:.9f}')
+        lines.append(f'{metric}_count{{span="{label}"}} {count}')
+    return "\n".join(lines) + "\n"
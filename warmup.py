@@ -0,0 +1,151 @@
+import argparse
+import os
+import sys
+import threading
+import time
+
+import aggregates
+from charts import DASHBOARD_CHARTS, VISUAL_CHARTS, home_pie
+from figure_cache import EMPTY, figure_cache
+
+# ------------------------
+# Warm-up of every country's Dashboard views and figures
+#
+# The aggregate partials are computed once in this process. Worker processes
+# roll them up per host country and build that country's themed Dashboard
+# figures (plus the Visuals for "All"). The results go into the aggregate
+# cube and the shared figure cache under the keys app.py looks up, so the
+# first user to pick a country gets a warm cache. The app leaves at least
+# one CPU to the sessions: by default the warm-up uses up to two workers
+# and is skipped on a single-CPU machine. Results for a dataset version
+# that has been replaced meanwhile are dropped.
+# ------------------------
+WARMUP_WORKERS = int(os.environ.get("WORLDCUP_WARMUP_WORKERS", "0")) or min(2, (os.cpu_count() or 1) - 1)
+WARMUP = os.environ.get("WORLDCUP_WARMUP", "1") != "0" and WARMUP_WORKERS > 0
+
+_lock = threading.Lock()
+_started = set()    # dataset versions a warm-up was started for
+last_report = None  # report of the most recent warm-up
+
+_partials = None    # set in each worker by _init_worker
+
+
+def _init_worker(partials):
+    global _partials
+    _partials = partials
+
+
+def _warm_country(country: str):
+    """Views and figure JSON for one filter value; runs in a worker."""
+    started = time.perf_counter()
+    views = aggregates.finalize(_partials, country)
+    figures = {}
+    for qid, build in DASHBOARD_CHARTS.items():
+        fig = build(views)
+        figures[f"dash_{qid}"] = EMPTY if fig is None else fig.to_json()
+    if country == aggregates.ALL:
+        for qid, build in VISUAL_CHARTS.items():
+            figures[f"visual_{qid}"] = build(views).to_json()
+    return country, views, figures, os.getpid(), time.perf_counter() - started
+
+
+def warm(data, workers: int = WARMUP_WORKERS, in_process: bool = None) -> dict:
+    """Precompute every country's views and figures for `data`; returns a report.
+
+    Uses a process pool of `workers` processes; by default a single worker
+    runs the tasks in this process instead.
+    """
+    started = time.perf_counter()
+    partials = aggregates.compute_partials(data.match_df, data.df)
+    countries = [aggregates.ALL] + sorted(partials["host_matches"].index.get_level_values("Country").unique())
+    workers = max(1, min(workers, len(countries)))
+    if in_process is None:
+        in_process = workers == 1
+
+    pool_started = time.perf_counter()
+    if in_process:
+        _init_worker(partials)
+        results = [_warm_country(country) for country in countries]
+    else:
+        import multiprocessing
+        from concurrent.futures import ProcessPoolExecutor
+
+        # spawn: forking a process that runs server threads is not safe
+        with ProcessPoolExecutor(
+            max_workers=workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_worker,
+            initargs=(partials,),
+        ) as pool:
+            results = list(pool.map(_warm_country, countries))
+    pool_seconds = time.perf_counter() - pool_started
+
+    views = {}
+    per_worker = {}
+    for country, country_views, figures, pid, seconds in results:
+        views[country] = country_views
+        per_worker[pid] = per_worker.get(pid, 0.0) + seconds
+    # A newer dataset version may have been loaded while this one was warming
+    installed = aggregates.install_cube(data.version, {"partials": partials, "views": views})
+    if installed:
+        for country, _, figures, _, _ in results:
+            for chart_id, payload in figures.items():
+                figure_cache.put_json((chart_id, country, data.version), payload)
+        figure_cache.get_or_build(("home_pie", aggregates.ALL, data.version), lambda: home_pie(data.match_df))
+
+    busy = sum(per_worker.values())
+    figures_built = sum(len(r[2]) for r in results) + 1
+    return {
+        "version": data.version,
+        "installed": installed,
+        "countries": len(countries),
+        "figures": figures_built,
+        "fits_figure_cache": figures_built <= figure_cache.maxsize,
+        "workers": workers,
+        "wall_ms": round((time.perf_counter() - started) * 1000, 1),
+        "pool_ms": round(pool_seconds * 1000, 1),
+        "busy_ms": round(busy * 1000, 1),
+        # Share of the pool's worker-time spent on tasks (startup and
+        # pickling make up the rest)
+        "utilization": round(busy / (pool_seconds * workers), 3) if pool_seconds else 0.0,
+        "per_worker_ms": {str(pid): round(s * 1000, 1) for pid, s in per_worker.items()},
+    }
+
+
+def _run(data, workers: int):
+    global last_report
+    try:
+        # Worker processes, so the warm-up never holds the app's GIL
+        last_report = warm(data, workers, in_process=False)
+    except Exception as e:
+        # A failed warm-up only means charts are built on demand as before
+        last_report = {"version": data.version, "error": repr(e)}
+
+
+def start(data, workers: int = WARMUP_WORKERS) -> bool:
+    """Warm `data` in a background thread, once per dataset version."""
+    with _lock:
+        if data.version in _started:
+            return False
+        _started.add(data.version)
+    threading.Thread(target=_run, args=(data, workers), name="worldcup-warmup", daemon=True).start()
+    return True
+
+
+def main(argv=None):
+    import engine
+
+    parser = argparse.ArgumentParser(description="Precompute every country's Dashboard views and figures")
+    parser.add_argument("--workers", type=int, default=WARMUP_WORKERS)
+    parser.add_argument("--scale", type=int, default=1, help="repeat the tournaments this many times")
+    args = parser.parse_args(argv)
+
+    data = engine.load() if args.scale <= 1 else engine.synthetic(args.scale)
+    report = warm(data, args.workers)
+    for name, value in report.items():
+        print(f"{name:<18} {value}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())